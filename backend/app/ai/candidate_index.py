@@ -0,0 +1,239 @@
+"""Top-K retrieval over the whole candidate pool, kept in memory.
+
+Every candidate is a sparse feature row plus a bias, and a query's score for
+it is ``row · query + bias`` (maximum inner product search).
+``ranker.retrieval_features`` builds rows whose score is the candidate's
+``rank_candidates`` overall score, so the top of a retrieval approximates the
+top of an exhaustive ranking without loading or scoring the whole pool.
+
+With one list (the default) a search scores every candidate in one sparse
+product. For very large pools the index can be an IVF (inverted file): the
+rows' directions are clustered with spherical k-means, each candidate is stored
+in the list of its nearest centroid, and a search scores each list by its mean
+member and only scans the ``probes`` best lists (half of them by default).
+That trades recall for time; ``recall_at_k`` measures how much of an exhaustive
+top-K a retrieval kept, and ``benchmarks.bench_retrieval`` compares probe counts.
+
+Candidates arriving later go to the list of their nearest centroid without
+retraining. Rows are appended in blocks; removed or replaced rows are masked
+out and dropped when their list is compacted.
+"""
+
+import threading
+from typing import Iterable, NamedTuple, Optional
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# Rows sampled to train the centroids
+TRAIN_SAMPLE = 50000
+TRAIN_ITERATIONS = 10
+
+# Rows scored against the centroids at a time while assigning lists
+_ASSIGN_CHUNK = 4096
+
+# Appended blocks a list keeps before they are merged into one
+_MAX_BLOCKS = 16
+
+
+class Neighbours(NamedTuple):
+    candidate_ids: np.ndarray  # best first
+    scores: np.ndarray
+
+
+class _List:
+    """Candidates assigned to one centroid."""
+
+    def __init__(self, n_features: int, track_mean: bool):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.blocks: list[sparse.csr_matrix] = []  # rows, in order
+        self.bias = np.zeros(0, dtype=np.float32)
+        self.live = np.zeros(0, dtype=bool)
+        self.dead = 0
+        # Sums over live rows, for the list's mean member (only needed to pick lists to probe)
+        self.track_mean = track_mean
+        self.row_sum = sparse.csr_matrix((1, n_features), dtype=np.float32)
+        self.bias_sum = 0.0
+
+    def append(self, ids: np.ndarray, rows: sparse.csr_matrix, bias: np.ndarray) -> int:
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, ids])
+        self.blocks.append(rows)
+        self.bias = np.concatenate([self.bias, bias])
+        self.live = np.concatenate([self.live, np.ones(len(ids), dtype=bool)])
+        if self.track_mean:
+            self.row_sum = self.row_sum + sparse.csr_matrix(np.ones((1, rows.shape[0]), dtype=np.float32)) @ rows
+            self.bias_sum += float(bias.sum())
+        if len(self.blocks) > _MAX_BLOCKS:
+            self.blocks = [sparse.vstack(self.blocks, format="csr")]
+        return start
+
+    def row(self, row: int) -> sparse.csr_matrix:
+        for block in self.blocks:
+            if row < block.shape[0]:
+                return block[row]
+            row -= block.shape[0]
+        raise IndexError(row)
+
+    def mask(self, row: int):
+        self.live[row] = False
+        self.dead += 1
+        if self.track_mean:
+            self.row_sum = self.row_sum - self.row(row)
+            self.bias_sum -= float(self.bias[row])
+
+    def compact(self) -> np.ndarray:
+        """Drop masked rows; returns the kept ids in their new row order."""
+        self.ids = self.ids[self.live]
+        self.blocks = [sparse.vstack(self.blocks, format="csr")[self.live]]
+        self.bias = self.bias[self.live]
+        self.live = np.ones(len(self.ids), dtype=bool)
+        self.dead = 0
+        return self.ids
+
+
+def _assign(rows: sparse.csr_matrix, centroids: sparse.csr_matrix) -> np.ndarray:
+    """Index of the nearest centroid (by cosine) for each row."""
+    if centroids.shape[0] == 1:
+        return np.zeros(rows.shape[0], dtype=np.int64)
+    rows = normalize(rows)
+    labels = np.empty(rows.shape[0], dtype=np.int64)
+    for start in range(0, rows.shape[0], _ASSIGN_CHUNK):
+        scores = (rows[start:start + _ASSIGN_CHUNK] @ centroids.T).toarray()
+        labels[start:start + _ASSIGN_CHUNK] = scores.argmax(axis=1)
+    return labels
+
+
+def train_centroids(rows: sparse.csr_matrix, n_lists: int, seed: int = 0) -> sparse.csr_matrix:
+    """Spherical k-means over the directions of ``rows``; returns normalized centroids."""
+    rng = np.random.default_rng(seed)
+    if rows.shape[0] > TRAIN_SAMPLE:
+        rows = rows[rng.choice(rows.shape[0], TRAIN_SAMPLE, replace=False)]
+    rows = normalize(rows)
+    n_lists = max(1, min(n_lists, rows.shape[0]))
+    centroids = rows[rng.choice(rows.shape[0], n_lists, replace=False)]
+    for _ in range(TRAIN_ITERATIONS):
+        labels = _assign(rows, centroids)
+        membership = sparse.csr_matrix(
+            (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+            shape=(n_lists, rows.shape[0]),
+        )
+        sums = membership @ rows
+        # Keep the previous centroid for lists that lost all their members
+        empty = np.diff(sums.indptr) == 0
+        if empty.any():
+            sums = sparse.vstack([centroids[i] if empty[i] else sums[i] for i in range(n_lists)], format="csr")
+        centroids = normalize(sums)
+    return centroids.astype(np.float32)
+
+
+class CandidateIndex:
+    def __init__(self, centroids: sparse.csr_matrix, probes: Optional[int] = None):
+        self.centroids = centroids
+        n_lists = centroids.shape[0]
+        self.probes = min(probes or max(1, n_lists // 2), n_lists)
+        self._lists = [_List(centroids.shape[1], n_lists > 1) for _ in range(n_lists)]
+        self._where: dict[int, tuple[int, int]] = {}  # candidate id -> (list, row)
+        self._means = None  # (rows, bias) of every list's mean member, rebuilt after changes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def train(
+        cls, candidate_ids: Iterable[int], rows: sparse.csr_matrix, bias: np.ndarray,
+        n_lists: int = 1, probes: Optional[int] = None, seed: int = 0,
+    ) -> "CandidateIndex":
+        """Index ``rows`` (one per id), clustered into ``n_lists`` lists."""
+        if n_lists > 1 and rows.shape[0]:
+            centroids = train_centroids(rows, n_lists, seed)
+        else:
+            centroids = sparse.csr_matrix((1, rows.shape[1]), dtype=np.float32)
+        index = cls(centroids, probes)
+        index.add(candidate_ids, rows, bias)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, candidate_id: int) -> bool:
+        return candidate_id in self._where
+
+    def add(self, candidate_ids: Iterable[int], rows: sparse.csr_matrix, bias: np.ndarray):
+        """Insert or replace candidates, one row and bias per id."""
+        ids = np.fromiter((int(cid) for cid in candidate_ids), dtype=np.int64)
+        if not len(ids):
+            return
+        rows = rows.astype(np.float32).tocsr()
+        bias = np.asarray(bias, dtype=np.float32)
+        labels = _assign(rows, self.centroids)
+        with self._lock:
+            self._means = None
+            for cid in ids.tolist():
+                self._mask(cid)
+            for label in np.unique(labels).tolist():
+                members = np.flatnonzero(labels == label)
+                start = self._lists[label].append(ids[members], rows[members], bias[members])
+                for offset, cid in enumerate(ids[members].tolist()):
+                    self._where[cid] = (label, start + offset)
+
+    def remove(self, candidate_ids: Iterable[int]):
+        with self._lock:
+            self._means = None
+            for cid in candidate_ids:
+                self._mask(int(cid))
+
+    def _mask(self, candidate_id: int):
+        where = self._where.pop(candidate_id, None)
+        if where is None:
+            return
+        label, row = where
+        lst = self._lists[label]
+        lst.mask(row)
+        if lst.dead * 2 > len(lst.live):
+            for new_row, cid in enumerate(lst.compact().tolist()):
+                self._where[cid] = (label, new_row)
+
+    def _mean_members(self) -> tuple[sparse.csr_matrix, np.ndarray]:
+        live = np.array([len(lst.live) - lst.dead for lst in self._lists], dtype=np.float32)
+        scale = sparse.diags(1 / np.maximum(live, 1))
+        rows = scale @ sparse.vstack([lst.row_sum for lst in self._lists], format="csr")
+        bias = np.array([lst.bias_sum for lst in self._lists]) / np.maximum(live, 1)
+        # Empty lists are never probed
+        return rows.tocsr(), np.where(live > 0, bias, -np.inf)
+
+    def search(self, query: sparse.csr_matrix, k: int, probes: Optional[int] = None) -> Neighbours:
+        """The ``k`` candidates scoring highest for a one-row ``query``."""
+        # Dense, so each list is one sparse matrix-vector product
+        query = query.toarray().ravel().astype(np.float32)
+        with self._lock:
+            if len(self._lists) == 1:
+                probed = [0]
+            else:
+                if self._means is None:
+                    self._means = self._mean_members()
+                mean_rows, mean_bias = self._means
+                means = mean_rows @ query + mean_bias
+                probed = np.argsort(-means, kind="stable")[:min(probes or self.probes, len(self._lists))]
+            lists = [
+                (lst.ids, list(lst.blocks), lst.bias, lst.live.copy())
+                for lst in (self._lists[i] for i in probed) if len(lst.ids)
+            ]
+
+        ids = np.concatenate([ids[live] for ids, _, _, live in lists] or [np.zeros(0, dtype=np.int64)])
+        if not len(ids) or k <= 0:
+            return Neighbours(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        scores = np.concatenate([
+            (np.concatenate([block @ query for block in blocks]) + bias)[live]
+            for _, blocks, bias, live in lists
+        ])
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return Neighbours(ids[top], scores[top])
+
+
+def recall_at_k(exhaustive_ids: list[int], retrieved_ids: Iterable[int], k: int) -> float:
+    """Share of the exhaustive top-``k`` that is also among the retrieved candidates."""
+    expected = set(exhaustive_ids[:k])
+    if not expected:
+        return 1.0
+    return len(expected & set(retrieved_ids)) / len(expected)
@@ -0,0 +1,197 @@
+"""CV Extraction Engine - Runs text extraction on a pool of worker processes.
+
+PDF/DOCX parsing is CPU-bound and occasionally pathological, so it runs outside
+the API process:
+
+- documents from one request fan out across the pool and come back in order;
+- each document has a wall-clock budget (``EXTRACTION_TIMEOUT_SECONDS``),
+  enforced inside the worker with an interval timer and, as a backstop for
+  workers stuck in native code, by recycling the pool from the parent;
+- each worker's address space is capped at ``EXTRACTION_MAX_MEMORY_MB``;
+- each result reports which backend produced the text and how long every
+  backend in the fallback chain took;
+- workers are replaced after ``EXTRACTION_MAX_TASKS_PER_CHILD`` documents, and a
+  crashed pool is rebuilt with its in-flight documents retried once.
+
+Set ``EXTRACTION_WORKERS=0`` to extract in a thread of the API process instead.
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple, Optional
+from starlette.concurrency import run_in_threadpool
+from app.ai.parser import ExtractedText, extract_document
+from app.config import get_settings
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Extra time the parent waits past the in-worker timeout before recycling the pool
+HARD_TIMEOUT_GRACE_SECONDS = 5.0
+
+
+class DocumentTimeout(BaseException):
+    """Raised inside a worker when a document exceeds its time budget.
+
+    A BaseException so that the parser's backend fallback does not catch it and
+    spend another full budget on the next backend.
+    """
+
+
+class DocumentTooLarge(Exception):
+    """Raised inside a worker when a document exceeds the memory cap."""
+
+
+class ExtractionResult(NamedTuple):
+    text: str
+    error: Optional[str] = None
+    seconds: float = 0.0
+    engine: Optional[str] = None
+    attempts: tuple = ()
+
+    def stats(self) -> dict:
+        """Timings to store with the resume."""
+        return {"seconds": self.seconds, "attempts": list(self.attempts)}
+
+
+def _raise_timeout(signum, frame):
+    raise DocumentTimeout()
+
+
+def _init_worker(max_memory_mb: int):
+    if resource is not None and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _extract_in_worker(file_path: str, file_type: str, timeout: float) -> ExtractedText:
+    use_timer = timeout > 0 and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    out_of_memory = False
+    try:
+        return extract_document(file_path, file_type)
+    except MemoryError:
+        out_of_memory = True
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    # Raised outside the except block so the parser's frames are already freed;
+    # sending a MemoryError traceback back would itself run out of memory.
+    if out_of_memory:
+        gc.collect()
+        raise DocumentTooLarge()
+
+
+class ExtractionEngine:
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        max_memory_mb: int,
+        max_tasks_per_child: int,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking the threaded API process is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.max_memory_mb,),
+                    max_tasks_per_child=self.max_tasks_per_child or None,
+                )
+            return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Kill the workers of a stuck or broken pool; the next call starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # ProcessPoolExecutor offers no public way to stop a running task
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def extract_many(self, documents: list[tuple[str, str]]) -> list[ExtractionResult]:
+        """Extract ``(file_path, file_type)`` documents concurrently, results in input order."""
+        return list(await asyncio.gather(*(self._extract_one(path, ftype) for path, ftype in documents)))
+
+    async def extract(self, file_path: str, file_type: str) -> ExtractionResult:
+        return await self._extract_one(file_path, file_type)
+
+    async def _extract_one(self, file_path: str, file_type: str, retry: bool = True) -> ExtractionResult:
+        start = time.monotonic()
+
+        def result(extracted: Optional[ExtractedText] = None, error: Optional[str] = None) -> ExtractionResult:
+            seconds = round(time.monotonic() - start, 4)
+            if extracted is None:
+                return ExtractionResult("", error, seconds)
+            return ExtractionResult(extracted.text, None, seconds, extracted.engine, tuple(extracted.attempts))
+
+        if self.workers <= 0:
+            try:
+                return result(await run_in_threadpool(extract_document, file_path, file_type))
+            except Exception as e:
+                return result(error=str(e))
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_extract_in_worker, file_path, file_type, self.timeout)
+            hard_timeout = self.timeout + HARD_TIMEOUT_GRACE_SECONDS if self.timeout > 0 else None
+            return result(await asyncio.wait_for(asyncio.wrap_future(future), hard_timeout))
+        except (DocumentTimeout, asyncio.TimeoutError) as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._recycle(executor)
+            return result(error=f"Waktu ekstraksi habis (> {self.timeout:g} detik)")
+        except (DocumentTooLarge, MemoryError):
+            return result(error=f"Dokumen melebihi batas memori ({self.max_memory_mb} MB)")
+        except BrokenProcessPool:
+            self._recycle(executor)
+            if retry:
+                return await self._extract_one(file_path, file_type, retry=False)
+            return result(error="Proses ekstraksi berhenti tidak normal")
+        except Exception as e:
+            return result(error=str(e))
+
+
+def _create_engine() -> ExtractionEngine:
+    settings = get_settings()
+    workers = settings.EXTRACTION_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return ExtractionEngine(
+        workers=workers,
+        timeout=settings.EXTRACTION_TIMEOUT_SECONDS,
+        max_memory_mb=settings.EXTRACTION_MAX_MEMORY_MB,
+        max_tasks_per_child=settings.EXTRACTION_MAX_TASKS_PER_CHILD,
+    )
+
+
+extraction_engine = _create_engine()
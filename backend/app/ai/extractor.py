@@ -1,52 +1,20 @@
 """Named Entity Recognition Module - Extracts structured data from CV text."""
 
+import multiprocessing
+import os
 import re
-from typing import Optional
-
-
-# Common technical skills database
-TECH_SKILLS = {
-    # Programming Languages
-    "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "php",
-    "swift", "kotlin", "go", "golang", "rust", "scala", "perl", "r", "matlab",
-    "dart", "lua", "haskell", "elixir", "clojure", "objective-c",
-    # Web Frameworks
-    "react", "reactjs", "react.js", "angular", "vue", "vuejs", "vue.js",
-    "next.js", "nextjs", "nuxt", "svelte", "django", "flask", "fastapi",
-    "spring", "spring boot", "express", "expressjs", "laravel", "rails",
-    "ruby on rails", "asp.net", ".net", "node.js", "nodejs",
-    # Databases
-    "mysql", "postgresql", "postgres", "mongodb", "redis", "elasticsearch",
-    "sqlite", "oracle", "sql server", "cassandra", "dynamodb", "firebase",
-    "neo4j", "mariadb", "couchdb",
-    # Cloud & DevOps
-    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s",
-    "terraform", "ansible", "jenkins", "gitlab ci", "github actions",
-    "ci/cd", "linux", "nginx", "apache",
-    # Data Science & AI
-    "machine learning", "deep learning", "tensorflow", "pytorch", "keras",
-    "scikit-learn", "pandas", "numpy", "nlp", "computer vision",
-    "data analysis", "data science", "big data", "hadoop", "spark",
-    "tableau", "power bi",
-    # Mobile
-    "android", "ios", "react native", "flutter", "xamarin",
-    # Tools & Others
-    "git", "github", "gitlab", "bitbucket", "jira", "confluence",
-    "figma", "photoshop", "illustrator", "sketch",
-    "agile", "scrum", "kanban", "rest api", "graphql", "microservices",
-    "html", "css", "sass", "less", "tailwind", "bootstrap",
-    "sql", "nosql", "api", "oauth", "jwt",
-}
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+from app.ai.skill_taxonomy import get_skill_taxonomy
+from app.ai.stage_timer import StageTimer
 
-# Soft skills
-SOFT_SKILLS = {
-    "leadership", "communication", "teamwork", "problem solving",
-    "critical thinking", "time management", "project management",
-    "analytical", "creative", "adaptable", "detail-oriented",
-    "collaboration", "presentation", "negotiation", "mentoring",
-    "kepemimpinan", "komunikasi", "kerja tim", "manajemen proyek",
-    "analitis", "kreatif", "adaptif",
-}
+
+# Stamped into every result as "extractor_version". Bump it whenever a change to
+# the rules below alters extract_entities() output; resumes parsed by an older
+# version are refreshed from their raw_text by app.tasks.reextraction.
+EXTRACTOR_VERSION = 1
 
 # Education keywords
 EDUCATION_KEYWORDS = {
@@ -75,22 +43,149 @@ SECTION_PATTERNS = {
     ],
 }
 
+SUMMARY_PATTERN = r"(?i)(summary|ringkasan|profil|profile|about|tentang)"
 
-def extract_entities(text: str) -> dict:
-    """Extract structured entities from CV text."""
-    result = {
-        "name": _extract_name(text),
-        "email": _extract_email(text),
-        "phone": _extract_phone(text),
-        "skills": _extract_skills(text),
-        "experience": _extract_experience(text),
-        "education": _extract_education(text),
-        "certifications": _extract_certifications(text),
-        "summary": _extract_summary(text),
-    }
+_SECTION_REGEXES = {
+    section: [re.compile(pattern) for pattern in patterns]
+    for section, patterns in SECTION_PATTERNS.items()
+}
+_SUMMARY_REGEX = re.compile(SUMMARY_PATTERN)
+# Union of every header pattern without (?i), so the regex engine can skip ahead
+# on first characters. The patterns are written in lowercase, so for ASCII lines
+# searching the lowercased line finds the same matches as the (?i) patterns.
+_ANY_HEADER_ASCII_REGEX = re.compile(
+    "|".join(
+        pattern.removeprefix("(?i)")
+        for pattern in [SUMMARY_PATTERN, *(p for patterns in SECTION_PATTERNS.values() for p in patterns)]
+    )
+)
+_DATE_REGEX = re.compile(
+    r'(\d{4}\s*[-–]\s*(?:\d{4}|present|sekarang|saat ini))|'
+    r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|januari|februari|maret|april|mei|juni|juli|agustus|september|oktober|november|desember)\w*\s+\d{4})',
+    re.IGNORECASE,
+)
+_YEAR_REGEX = re.compile(r'\b(19|20)\d{2}\b')
+_BULLET_REGEX = re.compile(r'^[\d\.\-\*•►▪]+\s*')
+_NUMBERS_ONLY_REGEX = re.compile(r'^[\d\s\-+()]+$')
+
+
+class CVSections(NamedTuple):
+    """A CV's lines, each classified once by ``segment_sections``."""
+
+    lines: list[str]  # raw lines, as text.split("\n")
+    headers: list[frozenset]  # per line: sections whose header pattern it matches
+    sections: dict[str, list[str]]  # section -> its stripped, non-empty lines, header included
+    summary_headers: list[int]  # indexes of lines matching SUMMARY_PATTERN
+
+
+def segment_sections(text: str) -> CVSections:
+    """Split a CV into sections in one pass over its lines.
+
+    A line matching exactly one section's header pattern starts that section, a
+    line matching several ends the current section without starting another,
+    and any other line stays in the current section.
+    """
+    lines = text.split("\n")
+    headers = []
+    sections = {section: [] for section in SECTION_PATTERNS}
+    summary_headers = []
+    current = None
+
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or (stripped.isascii() and not _ANY_HEADER_ASCII_REGEX.search(stripped.lower())):
+            headers.append(frozenset())
+            if current and stripped:
+                sections[current].append(stripped)
+            continue
+        matched = frozenset(
+            section
+            for section, regexes in _SECTION_REGEXES.items()
+            if any(regex.search(stripped) for regex in regexes)
+        )
+        headers.append(matched)
+        if _SUMMARY_REGEX.search(stripped):
+            summary_headers.append(index)
+
+        if len(matched) == 1:
+            current = next(iter(matched))
+        elif matched:
+            current = None
+        if current:
+            sections[current].append(stripped)
+
+    return CVSections(lines, headers, sections, summary_headers)
+
+
+def extract_entities(text: str, timer: Optional[StageTimer] = None) -> dict:
+    """Extract structured entities from CV text.
+
+    With a ``timer``, each sub-extractor is recorded as ``extract_entities.<field>``.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("extract_entities.sections"):
+        sections = segment_sections(text)
+    extractors = (
+        ("name", _extract_name, text),
+        ("email", _extract_email, text),
+        ("phone", _extract_phone, text),
+        ("skills", _extract_skills, text),
+        ("experience", _extract_experience, sections),
+        ("education", _extract_education, sections),
+        ("certifications", _extract_certifications, sections),
+        ("summary", _extract_summary, sections),
+    )
+    result = {}
+    for field, extractor, source in extractors:
+        with timer.stage(f"extract_entities.{field}"):
+            result[field] = extractor(source)
+    result["extractor_version"] = EXTRACTOR_VERSION
     return result
 
 
+def _extract_chunk(texts: list[str]) -> list[dict]:
+    return [extract_entities(text or "") for text in texts]
+
+
+def extract_entities_batch(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+) -> Iterator[dict]:
+    """Run ``extract_entities`` over many texts, yielding results in input order.
+
+    Texts are sent to a process pool ``chunk_size`` at a time; each worker
+    compiles the section and skill patterns once when it imports this module
+    and reuses them for every chunk. At most two chunks per worker are in
+    flight, and ``texts`` is consumed lazily, so memory stays bounded however
+    long the input is. ``workers`` defaults to one per CPU; 0 or 1 runs in the
+    calling process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    texts = iter(texts)
+    chunks = iter(lambda: list(islice(texts, chunk_size)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _extract_chunk(chunk)
+        return
+
+    # spawn, like the extraction engine: forking a threaded API process is unsafe
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_extract_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # Also reached when the caller stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def _extract_name(text: str) -> str:
     """Extract name - typically the first meaningful line of a CV."""
     lines = text.strip().split("\n")
@@ -131,65 +226,67 @@ def _extract_phone(text: str) -> str:
     return ""
 
 
-def _extract_skills(text: str) -> list[str]:
-    """Extract skills from CV text."""
-    text_lower = text.lower()
-    found_skills = []
+def _is_word_char(char: str) -> bool:
+    """Whether ``re`` treats ``char`` as a word character for ``\\b``."""
+    return char.isalnum() or char == "_"
 
-    # Check for technical skills
-    for skill in TECH_SKILLS:
-        # Use word boundary matching
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(pattern, text_lower):
-            found_skills.append(skill.title() if len(skill) > 3 else skill.upper())
 
-    # Check for soft skills
-    for skill in SOFT_SKILLS:
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(pattern, text_lower):
-            found_skills.append(skill.title())
+def _compile_skill_matcher():
+    """Compile every taxonomy alias into one pattern that scans the text once.
 
-    return list(set(found_skills))
+    Each position is tried against all skills, longest first, so a match is the
+    longest skill that starts there with ``\\b`` on both sides. Any shorter skill
+    matching at the same position is necessarily a prefix of it, and whether its
+    own closing ``\\b`` holds depends only on the longer skill's characters, so
+    those are precomputed per skill.
+    """
+    displays = {
+        alias: {skill.name}
+        for skill in get_skill_taxonomy().skills.values()
+        for alias in skill.aliases
+    }
 
+    skills = sorted(displays, key=len, reverse=True)
+    alternatives = "|".join(r"\b" + re.escape(skill) + r"\b" for skill in skills)
+    # Zero-width, so overlapping skills ("ruby on rails" / "rails") are all seen
+    pattern = re.compile(f"(?=({alternatives}))")
 
-def _extract_experience(text: str) -> list[dict]:
-    """Extract work experience entries."""
-    experiences = []
-    lines = text.split("\n")
+    found_with = {}
+    for skill in skills:
+        names = set(displays[skill])
+        for shorter in skills:
+            if (
+                len(shorter) < len(skill)
+                and skill.startswith(shorter)
+                and _is_word_char(skill[len(shorter) - 1]) != _is_word_char(skill[len(shorter)])
+            ):
+                names |= displays[shorter]
+        found_with[skill] = frozenset(names)
+    return pattern, found_with
 
-    in_experience_section = False
-    current_exp = None
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+_SKILL_PATTERN, _SKILL_NAMES = _compile_skill_matcher()
 
-        # Check if we're entering experience section
-        for pattern in SECTION_PATTERNS["experience"]:
-            if re.search(pattern, line):
-                in_experience_section = True
-                continue
 
-        # Check if we're leaving experience section (entering another section)
-        if in_experience_section:
-            for section, patterns in SECTION_PATTERNS.items():
-                if section != "experience":
-                    for pattern in patterns:
-                        if re.search(pattern, line):
-                            in_experience_section = False
-                            break
+def _extract_skills(text: str) -> list[str]:
+    """Extract skills from CV text, as canonical taxonomy names."""
+    found_skills = set()
+    for match in _SKILL_PATTERN.finditer(text.lower()):
+        found_skills |= _SKILL_NAMES[match.group(1)]
+    # Sorted: set order depends on the per-process hash seed, and batch
+    # extraction must give the same result in any worker
+    return sorted(found_skills)
 
-        if not in_experience_section:
-            continue
 
+def _extract_experience(sections: CVSections) -> list[dict]:
+    """Extract work experience entries."""
+    experiences = []
+    current_exp = None
+
+    for line in sections.sections["experience"]:
         # Try to parse experience entry
         # Look for date patterns that indicate a new entry
-        date_match = re.search(
-            r'(\d{4}\s*[-–]\s*(?:\d{4}|present|sekarang|saat ini))|'
-            r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|januari|februari|maret|april|mei|juni|juli|agustus|september|oktober|november|desember)\w*\s+\d{4})',
-            line, re.IGNORECASE,
-        )
+        date_match = _DATE_REGEX.search(line)
 
         if date_match:
             if current_exp:
@@ -212,38 +309,15 @@ def _extract_experience(text: str) -> list[dict]:
     return experiences[:10]  # Limit to 10 entries
 
 
-def _extract_education(text: str) -> list[dict]:
+def _extract_education(sections: CVSections) -> list[dict]:
     """Extract education entries."""
     education = []
-    lines = text.split("\n")
-
-    in_education_section = False
     current_edu = None
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        for pattern in SECTION_PATTERNS["education"]:
-            if re.search(pattern, line):
-                in_education_section = True
-                continue
-
-        if in_education_section:
-            for section, patterns in SECTION_PATTERNS.items():
-                if section != "education":
-                    for pattern in patterns:
-                        if re.search(pattern, line):
-                            in_education_section = False
-                            break
-
-        if not in_education_section:
-            continue
-
+    for line in sections.sections["education"]:
         # Look for education keywords
         has_edu_keyword = any(kw in line.lower() for kw in EDUCATION_KEYWORDS)
-        year_match = re.search(r'\b(19|20)\d{2}\b', line)
+        year_match = _YEAR_REGEX.search(line)
 
         if has_edu_keyword or year_match:
             if current_edu and (current_edu.get("institution") or current_edu.get("degree")):
@@ -277,67 +351,41 @@ def _extract_education(text: str) -> list[dict]:
     return education[:5]
 
 
-def _extract_certifications(text: str) -> list[str]:
+def _extract_certifications(sections: CVSections) -> list[str]:
     """Extract certifications from CV text."""
     certs = []
-    lines = text.split("\n")
-    in_cert_section = False
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
 
-        for pattern in SECTION_PATTERNS["certifications"]:
-            if re.search(pattern, line):
-                in_cert_section = True
-                continue
-
-        if in_cert_section:
-            for section, patterns in SECTION_PATTERNS.items():
-                if section != "certifications":
-                    for pattern in patterns:
-                        if re.search(pattern, line):
-                            in_cert_section = False
-                            break
-
-        if in_cert_section and len(line) > 5 and len(line) < 200:
+    for line in sections.sections["certifications"]:
+        if len(line) > 5 and len(line) < 200:
             # Clean up bullet points and numbering
-            cleaned = re.sub(r'^[\d\.\-\*•►▪]+\s*', '', line).strip()
+            cleaned = _BULLET_REGEX.sub('', line).strip()
             if cleaned:
                 certs.append(cleaned)
 
     return certs[:20]
 
 
-def _extract_summary(text: str) -> str:
+def _extract_summary(sections: CVSections) -> str:
     """Extract professional summary."""
-    lines = text.split("\n")
+    lines = sections.lines
 
-    for i, line in enumerate(lines):
-        if re.search(r'(?i)(summary|ringkasan|profil|profile|about|tentang)', line):
-            summary_lines = []
-            for j in range(i + 1, min(i + 6, len(lines))):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
-                # Stop if we hit another section header
-                is_header = False
-                for patterns in SECTION_PATTERNS.values():
-                    for pattern in patterns:
-                        if re.search(pattern, next_line):
-                            is_header = True
-                            break
-                if is_header:
-                    break
-                summary_lines.append(next_line)
-            if summary_lines:
-                return " ".join(summary_lines)
+    for i in sections.summary_headers:
+        summary_lines = []
+        for j in range(i + 1, min(i + 6, len(lines))):
+            next_line = lines[j].strip()
+            if not next_line:
+                continue
+            # Stop if we hit another section header
+            if sections.headers[j]:
+                break
+            summary_lines.append(next_line)
+        if summary_lines:
+            return " ".join(summary_lines)
 
     # If no summary section found, use first few lines after name/contact
     content_lines = []
     for line in lines[3:8]:
         line = line.strip()
-        if line and len(line) > 30 and "@" not in line and not re.match(r'^[\d\s\-+()]+$', line):
+        if line and len(line) > 30 and "@" not in line and not _NUMBERS_ONLY_REGEX.match(line):
             content_lines.append(line)
     return " ".join(content_lines[:3]) if content_lines else ""
@@ -2,22 +2,18 @@
 
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from typing import Optional, Sequence
 import numpy as np
+from app.ai.skill_taxonomy import get_skill_taxonomy
+from app.ai.text_vectors import experience_text
 
 
-# Global TF-IDF vectorizer (lightweight alternative to sentence-transformers)
-_vectorizer = None
-
-
-def _get_vectorizer():
-    global _vectorizer
-    if _vectorizer is None:
-        _vectorizer = TfidfVectorizer(
-            max_features=10000,
-            ngram_range=(1, 2),
-            stop_words="english",
-        )
-    return _vectorizer
+def _make_vectorizer(max_features: Optional[int] = None) -> TfidfVectorizer:
+    return TfidfVectorizer(
+        max_features=max_features,
+        ngram_range=(1, 2),
+        stop_words="english",
+    )
 
 
 def compute_similarity(text1: str, text2: str) -> float:
@@ -25,11 +21,7 @@ def compute_similarity(text1: str, text2: str) -> float:
     if not text1 or not text2:
         return 0.0
 
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
-        stop_words="english",
-    )
+    vectorizer = _make_vectorizer(max_features=5000)
 
     try:
         tfidf_matrix = vectorizer.fit_transform([text1, text2])
@@ -39,64 +31,173 @@ def compute_similarity(text1: str, text2: str) -> float:
         return 0.0
 
 
+class RunSimilarity:
+    """TF-IDF similarity to one job text, shared by a whole ranking run.
+
+    The vectorizer is fitted once, on the job text and every candidate text, so
+    IDF reflects the candidate pool rather than a single pair. Its rows are
+    L2-normalized, so each block of cosines is one sparse matrix-vector
+    product. Empty texts score 0.
+    """
+
+    def __init__(self, job_text: str, candidate_texts: list[str]):
+        # No max_features: dropping rare terms would skew the document norms
+        self._vectorizer = _make_vectorizer()
+        self._job_vector = None
+        self.candidate_scores = np.zeros(len(candidate_texts))
+        if not job_text:
+            return
+        try:
+            matrix = self._vectorizer.fit_transform([job_text, *candidate_texts])
+        except ValueError:  # nothing but stop words
+            return
+        self._job_vector = matrix[0].T
+        self.candidate_scores = (matrix[1:] @ self._job_vector).toarray().ravel()
+
+    def scores(self, texts: list[str]) -> np.ndarray:
+        """Similarity of further texts (e.g. experience entries) under the same fit."""
+        if self._job_vector is None or not texts:
+            return np.zeros(len(texts))
+        return (self._vectorizer.transform(texts) @ self._job_vector).toarray().ravel()
+
+
 def compute_skill_match(candidate_skills: list[str], required_skills: list[str]) -> dict:
-    """Compute skill matching between candidate and job requirements."""
+    """Compute skill matching between candidate and job requirements.
+
+    Both lists are resolved through the skill taxonomy, so aliases ("ReactJS",
+    "React.js") count as the same skill and matching is an exact set
+    intersection. Names are reported in their canonical form.
+    """
     if not required_skills:
         return {"score": 100.0, "matched": candidate_skills or [], "missing": []}
 
-    candidate_set = {s.lower() for s in (candidate_skills or [])}
-    required_set = {s.lower() for s in required_skills}
+    taxonomy = get_skill_taxonomy()
+    candidate_keys = taxonomy.keys(candidate_skills)
+    required = taxonomy.resolve(required_skills)
 
-    matched = candidate_set & required_set
-    missing = required_set - candidate_set
+    matched = [name for key, name in required.items() if key in candidate_keys]
+    missing = [name for key, name in required.items() if key not in candidate_keys]
 
-    # Also check for partial matches (e.g., "React.js" matches "React")
-    for req in list(missing):
-        for cand in candidate_set:
-            if req in cand or cand in req:
-                matched.add(req)
-                missing.discard(req)
-                break
-
-    score = (len(matched) / len(required_set)) * 100 if required_set else 100.0
+    score = (len(matched) / len(required)) * 100 if required else 100.0
 
     return {
         "score": round(score, 2),
-        "matched": [s.title() if len(s) > 3 else s.upper() for s in matched],
-        "missing": [s.title() if len(s) > 3 else s.upper() for s in missing],
+        "matched": matched,
+        "missing": missing,
     }
 
 
+# Set bits per byte value, for counting bits in packed bitsets
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class SkillBitsets:
+    """``compute_skill_match`` for a whole candidate pool against one job.
+
+    Skills are bits over a fixed vocabulary: every taxonomy skill, plus the
+    job's required skills that are not in the taxonomy. Each candidate is a
+    row of a packed ``uint8`` array, so the matched count of every candidate
+    comes from one AND with the job's row and a popcount. Matched/missing names
+    are only decoded, with ``match(row)``, for the rows that need them.
+    """
+
+    def __init__(self, candidate_skills: list[list[str]], required_skills: list[str]):
+        taxonomy = get_skill_taxonomy()
+        self._candidate_skills = candidate_skills
+        self._has_requirements = bool(required_skills)
+        self._required = taxonomy.resolve(required_skills)
+
+        positions = {skill_id: position for position, skill_id in enumerate(sorted(taxonomy.skills))}
+        for key in self._required:
+            positions.setdefault(key, len(positions))
+        self._width = len(positions)
+        self._required_positions = [(positions[key], name) for key, name in self._required.items()]
+
+        # Candidates share most skill names, so each distinct name is resolved once
+        columns_of = {}
+        rows, columns = [], []
+        for row, skills in enumerate(candidate_skills):
+            for skill in skills or []:
+                column = columns_of.get(skill, -1)
+                if column == -1:
+                    key = next(iter(taxonomy.resolve([skill])), None)
+                    column = columns_of[skill] = positions.get(key)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        bits = np.zeros((len(candidate_skills), self._width), dtype=bool)
+        bits[rows, columns] = True
+        job_bits = np.zeros(self._width, dtype=bool)
+        job_bits[[position for position, _ in self._required_positions]] = True
+
+        self.candidates = np.packbits(bits, axis=1)
+        self.job = np.packbits(job_bits)
+
+    def matched_counts(self) -> np.ndarray:
+        """Required skills each candidate has."""
+        return _POPCOUNT[self.candidates & self.job].sum(axis=1, dtype=np.int64)
+
+    def scores(self) -> np.ndarray:
+        """Skill scores (0-100, unrounded) of every candidate."""
+        if not self._required:
+            return np.full(len(self._candidate_skills), 100.0)
+        return self.matched_counts() / len(self._required) * 100
+
+    def match(self, row: int) -> dict:
+        """The ``compute_skill_match`` result of one candidate."""
+        if not self._has_requirements:
+            return {"score": 100.0, "matched": self._candidate_skills[row] or [], "missing": []}
+        bits = np.unpackbits(self.candidates[row], count=self._width)
+        matched = [name for position, name in self._required_positions if bits[position]]
+        missing = [name for position, name in self._required_positions if not bits[position]]
+        score = (len(matched) / len(self._required)) * 100 if self._required else 100.0
+        return {"score": round(score, 2), "matched": matched, "missing": missing}
+
+
 def compute_experience_score(
     candidate_experience: list[dict],
     job_description: str,
     min_years: int = 0,
 ) -> float:
     """Score candidate experience relevance."""
-    if not candidate_experience:
-        return 0.0
-
-    score = 0.0
-    total_entries = len(candidate_experience)
-
-    # Base score for having experience
-    score += min(total_entries * 15, 40)
-
-    # Relevance scoring via text similarity
-    for exp in candidate_experience:
-        exp_text = f"{exp.get('title', '')} {exp.get('company', '')} {exp.get('description', '')}"
-        if exp_text.strip():
-            relevance = compute_similarity(exp_text, job_description)
-            score += relevance * 30  # Up to 30 points for relevance
-
-    # Duration bonus
-    for exp in candidate_experience:
-        duration = exp.get("duration", "")
-        if "present" in duration.lower() or "sekarang" in duration.lower():
-            score += 10
-            break
-
-    return min(score, 100.0)
+    relevances = [compute_similarity(experience_text(exp), job_description) for exp in candidate_experience or []]
+    return float(compute_experience_scores([candidate_experience], relevances)[0])
+
+
+# Experience points per unit of an entry's similarity to the job
+EXPERIENCE_RELEVANCE_POINTS = 30
+
+
+def compute_experience_scores(
+    candidate_experiences: list[list[dict]],
+    relevances: Sequence[float],
+) -> np.ndarray:
+    """Experience scores of many candidates at once.
+
+    ``relevances`` holds the similarity to the job of every experience entry,
+    flattened in candidate order (``RunSimilarity.scores`` or
+    ``CandidateVectors.similarities``). Per candidate, the score is 15 points
+    per entry (at most 40), plus 30 x each entry's relevance, plus 10 if an
+    entry is current, capped at 100; no entries scores 0. The per-candidate
+    sums are segment sums over the entries' owner index.
+    """
+    counts = np.array([len(experience or []) for experience in candidate_experiences], dtype=np.int64)
+    owners = np.repeat(np.arange(len(counts)), counts)
+    relevances = np.asarray(relevances, dtype=np.float64)
+    if len(relevances) != len(owners):
+        raise ValueError(f"Expected {len(owners)} experience relevances, got {len(relevances)}")
+
+    current = np.array([
+        "present" in exp.get("duration", "").lower() or "sekarang" in exp.get("duration", "").lower()
+        for experience in candidate_experiences
+        for exp in experience or []
+    ], dtype=np.float64)
+
+    relevance_sums = np.bincount(owners, weights=relevances, minlength=len(counts))
+    has_current = np.bincount(owners, weights=current, minlength=len(counts)) > 0
+
+    scores = np.minimum(counts * 15, 40) + relevance_sums * EXPERIENCE_RELEVANCE_POINTS + has_current * 10.0
+    return np.where(counts > 0, np.minimum(scores, 100.0), 0.0)
 
 
 def compute_education_score(
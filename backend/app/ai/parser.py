@@ -1,28 +1,198 @@
-"""CV Text Extraction Module - Extracts raw text from PDF and DOCX files."""
+"""CV Text Extraction Module - Extracts raw text from PDF and DOCX files.
 
+Each file type has an ordered chain of extraction backends (``PDF_BACKENDS`` /
+``DOCX_BACKENDS``). Backends are tried in order: a fast raw-text extractor goes
+first, and its result is only kept when it looks usable. Otherwise the next
+backend runs, typically pdfplumber with full layout analysis. The last backend's
+result is always accepted.
+"""
+
+import re
+import time
+import zipfile
+from contextlib import closing
+from xml.etree import ElementTree
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
 import pdfplumber
 from docx import Document
+from app.config import get_settings
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - optional fast PDF backend
+    pdfium = None
+
+# Heuristics for rejecting a fast backend's output
+MAX_UNMAPPED_GLYPH_RATIO = 0.01  # "(cid:12)" / U+FFFD per character
+MIN_LETTER_RATIO = 0.5  # letters among non-space characters
+MAX_SINGLE_CHAR_WORD_RATIO = 0.3  # "S o f t w a r e" - letter-spaced or jumbled glyphs
+MAX_AVG_WORD_LENGTH = 15  # words run together without spaces
+
+_UNMAPPED_GLYPH = re.compile(r"\(cid:\d+\)|\ufffd")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+# Run children that python-docx turns into text (w:t and w:br are handled separately)
+_RUN_SPECIAL_CHARS = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+_BACKENDS: dict[str, dict[str, Callable[[str], str]]] = {}
+
+
+class ExtractedText(NamedTuple):
+    text: str
+    engine: str
+    attempts: list  # [{"engine", "seconds", "accepted", "reason"?}] in the order tried
+
+
+def register_backend(file_type: str, name: str, func: Callable[[str], str]):
+    """Make ``func(file_path) -> str`` available as a backend for ``file_type``."""
+    _BACKENDS.setdefault(file_type, {})[name] = func
+
+
+def get_backend_chain(file_type: str) -> list[tuple[str, Callable[[str], str]]]:
+    """Backends configured for ``file_type`` that are available, in the order to try."""
+    if file_type not in _BACKENDS:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    settings = get_settings()
+    configured = {"pdf": settings.PDF_BACKENDS, "docx": settings.DOCX_BACKENDS}.get(file_type)
+    available = _BACKENDS[file_type]
+    names = [n.strip() for n in configured.split(",") if n.strip()] if configured else list(available)
+    chain = [(name, available[name]) for name in names if name in available]
+    if not chain:
+        raise ValueError(f"No extraction backend available for {file_type}: {configured}")
+    return chain
+
+
+def looks_degenerate(text: str) -> Optional[str]:
+    """Return why ``text`` looks like a failed extraction, or ``None`` if it looks fine."""
+    stripped = text.strip()
+    # Empty text has no words to judge, even when EXTRACTION_MIN_CHARS is 0
+    if not stripped or len(stripped) < get_settings().EXTRACTION_MIN_CHARS:
+        return "too_short"
+    if len(_UNMAPPED_GLYPH.findall(stripped)) > len(stripped) * MAX_UNMAPPED_GLYPH_RATIO:
+        return "unmapped_glyphs"
+    non_space = [c for c in stripped if not c.isspace()]
+    if sum(c.isalpha() for c in non_space) < len(non_space) * MIN_LETTER_RATIO:
+        return "low_letter_ratio"
+    words = stripped.split()
+    if sum(1 for w in words if len(w) == 1 and w.isalpha()) > len(words) * MAX_SINGLE_CHAR_WORD_RATIO:
+        return "fragmented_words"
+    if len(non_space) / len(words) > MAX_AVG_WORD_LENGTH:
+        return "run_together_words"
+    return None
+
+
+def extract_document(file_path: str, file_type: str) -> ExtractedText:
+    """Extract text through the backend chain for ``file_type``, recording every attempt.
+
+    If every backend fails or is rejected, the first rejected text is returned
+    rather than nothing; only when no backend produced any text is the last
+    error raised.
+    """
+    attempts = []
+    rejected = None
+    last_error = None
+    chain = get_backend_chain(file_type)
+    for position, (name, func) in enumerate(chain):
+        start = time.perf_counter()
+        try:
+            text = func(file_path)
+            reason = looks_degenerate(text) if position < len(chain) - 1 else None
+        except MemoryError:
+            raise
+        except Exception as e:
+            text, reason, last_error = None, f"error: {e}", e
+        attempt = {"engine": name, "seconds": round(time.perf_counter() - start, 4), "accepted": reason is None}
+        if reason:
+            attempt["reason"] = reason
+        attempts.append(attempt)
+        if reason is None:
+            return ExtractedText(text, name, attempts)
+        if text is not None and rejected is None:
+            rejected = (text, name, attempt)
+    if rejected is not None:
+        text, name, attempt = rejected
+        attempt["accepted"] = True
+        return ExtractedText(text, name, attempts)
+    raise last_error
 
 
 def extract_text(file_path: str, file_type: str) -> str:
     """Extract text from a CV file (PDF or DOCX)."""
-    if file_type == "pdf":
-        return _extract_from_pdf(file_path)
-    elif file_type == "docx":
-        return _extract_from_docx(file_path)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
+    return extract_document(file_path, file_type).text
 
 
-def _extract_from_pdf(file_path: str) -> str:
-    """Extract text from PDF using pdfplumber."""
+def _join_pages(pages: Iterable[str]) -> str:
+    """Join page texts, stopping once ``PDF_TARGET_CHARS`` have been gathered."""
+    target = get_settings().PDF_TARGET_CHARS
     text_parts = []
-    with pdfplumber.open(file_path) as pdf:
+    total_chars = 0
+    with closing(pages):
+        for page_text in pages:
+            text_parts.append(page_text)
+            total_chars += len(page_text)
+            if target and total_chars >= target:
+                break
+    return "\n".join(text_parts)
+
+
+def iter_pdf_pages(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_chars_per_page: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the text of each PDF page in order.
+
+    Only the first ``max_pages`` pages are opened, and each page's layout
+    objects are released as soon as its text has been read, so memory stays
+    flat however long the document is.
+    """
+    pages = range(1, max_pages + 1) if max_pages else None
+    with pdfplumber.open(file_path, pages=pages) as pdf:
         for page in pdf.pages:
-            page_text = page.extract_text()
+            try:
+                page_text = page.extract_text()
+            finally:
+                # close() drops the cached layout objects but not the text map cache
+                page.close()
+                page.get_textmap.cache_clear()
             if page_text:
-                text_parts.append(page_text)
-    return "\n".join(text_parts)
+                yield page_text[:max_chars_per_page] if max_chars_per_page else page_text
+
+
+def iter_pdfium_pages(
+    file_path: str,
+    max_pages: Optional[int] = None,
+    max_chars_per_page: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the raw text of each PDF page using PDFium, without layout analysis."""
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        page_count = min(len(pdf), max_pages) if max_pages else len(pdf)
+        for index in range(page_count):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range().replace("\r\n", "\n").strip()
+            finally:
+                textpage.close()
+                page.close()
+            if page_text:
+                yield page_text[:max_chars_per_page] if max_chars_per_page else page_text
+    finally:
+        pdf.close()
+
+
+def _extract_from_pdf(file_path: str) -> str:
+    """Extract text from PDF using pdfplumber, stopping once enough text is gathered."""
+    settings = get_settings()
+    return _join_pages(iter_pdf_pages(file_path, settings.MAX_PDF_PAGES, settings.PDF_MAX_CHARS_PER_PAGE))
+
+
+def _extract_from_pdf_pdfium(file_path: str) -> str:
+    """Extract text from PDF using PDFium's raw text layer (fast path)."""
+    settings = get_settings()
+    return _join_pages(iter_pdfium_pages(file_path, settings.MAX_PDF_PAGES, settings.PDF_MAX_CHARS_PER_PAGE))
 
 
 def _extract_from_docx(file_path: str) -> str:
@@ -42,3 +212,123 @@ def _extract_from_docx(file_path: str) -> str:
                 text_parts.append(row_text)
 
     return "\n".join(text_parts)
+
+
+def _docx_main_part(archive: zipfile.ZipFile) -> str:
+    """Name of the main document part, normally ``word/document.xml``."""
+    try:
+        rels = ElementTree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type", "").endswith(_OFFICE_DOCUMENT_REL):
+            return rel.get("Target", "").lstrip("/")
+    return "word/document.xml"
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for child in run:
+        if child.tag == _W + "t":
+            parts.append(child.text or "")
+        elif child.tag == _W + "br":
+            # Page and column breaks carry no text
+            parts.append("\n" if child.get(_W + "type", "textWrapping") == "textWrapping" else "")
+        else:
+            parts.append(_RUN_SPECIAL_CHARS.get(child.tag, ""))
+    return "".join(parts)
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Text of the paragraph's own runs and hyperlinks, as ``Paragraph.text`` reads it."""
+    parts = []
+    for child in paragraph:
+        if child.tag == _W + "r":
+            parts.append(_docx_run_text(child))
+        elif child.tag == _W + "hyperlink":
+            parts.extend(_docx_run_text(run) for run in child if run.tag == _W + "r")
+    return "".join(parts)
+
+
+def _docx_grid_before(row) -> int:
+    """Grid columns skipped before the row's first cell (``w:gridBefore``)."""
+    properties = row.find(_W + "trPr")
+    before = properties.find(_W + "gridBefore") if properties is not None else None
+    return int(before.get(_W + "val", 0)) if before is not None else 0
+
+
+def _docx_table_rows(table) -> Iterator[str]:
+    """Yield ``"cell | cell"`` for each row, repeating merged cells like python-docx does.
+
+    Cells are laid out by grid column within their own row, so tables without
+    a ``w:tblGrid`` and rows of different widths (``w:gridSpan``,
+    ``w:gridBefore``) keep all their text. A vertically merged cell repeats
+    the text above it in the same column.
+    """
+    above = []  # cell text per grid column of the previous row
+    for row in table:
+        if row.tag != _W + "tr":
+            continue
+        cells = [""] * _docx_grid_before(row)
+        for cell in row:
+            if cell.tag != _W + "tc":
+                continue
+            properties = cell.find(_W + "tcPr")
+            span = properties.find(_W + "gridSpan") if properties is not None else None
+            merge = properties.find(_W + "vMerge") if properties is not None else None
+            grid_span = int(span.get(_W + "val", 1)) if span is not None else 1
+            continues_above = merge is not None and merge.get(_W + "val", "continue") == "continue"
+            text = "\n".join(_docx_paragraph_text(p) for p in cell if p.tag == _W + "p")
+            for _ in range(grid_span):
+                if continues_above:
+                    column = len(cells)
+                    cells.append(above[column] if column < len(above) else "")
+                else:
+                    cells.append(text)
+        above = cells
+        yield " | ".join(text.strip() for text in cells if text.strip())
+
+
+def iter_docx_blocks(file_path: str) -> Iterator[tuple[str, str]]:
+    """Yield ``("paragraph", text)`` and ``("row", text)`` for a DOCX body in document order.
+
+    The document XML is parsed incrementally straight out of the zip, and each
+    top-level paragraph or table is dropped as soon as it has been read.
+    """
+    with zipfile.ZipFile(file_path) as archive, archive.open(_docx_main_part(archive)) as xml:
+        depth = 0
+        body = None
+        for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    body = element
+                continue
+            depth -= 1
+            if depth != 2:
+                continue
+            # A direct child of w:body is complete
+            if element.tag == _W + "p":
+                text = _docx_paragraph_text(element)
+                if text.strip():
+                    yield "paragraph", text
+            elif element.tag == _W + "tbl":
+                for row_text in _docx_table_rows(element):
+                    if row_text:
+                        yield "row", row_text
+            body.remove(element)
+
+
+def _extract_from_docx_xml(file_path: str) -> str:
+    """Extract text from DOCX by streaming its XML; same output as ``_extract_from_docx``."""
+    paragraphs, rows = [], []
+    for kind, text in iter_docx_blocks(file_path):
+        (paragraphs if kind == "paragraph" else rows).append(text)
+    return "\n".join(paragraphs + rows)
+
+
+if pdfium is not None:
+    register_backend("pdf", "pdfium", _extract_from_pdf_pdfium)
+register_backend("pdf", "pdfplumber", _extract_from_pdf)
+register_backend("docx", "docx-xml", _extract_from_docx_xml)
+register_backend("docx", "python-docx", _extract_from_docx)
@@ -1,21 +1,55 @@
 """Ranking Engine - Scores and ranks candidates against job requirements."""
 
+import zlib
+from typing import Optional
+import numpy as np
+from scipy import sparse
 from app.ai.matcher import (
-    compute_similarity,
-    compute_skill_match,
-    compute_experience_score,
+    EXPERIENCE_RELEVANCE_POINTS,
+    RunSimilarity,
+    SkillBitsets,
+    compute_experience_scores,
     compute_education_score,
     compute_certification_score,
 )
+from app.ai.skill_taxonomy import get_skill_taxonomy
+from app.ai.text_vectors import (
+    N_FEATURES,
+    CandidateVectors,
+    DocumentFrequencies,
+    experience_text,
+    profile_text,
+    term_counts,
+    tfidf_rows,
+)
 from app.config import get_settings
 
+# Share of the overall score that comes from profile similarity
+SEMANTIC_BLEND = 0.2
+
+# Hashed skill columns of retrieval features, after the N_FEATURES term columns
+SKILL_FEATURES = 2**16
+RETRIEVAL_FEATURES = N_FEATURES + SKILL_FEATURES
+
 
-def rank_candidates(job, candidates: list) -> list[dict]:
+def job_text(job) -> str:
+    return f"{job.title} {job.description} {job.requirements or ''}"
+
+
+def rank_candidates(
+    job,
+    candidates: list,
+    vectors: Optional[CandidateVectors] = None,
+    frequencies: Optional[DocumentFrequencies] = None,
+) -> list[dict]:
     """Rank candidates for a given job posting.
 
     Args:
         job: Job model instance with title, description, skills_required, etc.
         candidates: List of Candidate model instances.
+        vectors: Stored term counts of the candidates (``load_candidate_vectors``)
+            and the corpus ``frequencies`` to weight them with. Without them the
+            candidate texts are vectorized for this run only.
 
     Returns:
         List of ranking result dictionaries, sorted by overall_score descending.
@@ -23,23 +57,35 @@ def rank_candidates(job, candidates: list) -> list[dict]:
     settings = get_settings()
     results = []
 
-    job_text = f"{job.title} {job.description} {job.requirements or ''}"
+    text = job_text(job)
     job_skills = job.skills_required or []
 
-    for candidate in candidates:
-        # 1. Skill matching
-        skill_result = compute_skill_match(
-            candidate.skills or [],
-            job_skills,
+    # Similarity of every profile text and every experience entry to the job
+    # text, each as one sparse product
+    if vectors is not None:
+        semantic_sims, relevances = vectors.similarities(text, frequencies)
+    else:
+        similarity = RunSimilarity(text, [profile_text(c) for c in candidates])
+        semantic_sims = similarity.candidate_scores
+        relevances = similarity.scores(
+            [experience_text(exp) for candidate in candidates for exp in candidate.experience or []]
         )
-        skill_score = skill_result["score"]
 
-        # 2. Experience scoring
-        experience_score = compute_experience_score(
-            candidate.experience or [],
-            job_text,
-            job.min_experience_years,
-        )
+    # Every candidate's experience score at once, summing entry relevances per owner
+    experience_scores = compute_experience_scores([c.experience or [] for c in candidates], relevances)
+
+    # Every candidate's skill score from one AND + popcount over packed bitsets
+    skills = SkillBitsets([c.skills or [] for c in candidates], job_skills)
+    skill_scores = skills.scores()
+
+    for row, (candidate, semantic_sim, experience_score, skill_score) in enumerate(zip(
+        candidates, semantic_sims.tolist(), experience_scores.tolist(), skill_scores.tolist()
+    )):
+        # 1. Skill matching: score computed above, names decoded for this candidate
+        skill_score = round(skill_score, 2)
+        skill_result = skills.match(row)
+
+        # 2. Experience scoring was computed above for all candidates
 
         # 3. Education scoring
         education_score = compute_education_score(
@@ -52,15 +98,7 @@ def rank_candidates(job, candidates: list) -> list[dict]:
             candidate.certifications or [],
         )
 
-        # 5. Semantic similarity (CV summary vs job description)
-        candidate_text = candidate.summary or ""
-        if candidate.skills:
-            candidate_text += " " + " ".join(candidate.skills)
-        if candidate.experience:
-            for exp in candidate.experience:
-                candidate_text += f" {exp.get('title', '')} {exp.get('description', '')}"
-
-        semantic_sim = compute_similarity(candidate_text, job_text)
+        # 5. Semantic similarity (CV summary vs job description) was computed above
 
         # 6. Weighted overall score
         overall_score = (
@@ -71,7 +109,7 @@ def rank_candidates(job, candidates: list) -> list[dict]:
         )
 
         # Boost with semantic similarity
-        overall_score = overall_score * 0.8 + (semantic_sim * 100) * 0.2
+        overall_score = overall_score * (1 - SEMANTIC_BLEND) + (semantic_sim * 100) * SEMANTIC_BLEND
 
         # Generate explanation
         explanation = _generate_explanation(
@@ -103,6 +141,77 @@ def rank_candidates(job, candidates: list) -> list[dict]:
     return results
 
 
+def _skill_column(key) -> int:
+    return N_FEATURES + zlib.crc32(str(key).encode()) % SKILL_FEATURES
+
+
+def retrieval_features(
+    candidates: list,
+    vectors: CandidateVectors,
+    frequencies: DocumentFrequencies,
+) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Feature rows and biases for ``CandidateIndex``, one per candidate.
+
+    The overall score of ``rank_candidates`` is linear in everything that
+    depends on the job: profile similarity and the summed similarity of the
+    experience entries (dot products with the job's TF-IDF vector), and the
+    share of required skills a candidate has. Those go into the rows, the
+    job-independent rest (education, certifications, experience count and
+    recency) into the bias, so ``row · retrieval_query(job) + bias`` is the
+    overall score, except where the experience score is capped at 100. For a
+    job without required skills the rows give no skill points where
+    ``rank_candidates`` gives everyone full points: candidates keep their order,
+    and such a job gets no skill credit when scores are compared across jobs.
+    """
+    settings = get_settings()
+    taxonomy = get_skill_taxonomy()
+    idf = sparse.diags(frequencies.idf())
+    blend = 1 - SEMANTIC_BLEND
+
+    owners = np.repeat(np.arange(len(candidates)), np.diff(vectors.entry_offsets))
+    entry_sums = sparse.csr_matrix(
+        (np.ones(len(owners), dtype=np.float32), (owners, np.arange(len(owners)))),
+        shape=(len(candidates), vectors.entries.shape[0]),
+    ) @ tfidf_rows(vectors.entries, idf)
+    text = (
+        tfidf_rows(vectors.profiles, idf) * (SEMANTIC_BLEND * 100)
+        + entry_sums * (blend * settings.EXPERIENCE_WEIGHT * EXPERIENCE_RELEVANCE_POINTS)
+    )
+
+    rows, columns = [], []
+    for row, candidate in enumerate(candidates):
+        for column in {_skill_column(key) for key in taxonomy.keys(candidate.skills or [])}:
+            rows.append(row)
+            columns.append(column)
+    skills = sparse.csr_matrix(
+        (np.full(len(rows), blend * settings.SKILL_WEIGHT * 100, dtype=np.float32), (rows, columns)),
+        shape=(len(candidates), RETRIEVAL_FEATURES),
+    )
+    text.resize((len(candidates), RETRIEVAL_FEATURES))
+
+    experience = [c.experience or [] for c in candidates]
+    bias = blend * (
+        settings.EXPERIENCE_WEIGHT * compute_experience_scores(experience, np.zeros(len(owners)))
+        + settings.EDUCATION_WEIGHT * np.array([compute_education_score(c.education or []) for c in candidates])
+        + settings.CERTIFICATION_WEIGHT * np.array([compute_certification_score(c.certifications or []) for c in candidates])
+    )
+    return (text + skills).tocsr(), bias.astype(np.float32)
+
+
+def retrieval_query(job, frequencies: DocumentFrequencies) -> sparse.csr_matrix:
+    """The query row matching ``retrieval_features``."""
+    text = tfidf_rows(term_counts([job_text(job)]), sparse.diags(frequencies.idf()))
+    required = get_skill_taxonomy().resolve(job.skills_required or [])
+    columns = sorted({_skill_column(key) for key in required})
+    skills = sparse.csr_matrix(
+        (np.full(len(columns), 1 / len(required) if required else 0.0, dtype=np.float32),
+         (np.zeros(len(columns), dtype=np.int64), columns)),
+        shape=(1, RETRIEVAL_FEATURES),
+    )
+    text.resize((1, RETRIEVAL_FEATURES))
+    return (text + skills).tocsr()
+
+
 def _generate_explanation(
     skill_score: float,
     experience_score: float,
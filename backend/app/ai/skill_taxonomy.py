@@ -0,0 +1,96 @@
+"""Canonical skill taxonomy.
+
+Each skill has an integer id, a display name, a category and the aliases it is
+written as in CVs and job postings ("react", "reactjs", "react.js" are all
+React). CV extraction and job requirements both resolve names through the
+same table, so a skill match is an exact intersection of id sets.
+
+The taxonomy is read from ``app/ai/data/skill_taxonomy.json`` unless
+``SKILL_TAXONOMY_PATH`` points to another file of the same shape.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional, Union
+from app.config import get_settings
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skill_taxonomy.json")
+
+# Skills missing from the taxonomy are keyed by their normalized name instead
+SkillKey = Union[int, str]
+
+
+class Skill(NamedTuple):
+    id: int
+    name: str
+    category: str
+    aliases: tuple[str, ...]  # normalized, including the normalized name
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercase and collapse whitespace, the form aliases are stored in."""
+    return " ".join((name or "").split()).lower()
+
+
+class SkillTaxonomy:
+    def __init__(self, skills: Iterable[dict], version: int = 1):
+        self.version = version
+        self.skills: dict[int, Skill] = {}
+        self.alias_to_id: dict[str, int] = {}
+
+        for entry in skills:
+            skill_id, name = entry.get("id"), (entry.get("name") or "").strip()
+            if not isinstance(skill_id, int) or not name:
+                raise ValueError(f"Skill entry needs an integer id and a name: {entry!r}")
+            if skill_id in self.skills:
+                raise ValueError(f"Duplicate skill id {skill_id}")
+            aliases = []
+            for alias in [name, *entry.get("aliases", [])]:
+                alias = normalize_skill(alias)
+                owner = self.alias_to_id.setdefault(alias, skill_id)
+                if owner != skill_id:
+                    raise ValueError(f"Alias {alias!r} belongs to both skill {owner} and skill {skill_id}")
+                if alias not in aliases:
+                    aliases.append(alias)
+            self.skills[skill_id] = Skill(skill_id, name, entry.get("category", ""), tuple(aliases))
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["skills"], version=data.get("version", 1))
+
+    def lookup(self, name: str) -> Optional[Skill]:
+        skill_id = self.alias_to_id.get(normalize_skill(name))
+        return self.skills[skill_id] if skill_id is not None else None
+
+    def resolve(self, names: Iterable[str]) -> dict[SkillKey, str]:
+        """Map names to ``{key: display name}``, first occurrence first.
+
+        Known skills are keyed by id and shown under their canonical name;
+        unknown ones are keyed by their normalized text and shown as written.
+        """
+        resolved = {}
+        for name in names or []:
+            name = " ".join((name or "").split())
+            if not name:
+                continue
+            skill = self.lookup(name)
+            if skill:
+                resolved.setdefault(skill.id, skill.name)
+            else:
+                resolved.setdefault(normalize_skill(name), name)
+        return resolved
+
+    def keys(self, names: Iterable[str]) -> set[SkillKey]:
+        return set(self.resolve(names))
+
+    def canonicalize(self, names: Iterable[str]) -> list[str]:
+        """Canonical display names, deduplicated, in input order."""
+        return list(self.resolve(names).values())
+
+
+@lru_cache()
+def get_skill_taxonomy() -> SkillTaxonomy:
+    return SkillTaxonomy.from_file(get_settings().SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
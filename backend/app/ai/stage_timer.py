@@ -0,0 +1,108 @@
+"""CV ingestion stage timing.
+
+A ``StageTimer`` follows one document through the pipeline and collects how
+long each stage took (``save``, ``extract_text``, ``preprocess``,
+``extract_entities.<field>``, ``encrypt``, ``db_commit``...). ``finish()`` adds
+the durations to process-wide histograms, served by ``/admin/metrics``, and logs
+the document if it went over ``SLOW_DOCUMENT_SECONDS``. The copy stored on the
+resume row is taken before the commit that writes it, so it has no ``db_commit``.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is unbounded
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_histograms: dict[str, dict] = {}
+
+
+class StageTimer:
+    def __init__(self, document: str = ""):
+        self.document = document
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_extraction(self, extraction):
+        """Record an ``ExtractionResult``: the whole call plus each backend it tried."""
+        self.add("extract_text", extraction.seconds)
+        for attempt in extraction.attempts:
+            self.add(f"extract_text.{attempt['engine']}", attempt["seconds"])
+
+    def as_dict(self) -> dict[str, float]:
+        """Stage durations in seconds, rounded for storage on the resume."""
+        return {name: round(seconds, 4) for name, seconds in self.stages.items()}
+
+    def total(self) -> float:
+        # Sub-stages ("extract_entities.skills") are already part of their parent
+        return sum(seconds for name, seconds in self.stages.items() if "." not in name)
+
+    def finish(self):
+        """Record the stages in the histograms and log the document if it was slow."""
+        for name, seconds in self.stages.items():
+            _observe(name, seconds)
+        budget = get_settings().SLOW_DOCUMENT_SECONDS
+        total = self.total()
+        if budget and total > budget:
+            top_level = {name: s for name, s in self.stages.items() if "." not in name} or self.stages
+            slowest = max(top_level, key=top_level.get)
+            logger.warning(
+                "Slow CV %r: %.2fs (budget %.2fs), mostly in %s (%.2fs); stages: %s",
+                self.document, total, budget, slowest, self.stages[slowest], self.as_dict(),
+            )
+
+
+def _observe(stage: str, seconds: float):
+    ms = seconds * 1000
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = {
+                "count": 0,
+                "sum_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+            }
+        histogram["count"] += 1
+        histogram["sum_ms"] += ms
+        histogram["max_ms"] = max(histogram["max_ms"], ms)
+        histogram["buckets"][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+
+def get_stage_histograms() -> dict:
+    """Per-stage count, mean/max in ms and bucket counts keyed by upper bound ("le")."""
+    with _lock:
+        snapshot = {name: dict(h, buckets=list(h["buckets"])) for name, h in _histograms.items()}
+    labels = [str(bound) for bound in BUCKETS_MS] + ["inf"]
+    result = {}
+    for name, h in sorted(snapshot.items()):
+        result[name] = {
+            "count": h["count"],
+            "mean_ms": round(h["sum_ms"] / h["count"], 3),
+            "max_ms": round(h["max_ms"], 3),
+            "buckets": dict(zip(labels, h["buckets"])),
+        }
+    return result
+
+
+def reset_stage_histograms():
+    """Drop all recorded timings (used by tests)."""
+    with _lock:
+        _histograms.clear()
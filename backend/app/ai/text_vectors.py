@@ -0,0 +1,106 @@
+"""Hashed TF-IDF vectors for candidate texts.
+
+Terms (unigrams and bigrams, English stop words removed) are hashed into
+``N_FEATURES`` columns, so a candidate's term counts can be computed once, on
+their own, and stored (``CandidateVector``). IDF comes from document
+frequencies kept up to date as candidates are stored (``TermDocumentFrequency``),
+so ranking a job only needs the stored counts, one IDF vector and a sparse
+product against the job vector.
+"""
+
+import hashlib
+import json
+from typing import NamedTuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+N_FEATURES = 2**18
+
+_hasher = HashingVectorizer(
+    n_features=N_FEATURES,
+    ngram_range=(1, 2),
+    stop_words="english",
+    alternate_sign=False,
+    norm=None,
+    dtype=np.float32,
+)
+
+
+def profile_text(candidate) -> str:
+    """Summary, skills and experience titles/descriptions, compared with the job text."""
+    text = candidate.summary or ""
+    if candidate.skills:
+        text += " " + " ".join(candidate.skills)
+    if candidate.experience:
+        for exp in candidate.experience:
+            text += f" {exp.get('title', '')} {exp.get('description', '')}"
+    return text
+
+
+def experience_text(exp: dict) -> str:
+    return f"{exp.get('title', '')} {exp.get('company', '')} {exp.get('description', '')}"
+
+
+def candidate_texts(candidate) -> list[str]:
+    """The texts a candidate is vectorized from: profile first, then each experience entry."""
+    return [profile_text(candidate), *(experience_text(exp) for exp in candidate.experience or [])]
+
+
+def text_hash(texts: list[str]) -> str:
+    return hashlib.sha256(json.dumps(texts, ensure_ascii=False).encode()).hexdigest()
+
+
+def term_counts(texts: list[str]) -> sparse.csr_matrix:
+    """Hashed term counts, one row per text."""
+    return _hasher.transform(texts).tocsr()
+
+
+class DocumentFrequencies(NamedTuple):
+    counts: np.ndarray  # per hashed term, candidate profiles containing it
+    documents: int  # candidate profiles counted
+
+    def idf(self) -> np.ndarray:
+        # Same smoothing as TfidfVectorizer(smooth_idf=True)
+        return (np.log((1 + self.documents) / (1 + self.counts)) + 1).astype(np.float32)
+
+
+def tfidf_rows(counts: sparse.csr_matrix, idf: sparse.dia_matrix) -> sparse.csr_matrix:
+    """L2-normalized TF-IDF rows of term counts; ``idf`` is ``sparse.diags(frequencies.idf())``."""
+    weighted = (counts @ idf).tocsr()
+    # normalize() rejects matrices without rows (a run where nobody lists experience)
+    return normalize(weighted) if weighted.shape[0] else weighted
+
+
+class CandidateVectors(NamedTuple):
+    """Stored term counts for the candidates of a ranking run, in candidate order."""
+
+    profiles: sparse.csr_matrix  # one row per candidate
+    entries: sparse.csr_matrix  # one row per experience entry, candidates in order
+    entry_offsets: np.ndarray  # candidate i's entries are rows entry_offsets[i]:entry_offsets[i + 1]
+
+    def similarities(self, job_text: str, frequencies: DocumentFrequencies) -> tuple[np.ndarray, np.ndarray]:
+        """Cosine similarity of every profile and every experience entry to ``job_text``."""
+        idf = sparse.diags(frequencies.idf())
+        job = tfidf_rows(term_counts([job_text]), idf)
+        profiles = tfidf_rows(self.profiles, idf) @ job.T
+        entries = tfidf_rows(self.entries, idf) @ job.T
+        return profiles.toarray().ravel(), entries.toarray().ravel()
+
+
+def encode(matrix: sparse.csr_matrix) -> dict:
+    """Column values of a ``CandidateVector`` row for a small CSR matrix."""
+    return {
+        "indptr": matrix.indptr.astype(np.int32).tobytes(),
+        "indices": matrix.indices.astype(np.int32).tobytes(),
+        "counts": matrix.data.astype(np.float32).tobytes(),
+    }
+
+
+def decode(indptr: bytes, indices: bytes, counts: bytes) -> sparse.csr_matrix:
+    indptr = np.frombuffer(indptr, dtype=np.int32)
+    return sparse.csr_matrix(
+        (np.frombuffer(counts, dtype=np.float32), np.frombuffer(indices, dtype=np.int32), indptr),
+        shape=(len(indptr) - 1, N_FEATURES),
+    )
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -10,9 +11,21 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "change-this-to-a-long-random-secret-key-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 1440
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 1024
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     # Encryption
     ENCRYPTION_KEY: str = "change-this-to-a-32-byte-key-in-production-1234"
+    ENCRYPTION_KEY_VERSION: int = 1
+    ENCRYPTION_RETIRED_KEYS: str = ""  # "version:key,version:key" - decrypt only
+    BLIND_INDEX_KEY: str = "change-this-blind-index-key-in-production"
+    KEY_ROTATION_BATCH_SIZE: int = 200
+    KEY_ROTATION_MAX_ROWS_PER_SEC: int = 500  # 0 disables throttling
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -20,6 +33,23 @@ class Settings(BaseSettings):
     # Upload
     UPLOAD_DIR: str = "../uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 65536  # bytes copied per read while storing an upload
+
+    # CV text extraction (process pool)
+    EXTRACTION_WORKERS: Optional[int] = None  # None = one per CPU, 0 = in-process
+    EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    EXTRACTION_MAX_MEMORY_MB: int = 1024
+    EXTRACTION_MAX_TASKS_PER_CHILD: int = 50
+    MAX_PDF_PAGES: int = 10  # 0 = no limit
+    PDF_MAX_CHARS_PER_PAGE: int = 10000
+    PDF_TARGET_CHARS: int = 40000  # stop reading pages once this much text is gathered
+    PDF_BACKENDS: str = "pdfium,pdfplumber"  # tried in order, falling back on degenerate text
+    DOCX_BACKENDS: str = "docx-xml"  # or "python-docx" to build the full object model
+    EXTRACTION_MIN_CHARS: int = 200  # fast-backend output shorter than this falls back
+    SLOW_DOCUMENT_SECONDS: float = 5.0  # ingestion time per CV before it is logged as slow
+    SKILL_TAXONOMY_PATH: str = ""  # empty = bundled app/ai/data/skill_taxonomy.json
+    REEXTRACTION_BATCH_SIZE: int = 200  # resumes per committed batch of the re-extraction job
+    REEXTRACTION_WORKERS: Optional[int] = None  # None = one per CPU, 0 = in-process
 
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:3001,http://localhost:3002"
@@ -34,6 +64,18 @@ class Settings(BaseSettings):
     EDUCATION_WEIGHT: float = 0.20
     CERTIFICATION_WEIGHT: float = 0.10
 
+    # Two-stage ranking: approximate retrieval of the top N, then full scoring
+    RANKING_RETRIEVAL_TOP_N: int = 0  # 0 = score every candidate
+    RETRIEVAL_INDEX_LISTS: int = 1  # > 1 clusters the index (IVF) for very large pools
+    # Lists scanned per search, 0 = half of them. On 20k candidates (bench_retrieval)
+    # half keeps recall@50 >= 0.9 at about the cost of a flat search; one in four
+    # is ~40% faster at 0.7-1.0 recall, one in eight ~60% faster at 0.3-0.9.
+    RETRIEVAL_INDEX_PROBES: int = 0
+
+    # Reverse matching: open jobs recommended for a candidate
+    JOB_MATCH_LIMIT: int = 10
+    PUBLIC_JOB_RECOMMENDATIONS: int = 3  # shown to applicants after applying, 0 = none
+
     class Config:
         env_file = ".env"
         extra = "allow"
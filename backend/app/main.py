@@ -1,8 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.database import engine, Base
-from app.routers import auth, candidates, jobs, upload, ranking, analytics, public
+from app.database import engine, Base, add_missing_columns
+from app.ai.extraction_engine import extraction_engine
+from app.routers import auth, candidates, jobs, upload, ranking, analytics, public, admin
 
 settings = get_settings()
 
@@ -31,12 +32,19 @@ app.include_router(upload.router, prefix="/api")
 app.include_router(ranking.router, prefix="/api")
 app.include_router(analytics.router, prefix="/api")
 app.include_router(public.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 
 @app.on_event("startup")
 async def startup():
     # Create tables
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    extraction_engine.shutdown()
 
 
 @app.get("/api/health")
@@ -1,7 +1,10 @@
 from app.models.user import User
-from app.models.candidate import Candidate
+from app.models.candidate import Candidate, CandidateNameToken
 from app.models.job import Job
 from app.models.resume import Resume
 from app.models.ranking import Ranking, AuditLog
+from app.models.checkpoint import JobCheckpoint
+from app.models.candidate_vector import CandidateVector, TermDocumentFrequency
 
-__all__ = ["User", "Candidate", "Job", "Resume", "Ranking", "AuditLog"]
+__all__ = ["User", "Candidate", "CandidateNameToken", "Job", "Resume", "Ranking", "AuditLog", "JobCheckpoint",
+           "CandidateVector", "TermDocumentFrequency"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, LargeBinary, JSON, Text, String, Boolean, Date, DateTime
+from sqlalchemy import Column, Integer, LargeBinary, JSON, Text, String, Boolean, Date, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -11,6 +11,10 @@ class Candidate(Base):
     full_name_encrypted = Column(LargeBinary)
     email_encrypted = Column(LargeBinary)
     phone_encrypted = Column(LargeBinary)
+    # Blind indexes (HMAC of normalized PII) for exact-match lookups
+    email_bidx = Column(String(64), index=True)
+    phone_bidx = Column(String(64), index=True)
+    name_bidx = Column(String(64), index=True)
     skills = Column(JSON)
     experience = Column(JSON)
     education = Column(JSON)
@@ -20,7 +24,18 @@ class Candidate(Base):
     consent_given = Column(Boolean, default=False)
     data_retention_until = Column(Date)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
 
     resumes = relationship("Resume", back_populates="candidate", cascade="all, delete-orphan")
     rankings = relationship("Ranking", back_populates="candidate", cascade="all, delete-orphan")
+    name_tokens = relationship("CandidateNameToken", cascade="all, delete-orphan")
+
+
+class CandidateNameToken(Base):
+    """One blind-indexed word of a candidate's name, for partial name search."""
+
+    __tablename__ = "candidate_name_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_bidx = Column(String(64), nullable=False, index=True)
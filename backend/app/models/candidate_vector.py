@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+# MEDIUMBLOB on MySQL; a plain BLOB (64 KB) is too small for the longest CVs
+_BLOB_LENGTH = 2**24 - 1
+
+
+class CandidateVector(Base):
+    """Hashed term counts of a candidate's profile and experience texts.
+
+    A small CSR matrix (see ``app.ai.text_vectors``): row 0 is the profile text,
+    the following rows are the experience entries in order. ``text_hash``
+    identifies the texts it was computed from, so it is rewritten only when
+    they change.
+    """
+
+    __tablename__ = "candidate_vectors"
+
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    text_hash = Column(String(64), nullable=False)
+    indptr = Column(LargeBinary(_BLOB_LENGTH), nullable=False)  # int32 row offsets
+    indices = Column(LargeBinary(_BLOB_LENGTH), nullable=False)  # int32 term ids
+    counts = Column(LargeBinary(_BLOB_LENGTH), nullable=False)  # float32 term counts
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
+
+
+class TermDocumentFrequency(Base):
+    """Number of stored candidate profiles containing each hashed term."""
+
+    __tablename__ = "term_document_frequencies"
+
+    term_id = Column(Integer, primary_key=True, autoincrement=False)
+    document_count = Column(Integer, nullable=False, default=0)
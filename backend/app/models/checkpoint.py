@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, JSON, Enum, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class JobCheckpoint(Base):
+    """Progress marker for resumable batch jobs (key rotation, backfills)."""
+
+    __tablename__ = "job_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False)
+    last_id = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    status = Column(Enum("running", "completed", "failed"), default="running")
+    details = Column(JSON)
+    started_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
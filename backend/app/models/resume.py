@@ -12,8 +12,14 @@ class Resume(Base):
     file_path = Column(String(500))
     file_type = Column(Enum("pdf", "docx"))
     file_size = Column(Integer)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the file
     raw_text = Column(Text)
     parsed_data = Column(JSON)
+    extraction_engine = Column(String(30))  # backend that produced raw_text
+    extraction_stats = Column(JSON)  # {"seconds": ..., "attempts": [...]} per backend tried
+    # Seconds per ingestion stage up to the insert, see app.ai.stage_timer. The row
+    # is written by the commit it would time, so db_commit is only in the histograms.
+    stage_timings = Column(JSON)
     processing_status = Column(
         Enum("pending", "processing", "completed", "failed"),
         default="pending",
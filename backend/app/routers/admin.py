@@ -0,0 +1,73 @@
+"""Admin-only maintenance endpoints: background jobs and runtime metrics."""
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.ai.stage_timer import get_stage_histograms
+from app.models.user import User
+from app.security.jwt_handler import get_current_user
+from app.security.keyring import get_keyring_stats
+from app.security.principal_cache import principal_cache
+from app.security.permissions import check_role
+from app.tasks.key_rotation import get_rotation_status, rotate_candidate_keys
+from app.tasks.reextraction import get_reextraction_status, reextract_stale_resumes
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    check_role(current_user, "admin")
+    return {
+        "keyring": get_keyring_stats(),
+        "principal_cache": principal_cache.stats(),
+        "ingestion_stages": get_stage_histograms(),
+    }
+
+
+@router.get("/key-rotation")
+async def get_key_rotation(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_role(current_user, "admin")
+    return get_rotation_status(db)
+
+
+@router.post("/key-rotation", status_code=202)
+async def start_key_rotation(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_role(current_user, "admin")
+    status = get_rotation_status(db)
+    if status["running"]:
+        raise HTTPException(status_code=409, detail="Rotasi kunci sedang berjalan")
+
+    background_tasks.add_task(rotate_candidate_keys)
+    return {"message": f"Rotasi kunci ke versi {status['key_version']} dimulai", **status}
+
+
+@router.get("/reextraction")
+async def get_reextraction(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_role(current_user, "admin")
+    return get_reextraction_status(db)
+
+
+@router.post("/reextraction", status_code=202)
+async def start_reextraction(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_role(current_user, "admin")
+    status = get_reextraction_status(db)
+    if status["running"]:
+        raise HTTPException(status_code=409, detail="Ekstraksi ulang sedang berjalan")
+
+    background_tasks.add_task(reextract_stale_resumes)
+    return {"message": f"Ekstraksi ulang CV ke versi ekstraktor {status['extractor_version']} dimulai", **status}
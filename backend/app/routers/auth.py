@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-import bcrypt
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, AuthResponse
 from app.security.jwt_handler import create_access_token, get_current_user
+from app.security.passwords import hash_password, needs_rehash, verify_password
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -18,7 +18,7 @@ async def register(data: UserCreate, db: Session = Depends(get_db)):
             detail="Email sudah terdaftar",
         )
 
-    password_hash = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
+    password_hash = await hash_password(data.password)
     user = User(
         email=data.email,
         password_hash=password_hash,
@@ -38,12 +38,18 @@ async def register(data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=AuthResponse)
 async def login(data: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == data.email).first()
-    if not user or not bcrypt.checkpw(data.password.encode(), user.password_hash.encode()):
+    if not user or not await verify_password(data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email atau password salah",
         )
 
+    # Upgrade hashes made with a different cost factor while we have the password
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password(data.password)
+        db.commit()
+        db.refresh(user)
+
     token = create_access_token(user.id)
     return AuthResponse(
         access_token=token,
@@ -1,51 +1,44 @@
 import json
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import or_, false
+from app.config import get_settings
 from app.database import get_db
-from app.models.candidate import Candidate
+from app.models.candidate import Candidate, CandidateNameToken
 from app.models.user import User
 from app.schemas.candidate import CandidateResponse, CandidateUpdate, PaginatedCandidates
+from app.schemas.job import JobMatchResponse
 from app.security.jwt_handler import get_current_user
-from app.security.encryption import decrypt_data
+from app.security.blind_index import email_index, name_token_indexes
 from app.security.permissions import check_role
 from app.models.ranking import AuditLog
+from app.services.candidate_vectors import remove_candidate_vectors, sync_candidate_vectors
+from app.services.candidate_view import candidate_to_response, decrypt_fields, load_columns, parse_fields
+from app.services.job_matches import match_jobs
 
 router = APIRouter(prefix="/candidates", tags=["Candidates"])
 
 
-def _candidate_to_response(candidate: Candidate) -> CandidateResponse:
-    return CandidateResponse(
-        id=candidate.id,
-        full_name=decrypt_data(candidate.full_name_encrypted) if candidate.full_name_encrypted else "",
-        email=decrypt_data(candidate.email_encrypted) if candidate.email_encrypted else "",
-        phone=decrypt_data(candidate.phone_encrypted) if candidate.phone_encrypted else None,
-        skills=candidate.skills or [],
-        experience=candidate.experience or [],
-        education=candidate.education or [],
-        certifications=candidate.certifications or [],
-        summary=candidate.summary,
-        source=candidate.source,
-        created_at=candidate.created_at,
-        updated_at=candidate.updated_at,
-    )
-
-
-@router.get("", response_model=PaginatedCandidates)
+@router.get("", response_model=PaginatedCandidates, response_model_exclude_unset=True)
 async def list_candidates(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     search: str = Query(None),
     skills: str = Query(None),
+    email: str = Query(None),
+    name: str = Query(None),
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc"),
+    fields: str = Query(None, description="Comma-separated candidate fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(Candidate)
+    selected = parse_fields(fields)
+    query = db.query(Candidate).options(load_only(*load_columns(selected)))
 
-    # Search by summary (can't search encrypted fields efficiently)
+    # Free-text search covers plaintext columns; encrypted PII goes through blind indexes
     if search:
         query = query.filter(
             or_(
@@ -60,6 +53,21 @@ async def list_candidates(
         for skill in skill_list:
             query = query.filter(Candidate.skills.cast(str).ilike(f"%{skill.strip()}%"))
 
+    # Exact-match lookups on encrypted PII via blind indexes
+    if email:
+        email_bidx = email_index(email)
+        query = query.filter(Candidate.email_bidx == email_bidx if email_bidx else false())
+    if name:
+        tokens = name_token_indexes(name)
+        if not tokens:
+            query = query.filter(false())
+        for token in tokens:
+            query = query.filter(
+                Candidate.id.in_(
+                    db.query(CandidateNameToken.candidate_id).filter(CandidateNameToken.token_bidx == token)
+                )
+            )
+
     total = query.count()
 
     # Sorting
@@ -72,9 +80,10 @@ async def list_candidates(
     # Pagination
     offset = (page - 1) * page_size
     candidates = query.offset(offset).limit(page_size).all()
+    pii_rows = await run_in_threadpool(decrypt_fields, candidates, selected)
 
     return PaginatedCandidates(
-        items=[_candidate_to_response(c) for c in candidates],
+        items=[candidate_to_response(c, pii, selected) for c, pii in zip(candidates, pii_rows)],
         total=total,
         page=page,
         page_size=page_size,
@@ -91,7 +100,7 @@ async def get_candidate(
     candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Kandidat tidak ditemukan")
-    return _candidate_to_response(candidate)
+    return candidate_to_response(candidate)
 
 
 @router.put("/{candidate_id}", response_model=CandidateResponse)
@@ -115,6 +124,7 @@ async def update_candidate(
 
     for key, value in update_data.items():
         setattr(candidate, key, value)
+    sync_candidate_vectors(db, [candidate])
 
     db.commit()
     db.refresh(candidate)
@@ -130,7 +140,7 @@ async def update_candidate(
     db.add(audit)
     db.commit()
 
-    return _candidate_to_response(candidate)
+    return candidate_to_response(candidate)
 
 
 @router.delete("/{candidate_id}")
@@ -154,11 +164,39 @@ async def delete_candidate(
     )
     db.add(audit)
 
+    remove_candidate_vectors(db, [candidate_id])
     db.delete(candidate)
     db.commit()
     return {"message": "Kandidat berhasil dihapus"}
 
 
+@router.get("/{candidate_id}/job-matches", response_model=list[JobMatchResponse])
+async def get_job_matches(
+    candidate_id: int,
+    limit: int = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Open jobs that suit this candidate best, highest approximate overall score first."""
+    check_role(current_user, "admin", "recruiter")
+    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Kandidat tidak ditemukan")
+
+    matches = match_jobs(db, candidate, limit or get_settings().JOB_MATCH_LIMIT)
+    return [
+        JobMatchResponse(
+            job_id=m.job.id,
+            title=m.job.title,
+            department=m.job.department,
+            score=m.score,
+            matched_skills=m.matched_skills,
+            missing_skills=m.missing_skills,
+        )
+        for m in matches
+    ]
+
+
 @router.get("/{candidate_id}/export")
 async def export_candidate_data(
     candidate_id: int,
@@ -170,7 +208,7 @@ async def export_candidate_data(
     if not candidate:
         raise HTTPException(status_code=404, detail="Kandidat tidak ditemukan")
 
-    response_data = _candidate_to_response(candidate)
+    response_data = candidate_to_response(candidate)
 
     # Audit log
     audit = AuditLog(
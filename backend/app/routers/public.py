@@ -1,7 +1,7 @@
 """Public API endpoints - no authentication required. For job applicants."""
 
+import logging
 import os
-import uuid
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -10,13 +10,20 @@ from app.models.job import Job
 from app.models.candidate import Candidate
 from app.models.resume import Resume
 from app.security.encryption import encrypt_data
+from app.security.blind_index import apply_blind_indexes
 from app.config import get_settings
-from app.ai.parser import extract_text
+from app.ai.extraction_engine import extraction_engine
 from app.ai.extractor import extract_entities
+from app.ai.stage_timer import StageTimer
+from app.services.candidate_vectors import sync_candidate_vectors
+from app.services.job_matches import match_jobs
+from app.services.resume_cache import find_parsed_resumes, reuse_parsed_data
+from app.services.upload_storage import FileTooLarge, save_upload
 from app.schemas.job import JobResponse
 
 router = APIRouter(prefix="/public", tags=["Public"])
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".pdf": "pdf", ".docx": "docx"}
 
@@ -70,57 +77,96 @@ async def apply_for_job(
     if not file_ext:
         raise HTTPException(status_code=400, detail="Tipe file tidak didukung. Gunakan PDF atau DOCX.")
 
-    # Validate file size
-    content = await file.read()
-    if len(content) > settings.MAX_FILE_SIZE:
+    # Save file, rejecting it as soon as it goes over the size limit
+    timer = StageTimer(file.filename or "")
+    try:
+        with timer.stage("save"):
+            stored = await save_upload(file, file_ext)
+    except FileTooLarge:
         raise HTTPException(status_code=400, detail="File terlalu besar (max 10MB)")
+    file_path, file_hash = stored.path, stored.content_hash
 
-    # Save file
-    file_id = str(uuid.uuid4())
-    file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}.{file_ext}")
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    # Parse CV
+    # Parse CV, reusing the result of an identical file parsed earlier
+    duplicate = find_parsed_resumes(db, [file_hash]).get(file_hash)
+    engine, extraction_stats = None, None
+    processing_status = "completed"
     try:
-        raw_text = extract_text(file_path, file_ext)
-        parsed_data = extract_entities(raw_text)
+        if duplicate:
+            raw_text = duplicate.raw_text
+            parsed_data = reuse_parsed_data(duplicate, timer)
+            engine = duplicate.extraction_engine
+        else:
+            extraction = await extraction_engine.extract(file_path, file_ext)
+            extraction_stats = extraction.stats()
+            timer.add_extraction(extraction)
+            if extraction.error:
+                raise ValueError(extraction.error)
+            raw_text = extraction.text
+            engine = extraction.engine
+            with timer.stage("extract_entities"):
+                parsed_data = extract_entities(raw_text, timer)
     except Exception:
+        # The application is still saved; a failed resume is never reused for its hash
         parsed_data = {}
         raw_text = ""
+        processing_status = "failed"
 
     # Create candidate with encrypted PII (use form data as primary, parsed as fallback)
-    candidate = Candidate(
-        full_name_encrypted=encrypt_data(full_name),
-        email_encrypted=encrypt_data(email),
-        phone_encrypted=encrypt_data(phone),
-        skills=parsed_data.get("skills", []),
-        experience=parsed_data.get("experience", []),
-        education=parsed_data.get("education", []),
-        certifications=parsed_data.get("certifications", []),
-        summary=parsed_data.get("summary", ""),
-        source="applicant_portal",
-        consent_given=True,
-    )
-    db.add(candidate)
-    db.flush()
+    with timer.stage("encrypt"):
+        candidate = Candidate(
+            full_name_encrypted=encrypt_data(full_name),
+            email_encrypted=encrypt_data(email),
+            phone_encrypted=encrypt_data(phone),
+            skills=parsed_data.get("skills", []),
+            experience=parsed_data.get("experience", []),
+            education=parsed_data.get("education", []),
+            certifications=parsed_data.get("certifications", []),
+            summary=parsed_data.get("summary", ""),
+            source="applicant_portal",
+            consent_given=True,
+        )
+    with timer.stage("blind_index"):
+        apply_blind_indexes(candidate, full_name, email, phone)
+    with timer.stage("db_flush"):
+        db.add(candidate)
+        db.flush()
+    with timer.stage("vectorize"):
+        sync_candidate_vectors(db, [candidate])
 
     # Create resume record
     resume = Resume(
         candidate_id=candidate.id,
         file_path=file_path,
         file_type=file_ext,
-        file_size=len(content),
+        file_size=stored.size,
+        content_hash=file_hash,
         raw_text=raw_text,
         parsed_data=parsed_data,
-        processing_status="completed",
+        extraction_engine=engine,
+        extraction_stats=extraction_stats,
+        stage_timings=timer.as_dict(),
+        processing_status=processing_status,
     )
     db.add(resume)
-    db.commit()
+    with timer.stage("db_commit"):
+        db.commit()
+    timer.finish()
+
+    # Other open jobs the applicant may also want to apply for. The application
+    # is already saved, so a failure here must not fail the request.
+    try:
+        recommended = match_jobs(db, candidate, settings.PUBLIC_JOB_RECOMMENDATIONS, exclude_job_ids=(job.id,))
+    except Exception:
+        logger.exception("Job recommendations failed for candidate %s", candidate.id)
+        db.rollback()
+        recommended = []
 
     return {
         "message": "Lamaran berhasil dikirim! Terima kasih telah melamar.",
         "candidate_id": candidate.id,
         "job_title": job.title,
+        "recommended_jobs": [
+            {"job_id": m.job.id, "title": m.job.title, "department": m.job.department, "score": m.score}
+            for m in recommended
+        ],
     }
@@ -1,8 +1,10 @@
 import io
 import csv
+import time
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from app.database import get_db
 from app.models.user import User
@@ -10,34 +12,26 @@ from app.models.job import Job
 from app.models.candidate import Candidate
 from app.models.resume import Resume
 from app.models.ranking import Ranking
-from app.schemas.ranking import RankingResponse, RunRankingRequest, RunRankingResponse
-from app.schemas.candidate import CandidateResponse
+from app.config import get_settings
+from app.schemas.ranking import RankingResponse, RetrievalRecallResponse, RunRankingRequest, RunRankingResponse
 from app.security.jwt_handler import get_current_user
-from app.security.encryption import decrypt_data
+from app.security.encryption import decrypt_many
+from app.services.candidate_retrieval import retrieve_candidates
+from app.services.candidate_vectors import load_candidate_vectors, load_document_frequencies
+from app.services.candidate_view import candidate_to_response, decrypt_fields, load_columns, parse_fields
 from app.security.permissions import check_role
-from app.ai.matcher import compute_similarity
+from app.ai.candidate_index import recall_at_k
 from app.ai.ranker import rank_candidates
 
 router = APIRouter(prefix="/ranking", tags=["Ranking"])
 
+EXPORT_CHUNK_SIZE = 500
 
-def _ranking_to_response(ranking: Ranking) -> RankingResponse:
+
+def _ranking_to_response(ranking: Ranking, pii: dict, fields: tuple = None) -> RankingResponse:
     candidate_resp = None
     if ranking.candidate:
-        candidate_resp = CandidateResponse(
-            id=ranking.candidate.id,
-            full_name=decrypt_data(ranking.candidate.full_name_encrypted) if ranking.candidate.full_name_encrypted else "",
-            email=decrypt_data(ranking.candidate.email_encrypted) if ranking.candidate.email_encrypted else "",
-            phone=decrypt_data(ranking.candidate.phone_encrypted) if ranking.candidate.phone_encrypted else None,
-            skills=ranking.candidate.skills or [],
-            experience=ranking.candidate.experience or [],
-            education=ranking.candidate.education or [],
-            certifications=ranking.candidate.certifications or [],
-            summary=ranking.candidate.summary,
-            source=ranking.candidate.source,
-            created_at=ranking.candidate.created_at,
-            updated_at=ranking.candidate.updated_at,
-        )
+        candidate_resp = candidate_to_response(ranking.candidate, pii, fields)
 
     return RankingResponse(
         id=ranking.id,
@@ -58,18 +52,7 @@ def _ranking_to_response(ranking: Ranking) -> RankingResponse:
     )
 
 
-@router.post("/run", response_model=RunRankingResponse)
-async def run_ranking(
-    request: RunRankingRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    check_role(current_user, "admin", "recruiter")
-
-    job = db.query(Job).filter(Job.id == request.job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Lowongan tidak ditemukan")
-
+def _completed_candidates(db: Session) -> list[Candidate]:
     # Get unique candidate IDs that have at least one completed resume
     # Using a subquery to avoid duplicate candidates from the join
     completed_candidate_ids = (
@@ -78,20 +61,41 @@ async def run_ranking(
         .distinct()
         .subquery()
     )
-    candidates = (
+    return (
         db.query(Candidate)
         .filter(Candidate.id.in_(completed_candidate_ids))
         .all()
     )
 
+
+@router.post("/run", response_model=RunRankingResponse)
+async def run_ranking(
+    request: RunRankingRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_role(current_user, "admin", "recruiter")
+
+    job = db.query(Job).filter(Job.id == request.job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Lowongan tidak ditemukan")
+
+    top_n = request.top_n if request.top_n is not None else get_settings().RANKING_RETRIEVAL_TOP_N
+    if top_n:
+        # Two-stage: only the top_n by approximate overall score get the full scoring
+        candidates = retrieve_candidates(db, job, top_n)
+    else:
+        candidates = _completed_candidates(db)
+
     if not candidates:
         raise HTTPException(
             status_code=400,
             detail="Tidak ada kandidat yang tersedia untuk di-ranking. Pastikan pelamar sudah mengupload CV.",
         )
 
-    # Run ranking
-    ranking_results = rank_candidates(job, candidates)
+    # Run ranking on the stored candidate vectors (written here if missing or stale)
+    vectors = load_candidate_vectors(db, candidates)
+    ranking_results = rank_candidates(job, candidates, vectors, load_document_frequencies(db))
 
     # Delete old rankings for this job, then save new ones
     db.query(Ranking).filter(Ranking.job_id == request.job_id).delete(synchronize_session=False)
@@ -124,38 +128,83 @@ async def run_ranking(
     )
 
 
-@router.get("/job/{job_id}", response_model=list[RankingResponse])
+@router.get("/recall/{job_id}", response_model=RetrievalRecallResponse)
+async def get_retrieval_recall(
+    job_id: int,
+    top_k: int = Query(50, ge=1),
+    top_n: int = Query(None, ge=1, description="Candidates retrieved; default RANKING_RETRIEVAL_TOP_N"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """How much of the exhaustive top_k the two-stage ranking would keep. Nothing is saved."""
+    check_role(current_user, "admin", "recruiter")
+
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Lowongan tidak ditemukan")
+    top_n = top_n or get_settings().RANKING_RETRIEVAL_TOP_N or top_k * 10
+
+    start = time.perf_counter()
+    candidates = _completed_candidates(db)
+    exhaustive = rank_candidates(
+        job, candidates, load_candidate_vectors(db, candidates), load_document_frequencies(db),
+    )
+    exhaustive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    retrieved = retrieve_candidates(db, job, top_n)
+    retrieval_seconds = time.perf_counter() - start
+    db.commit()
+
+    return RetrievalRecallResponse(
+        job_id=job_id,
+        candidates=len(candidates),
+        top_k=top_k,
+        top_n=top_n,
+        recall=recall_at_k([r["candidate_id"] for r in exhaustive], [c.id for c in retrieved], top_k),
+        exhaustive_seconds=round(exhaustive_seconds, 4),
+        retrieval_seconds=round(retrieval_seconds, 4),
+    )
+
+
+@router.get("/job/{job_id}", response_model=list[RankingResponse], response_model_exclude_unset=True)
 async def get_rankings_by_job(
     job_id: int,
+    fields: str = Query(None, description="Comma-separated candidate fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    selected = parse_fields(fields)
     rankings = (
         db.query(Ranking)
-        .options(joinedload(Ranking.candidate))
+        .options(joinedload(Ranking.candidate).load_only(*load_columns(selected)))
         .filter(Ranking.job_id == job_id)
         .order_by(Ranking.rank_position)
         .all()
     )
-    return [_ranking_to_response(r) for r in rankings]
+    pii_rows = await run_in_threadpool(decrypt_fields, [r.candidate for r in rankings], selected)
+    return [_ranking_to_response(r, pii, selected) for r, pii in zip(rankings, pii_rows)]
 
 
-@router.get("/compare", response_model=list[RankingResponse])
+@router.get("/compare", response_model=list[RankingResponse], response_model_exclude_unset=True)
 async def compare_candidates(
     candidate_ids: str = Query(..., description="Comma-separated candidate IDs"),
     job_id: int = Query(...),
+    fields: str = Query(None, description="Comma-separated candidate fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    selected = parse_fields(fields)
     ids = [int(id.strip()) for id in candidate_ids.split(",")]
     rankings = (
         db.query(Ranking)
-        .options(joinedload(Ranking.candidate))
+        .options(joinedload(Ranking.candidate).load_only(*load_columns(selected)))
         .filter(Ranking.job_id == job_id, Ranking.candidate_id.in_(ids))
         .order_by(Ranking.rank_position)
         .all()
     )
-    return [_ranking_to_response(r) for r in rankings]
+    pii_rows = await run_in_threadpool(decrypt_fields, [r.candidate for r in rankings], selected)
+    return [_ranking_to_response(r, pii, selected) for r, pii in zip(rankings, pii_rows)]
 
 
 @router.get("/export/{job_id}")
@@ -167,7 +216,7 @@ async def export_rankings(
 ):
     rankings = (
         db.query(Ranking)
-        .options(joinedload(Ranking.candidate))
+        .options(joinedload(Ranking.candidate).load_only(Candidate.full_name_encrypted, Candidate.email_encrypted))
         .filter(Ranking.job_id == job_id)
         .order_by(Ranking.rank_position)
         .all()
@@ -182,18 +231,21 @@ async def export_rankings(
             "Similarity", "Skills Cocok", "Skills Kurang", "Penjelasan",
         ])
 
-        for r in rankings:
-            name = decrypt_data(r.candidate.full_name_encrypted) if r.candidate and r.candidate.full_name_encrypted else ""
-            email = decrypt_data(r.candidate.email_encrypted) if r.candidate and r.candidate.email_encrypted else ""
-            writer.writerow([
-                r.rank_position, name, email,
-                float(r.overall_score or 0), float(r.skill_score or 0),
-                float(r.experience_score or 0), float(r.education_score or 0),
-                float(r.certification_score or 0), float(r.semantic_similarity or 0),
-                ", ".join(r.matched_skills or []),
-                ", ".join(r.missing_skills or []),
-                r.explanation or "",
-            ])
+        for start in range(0, len(rankings), EXPORT_CHUNK_SIZE):
+            chunk = rankings[start:start + EXPORT_CHUNK_SIZE]
+            pii_rows = await run_in_threadpool(
+                decrypt_many, [r.candidate for r in chunk], ("full_name_encrypted", "email_encrypted"),
+            )
+            for r, pii in zip(chunk, pii_rows):
+                writer.writerow([
+                    r.rank_position, pii["full_name_encrypted"], pii["email_encrypted"],
+                    float(r.overall_score or 0), float(r.skill_score or 0),
+                    float(r.experience_score or 0), float(r.education_score or 0),
+                    float(r.certification_score or 0), float(r.semantic_similarity or 0),
+                    ", ".join(r.matched_skills or []),
+                    ", ".join(r.missing_skills or []),
+                    r.explanation or "",
+                ])
 
         output.seek(0)
         return StreamingResponse(
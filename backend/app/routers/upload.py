@@ -1,5 +1,4 @@
 import os
-import uuid
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -9,10 +8,15 @@ from app.models.candidate import Candidate
 from app.models.resume import Resume
 from app.security.jwt_handler import get_current_user
 from app.security.encryption import encrypt_data
+from app.security.blind_index import apply_blind_indexes
 from app.config import get_settings
-from app.ai.parser import extract_text
+from app.ai.extraction_engine import extraction_engine
 from app.ai.preprocessor import preprocess_text
 from app.ai.extractor import extract_entities
+from app.ai.stage_timer import StageTimer
+from app.services.candidate_vectors import sync_candidate_vectors
+from app.services.resume_cache import find_parsed_resumes, reuse_parsed_data
+from app.services.upload_storage import FileTooLarge, save_upload
 
 router = APIRouter(prefix="/upload", tags=["Upload"])
 settings = get_settings()
@@ -53,6 +57,7 @@ async def upload_resumes(
 
     results = []
     task_ids = []
+    saved = []
 
     for file in files:
         # Validate file type
@@ -61,66 +66,127 @@ async def upload_resumes(
             results.append({"file": file.filename, "error": "Tipe file tidak didukung. Gunakan PDF atau DOCX."})
             continue
 
-        # Validate file size
-        content = await file.read()
-        if len(content) > settings.MAX_FILE_SIZE:
+        # Save the file, rejecting it as soon as it goes over the size limit
+        timer = StageTimer(file.filename or "")
+        try:
+            with timer.stage("save"):
+                stored = await save_upload(file, file_ext)
+        except FileTooLarge:
             results.append({"file": file.filename, "error": "File terlalu besar (max 10MB)"})
             continue
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}.{file_ext}")
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-        with open(file_path, "wb") as f:
-            f.write(content)
 
-        # Extract text from CV
+        # Result slot is filled in once the file has been parsed
+        results.append(None)
+        saved.append({
+            "slot": len(results) - 1,
+            "filename": file.filename,
+            "file_ext": file_ext,
+            "file_path": stored.path,
+            "file_id": stored.file_id,
+            "file_size": stored.size,
+            "content_hash": stored.content_hash,
+            "timer": timer,
+        })
+
+    # Files already parsed before (or repeated in this request) are not parsed again
+    known = find_parsed_resumes(db, {s["content_hash"] for s in saved})
+    to_extract = {}
+    for s in saved:
+        if s["content_hash"] not in known:
+            to_extract.setdefault(s["content_hash"], (s["file_path"], s["file_ext"]))
+
+    # Extract text from all new CVs in parallel on the extraction engine
+    extracted = await extraction_engine.extract_many(list(to_extract.values()))
+    extractions = dict(zip(to_extract, extracted))
+
+    for s in saved:
+        slot, filename, file_ext = s["slot"], s["filename"], s["file_ext"]
+        file_path, file_id, file_size = s["file_path"], s["file_id"], s["file_size"]
+        timer = s["timer"]
+        duplicate = known.get(s["content_hash"])
+        extraction = extractions.get(s["content_hash"])
+        if extraction and not duplicate:
+            timer.add_extraction(extraction)
         try:
-            raw_text = extract_text(file_path, file_ext)
-            processed_text = preprocess_text(raw_text)
-            parsed_data = extract_entities(raw_text)
+            if duplicate:
+                raw_text = duplicate.raw_text
+                parsed_data = reuse_parsed_data(duplicate, timer)
+                engine, extraction_stats = duplicate.extraction_engine, None
+            else:
+                if extraction.error:
+                    raise ValueError(extraction.error)
+                raw_text = extraction.text
+                engine, extraction_stats = extraction.engine, extraction.stats()
+                with timer.stage("preprocess"):
+                    processed_text = preprocess_text(raw_text)
+                with timer.stage("extract_entities"):
+                    parsed_data = extract_entities(raw_text, timer)
 
             # Create candidate with encrypted PII
-            candidate = Candidate(
-                full_name_encrypted=encrypt_data(parsed_data.get("name", "Unknown")),
-                email_encrypted=encrypt_data(parsed_data.get("email", "")),
-                phone_encrypted=encrypt_data(parsed_data.get("phone", "")),
-                skills=parsed_data.get("skills", []),
-                experience=parsed_data.get("experience", []),
-                education=parsed_data.get("education", []),
-                certifications=parsed_data.get("certifications", []),
-                summary=parsed_data.get("summary", ""),
-                source="upload",
-                consent_given=True,
-            )
-            db.add(candidate)
-            db.flush()
+            with timer.stage("encrypt"):
+                candidate = Candidate(
+                    full_name_encrypted=encrypt_data(parsed_data.get("name", "Unknown")),
+                    email_encrypted=encrypt_data(parsed_data.get("email", "")),
+                    phone_encrypted=encrypt_data(parsed_data.get("phone", "")),
+                    skills=parsed_data.get("skills", []),
+                    experience=parsed_data.get("experience", []),
+                    education=parsed_data.get("education", []),
+                    certifications=parsed_data.get("certifications", []),
+                    summary=parsed_data.get("summary", ""),
+                    source="upload",
+                    consent_given=True,
+                )
+            with timer.stage("blind_index"):
+                apply_blind_indexes(
+                    candidate,
+                    parsed_data.get("name", "Unknown"),
+                    parsed_data.get("email", ""),
+                    parsed_data.get("phone", ""),
+                )
+            with timer.stage("db_flush"):
+                db.add(candidate)
+                db.flush()
+            with timer.stage("vectorize"):
+                sync_candidate_vectors(db, [candidate])
 
             # Create resume record
             resume = Resume(
                 candidate_id=candidate.id,
                 file_path=file_path,
                 file_type=file_ext,
-                file_size=len(content),
+                file_size=file_size,
+                content_hash=s["content_hash"],
                 raw_text=raw_text,
                 parsed_data=parsed_data,
+                extraction_engine=engine,
+                extraction_stats=extraction_stats,
+                stage_timings=timer.as_dict(),
                 processing_status="completed",
             )
             db.add(resume)
-            db.commit()
+            with timer.stage("db_commit"):
+                db.commit()
 
             task_id = file_id
             task_ids.append(task_id)
-            results.append({
-                "file": file.filename,
+            results[slot] = {
+                "file": filename,
                 "task_id": task_id,
                 "candidate_id": candidate.id,
                 "status": "completed",
-            })
+            }
+            if duplicate:
+                results[slot]["duplicate_of"] = {
+                    "resume_id": duplicate.id,
+                    "candidate_id": duplicate.candidate_id,
+                }
+            else:
+                known[s["content_hash"]] = resume
 
         except Exception as e:
             # Save resume with failed status
             candidate = Candidate(
-                full_name_encrypted=encrypt_data(file.filename or "Unknown"),
+                full_name_encrypted=encrypt_data(filename or "Unknown"),
                 email_encrypted=encrypt_data(""),
                 phone_encrypted=encrypt_data(""),
                 source="upload",
@@ -132,19 +198,25 @@ async def upload_resumes(
                 candidate_id=candidate.id,
                 file_path=file_path,
                 file_type=file_ext,
-                file_size=len(content),
+                file_size=file_size,
+                content_hash=s["content_hash"],
+                extraction_stats=extraction.stats() if extraction else None,
+                stage_timings=timer.as_dict(),
                 processing_status="failed",
             )
             db.add(resume)
-            db.commit()
+            with timer.stage("db_commit"):
+                db.commit()
 
             task_ids.append(file_id)
-            results.append({
-                "file": file.filename,
+            results[slot] = {
+                "file": filename,
                 "task_id": file_id,
                 "status": "failed",
                 "error": str(e),
-            })
+            }
+
+        timer.finish()
 
     return {"task_ids": task_ids, "results": results, "message": f"{len(task_ids)} files processed"}
 
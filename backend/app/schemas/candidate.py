@@ -26,12 +26,13 @@ class CandidateBase(BaseModel):
 
 
 class CandidateResponse(CandidateBase):
+    # Everything but id is optional so sparse fieldsets (?fields=) validate
     id: int
-    full_name: str
-    email: str
+    full_name: Optional[str] = None
+    email: Optional[str] = None
     phone: Optional[str] = None
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -1,6 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 from datetime import datetime
+from app.ai.skill_taxonomy import get_skill_taxonomy
+
+
+def _canonical_skills(skills: Optional[list[str]]) -> Optional[list[str]]:
+    """Store required skills under their taxonomy names ("reactjs" -> "React")."""
+    if skills is None:
+        return None
+    return get_skill_taxonomy().canonicalize(skills)
 
 
 class JobBase(BaseModel):
@@ -13,6 +21,8 @@ class JobBase(BaseModel):
     education_level: Optional[str] = None
     status: str = "draft"
 
+    _canonicalize_skills = field_validator("skills_required")(_canonical_skills)
+
 
 class JobCreate(JobBase):
     pass
@@ -28,6 +38,8 @@ class JobUpdate(BaseModel):
     education_level: Optional[str] = None
     status: Optional[str] = None
 
+    _canonicalize_skills = field_validator("skills_required")(_canonical_skills)
+
 
 class JobResponse(JobBase):
     id: int
@@ -39,6 +51,15 @@ class JobResponse(JobBase):
         from_attributes = True
 
 
+class JobMatchResponse(BaseModel):
+    job_id: int
+    title: str
+    department: Optional[str] = None
+    score: float
+    matched_skills: list[str] = []
+    missing_skills: list[str] = []
+
+
 class PaginatedJobs(BaseModel):
     items: list[JobResponse]
     total: int
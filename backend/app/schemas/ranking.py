@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from app.schemas.candidate import CandidateResponse
@@ -30,8 +30,19 @@ class RankingResponse(RankingBase):
 
 class RunRankingRequest(BaseModel):
     job_id: int
+    top_n: Optional[int] = Field(None, ge=0)  # None = RANKING_RETRIEVAL_TOP_N, 0 = every candidate
 
 
 class RunRankingResponse(BaseModel):
     task_id: str
     message: str
+
+
+class RetrievalRecallResponse(BaseModel):
+    job_id: int
+    candidates: int
+    top_k: int
+    top_n: int
+    recall: float  # share of the exhaustive top_k among the retrieved top_n
+    exhaustive_seconds: float
+    retrieval_seconds: float
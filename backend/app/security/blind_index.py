@@ -0,0 +1,75 @@
+"""Blind indexes - keyed HMAC digests of normalized PII.
+
+Encrypted PII cannot be searched directly. Storing an HMAC of the normalized
+value next to the ciphertext allows exact-match lookups through an ordinary
+B-tree index without ever decrypting the table. The HMAC key is separate from
+the encryption key so rotating ENCRYPTION_KEY does not invalidate the indexes.
+"""
+
+import hashlib
+import hmac
+import re
+from functools import lru_cache
+from typing import Optional
+from app.config import get_settings
+from app.models.candidate import CandidateNameToken
+
+
+@lru_cache()
+def _hmac_key() -> bytes:
+    return get_settings().BLIND_INDEX_KEY.encode()
+
+
+def blind_index(value: str, purpose: str) -> Optional[str]:
+    """HMAC-SHA256 of a normalized value, namespaced by purpose (email, phone, name...)."""
+    if not value:
+        return None
+    message = f"{purpose}:{value}".encode()
+    return hmac.new(_hmac_key(), message, hashlib.sha256).hexdigest()
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone: str) -> str:
+    """Keep digits only and fold the +62 country code into the local 0 prefix."""
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("62"):
+        digits = "0" + digits[2:]
+    return digits
+
+
+def normalize_name_tokens(name: str) -> list[str]:
+    """Lowercased, de-duplicated name words of two or more letters."""
+    tokens = []
+    for token in re.findall(r"[^\W\d_]+", (name or "").lower()):
+        if len(token) > 1 and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def email_index(email: str) -> Optional[str]:
+    return blind_index(normalize_email(email), "email")
+
+
+def phone_index(phone: str) -> Optional[str]:
+    return blind_index(normalize_phone(phone), "phone")
+
+
+def name_index(name: str) -> Optional[str]:
+    return blind_index(" ".join(normalize_name_tokens(name)), "name")
+
+
+def name_token_indexes(name: str) -> list[str]:
+    return [blind_index(token, "name_token") for token in normalize_name_tokens(name)]
+
+
+def apply_blind_indexes(candidate, full_name: str, email: str, phone: str):
+    """Fill the blind-index columns and name tokens of a Candidate."""
+    candidate.email_bidx = email_index(email)
+    candidate.phone_bidx = phone_index(phone)
+    candidate.name_bidx = name_index(full_name)
+    candidate.name_tokens = [
+        CandidateNameToken(token_bidx=token) for token in name_token_indexes(full_name)
+    ]
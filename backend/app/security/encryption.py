@@ -1,32 +1,35 @@
-import base64
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from app.config import get_settings
-
-
-def _get_fernet() -> Fernet:
-    settings = get_settings()
-    key_material = settings.ENCRYPTION_KEY.encode()
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=b"smart-recruit-salt",  # In production, use a random salt stored securely
-        iterations=480000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(key_material))
-    return Fernet(key)
+from app.security.keyring import get_keyring
 
 
 def encrypt_data(data: str) -> bytes:
     if not data:
         return b""
-    fernet = _get_fernet()
-    return fernet.encrypt(data.encode())
+    return get_keyring().encrypt(data.encode())
 
 
 def decrypt_data(encrypted_data: bytes) -> str:
     if not encrypted_data:
         return ""
-    fernet = _get_fernet()
-    return fernet.decrypt(encrypted_data).decode()
+    return get_keyring().decrypt(encrypted_data).decode()
+
+
+PII_FIELDS = ("full_name_encrypted", "email_encrypted", "phone_encrypted")
+
+def decrypt_many(rows: list, fields: tuple[str, ...] = PII_FIELDS) -> list[dict[str, str]]:
+    """Decrypt ``fields`` on every row in one call.
+
+    Returns one dict per row mapping field name to plaintext. Rows that are
+    ``None`` and empty blobs decrypt to ``""``. The keyring is looked up once
+    for the whole batch; callers on the event loop run this in a threadpool.
+    """
+    keyring = get_keyring()
+    results = []
+    for row in rows:
+        plaintexts = dict.fromkeys(fields, "")
+        if row is not None:
+            for field in fields:
+                blob = getattr(row, field, None)
+                if blob:
+                    plaintexts[field] = keyring.decrypt(blob).decode()
+        results.append(plaintexts)
+    return results
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
+from app.security.principal_cache import UserPrincipal, principal_cache
 
 security = HTTPBearer()
 settings = get_settings()
@@ -33,10 +34,18 @@ def verify_token(token: str) -> dict:
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> UserPrincipal:
     payload = verify_token(credentials.credentials)
     user_id = int(payload["sub"])
+    issued_at = payload.get("iat")
+
+    principal = principal_cache.get(user_id, issued_at)
+    if principal is not None:
+        return principal
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    principal = UserPrincipal.from_user(user)
+    principal_cache.put(issued_at, principal)
+    return principal
@@ -0,0 +1,144 @@
+"""Encryption keyring - derives each PII key once per process.
+
+Key derivation (PBKDF2, 480k iterations) is deliberately expensive, so derived
+keys are cached for the lifetime of the process. The keyring holds the current
+key version used for encryption plus any retired versions that are still needed
+to decrypt older data.
+"""
+
+import base64
+import threading
+import time
+from typing import Optional
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from app.config import get_settings
+
+KDF_SALT = b"smart-recruit-salt"  # In production, use a random salt stored securely
+KDF_ITERATIONS = 480000
+
+_lock = threading.Lock()
+_derived_keys: dict[str, Fernet] = {}
+_keyring = None
+_stats = {"hits": 0, "misses": 0, "derivations": 0, "derivation_seconds": 0.0}
+
+
+class KeyRing:
+    """Versioned set of Fernet keys. The current version always comes first."""
+
+    def __init__(self, current_version: int, fernets: dict[int, Fernet]):
+        if current_version not in fernets:
+            raise ValueError(f"Current key version {current_version} has no key")
+        self.current_version = current_version
+        self.fernets = fernets
+        self.current = fernets[current_version]
+        retired = [fernets[v] for v in sorted(fernets, reverse=True) if v != current_version]
+        self.multi = MultiFernet([self.current, *retired])
+
+    @property
+    def versions(self) -> list[int]:
+        return sorted(self.fernets)
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self.current.encrypt(data)
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self.multi.decrypt(token)
+
+    def rotate(self, token: bytes) -> Optional[bytes]:
+        """Re-encrypt a token under the current key, or ``None`` if it already is."""
+        try:
+            self.current.decrypt(token)
+            return None
+        except InvalidToken:
+            return self.multi.rotate(token)
+
+
+def parse_retired_keys(value: str) -> dict[int, str]:
+    """Parse ``"1:old-key,2:older-key"`` into ``{1: "old-key", 2: "older-key"}``."""
+    keys = {}
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        version, sep, key = entry.partition(":")
+        if not sep or not version.strip().isdigit() or not key:
+            raise ValueError(f"Invalid retired key entry: {entry!r} (expected 'version:key')")
+        keys[int(version)] = key
+    return keys
+
+
+def derive_fernet(key_material: str) -> Fernet:
+    """Derive a Fernet from a passphrase, running PBKDF2 at most once per key."""
+    with _lock:
+        fernet = _derived_keys.get(key_material)
+    if fernet is not None:
+        return fernet
+
+    start = time.perf_counter()
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=KDF_SALT,
+        iterations=KDF_ITERATIONS,
+    )
+    fernet = Fernet(base64.urlsafe_b64encode(kdf.derive(key_material.encode())))
+    elapsed = time.perf_counter() - start
+
+    with _lock:
+        _stats["derivations"] += 1
+        _stats["derivation_seconds"] += elapsed
+        return _derived_keys.setdefault(key_material, fernet)
+
+
+def _signature(settings) -> tuple:
+    return (settings.ENCRYPTION_KEY_VERSION, settings.ENCRYPTION_KEY, settings.ENCRYPTION_RETIRED_KEYS)
+
+
+def build_keyring(current_key: str, current_version: int, retired_keys: dict[int, str]) -> KeyRing:
+    keys = dict(retired_keys)
+    keys[current_version] = current_key
+    return KeyRing(current_version, {version: derive_fernet(key) for version, key in keys.items()})
+
+
+def get_keyring() -> KeyRing:
+    """Return the process-wide keyring built from settings."""
+    global _keyring
+    settings = get_settings()
+    signature = _signature(settings)
+
+    with _lock:
+        cached = _keyring
+        if cached is not None and cached[0] == signature:
+            _stats["hits"] += 1
+            return cached[1]
+        _stats["misses"] += 1
+
+    keyring = build_keyring(
+        settings.ENCRYPTION_KEY,
+        settings.ENCRYPTION_KEY_VERSION,
+        parse_retired_keys(settings.ENCRYPTION_RETIRED_KEYS),
+    )
+    with _lock:
+        _keyring = (signature, keyring)
+    return keyring
+
+
+def get_keyring_stats() -> dict:
+    """Keyring cache counters: hits, misses, derivations and time spent deriving."""
+    with _lock:
+        stats = dict(_stats)
+        stats["cached_keys"] = len(_derived_keys)
+    stats["derivation_seconds"] = round(stats["derivation_seconds"], 4)
+    return stats
+
+
+def clear_keyring_cache():
+    """Drop all derived keys and reset counters (used by tests)."""
+    global _keyring
+    with _lock:
+        _derived_keys.clear()
+        _keyring = None
+        for key in _stats:
+            _stats[key] = 0.0 if key == "derivation_seconds" else 0
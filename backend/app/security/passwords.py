@@ -0,0 +1,65 @@
+"""Password hashing off the event loop.
+
+bcrypt is intentionally slow (~250ms at cost 12) and releases the GIL while it
+works, so hashes run on a small dedicated thread pool instead of inside the
+async request handlers. At most ``PASSWORD_HASH_MAX_PENDING`` hash operations
+may be queued or running; beyond that requests are rejected with 503 so a
+login storm cannot starve the rest of the API.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from fastapi import HTTPException, status
+from app.config import get_settings
+
+settings = get_settings()
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_pending = 0
+
+
+async def _run(func, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server sedang sibuk, silakan coba lagi",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+
+def hash_cost(password_hash: str) -> int:
+    """Cost factor of a ``$2b$<cost>$...`` bcrypt hash."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return hash_cost(password_hash) != settings.BCRYPT_ROUNDS
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await _run(_verify, password, password_hash)
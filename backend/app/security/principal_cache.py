@@ -0,0 +1,105 @@
+"""In-process LRU + TTL cache of authenticated users.
+
+``get_current_user`` would otherwise query the users table on every request.
+Entries are keyed by ``(user_id, token iat)`` and hold an immutable snapshot of
+the user, detached from any session. A change to a User row through the ORM
+evicts that user's entries in this process; other worker processes pick the
+change up when their entries expire after ``AUTH_CACHE_TTL_SECONDS``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import event
+from app.config import get_settings
+from app.models.user import User
+
+
+class UserPrincipal(NamedTuple):
+    """Read-only snapshot of the fields request handlers use from a User."""
+
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, UserPrincipal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, user_id: int, issued_at) -> Optional[UserPrincipal]:
+        key = (user_id, issued_at)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return principal
+
+    def put(self, issued_at, principal: UserPrincipal):
+        key = (principal.id, issued_at)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_settings = get_settings()
+principal_cache = PrincipalCache(_settings.AUTH_CACHE_MAX_ENTRIES, _settings.AUTH_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate(target.id)
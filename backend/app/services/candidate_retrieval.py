@@ -0,0 +1,151 @@
+"""First stage of two-stage ranking: top-N retrieval over the whole pool.
+
+A process-wide ``CandidateIndex`` of every candidate with a completed resume is
+built on first use from their stored vectors (``ranker.retrieval_features``).
+Before each search it picks up candidates changed since the last one
+(``updated_at`` of the candidate or of its vector, written by this or any other
+worker process), so it follows new and edited candidates incrementally.
+Deleted candidates are dropped when a search returns them. Features are
+weighted with a snapshot of the document frequencies; the index is rebuilt
+once the pool has doubled since it was taken.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, load_only
+from app.ai.candidate_index import CandidateIndex
+from app.ai.ranker import RETRIEVAL_FEATURES, retrieval_features, retrieval_query
+from app.ai.text_vectors import DocumentFrequencies
+from app.config import get_settings
+from app.models.candidate import Candidate
+from app.models.candidate_vector import CandidateVector
+from app.models.resume import Resume
+from app.services.candidate_vectors import load_candidate_vectors, load_document_frequencies
+
+logger = logging.getLogger(__name__)
+
+# Candidates loaded and featurized at a time
+_LOAD_BATCH = 1000
+
+# Re-read changes this far behind the watermark: ``updated_at`` is set when a
+# row is written, which can be a while before its transaction commits
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+_FEATURE_COLUMNS = (
+    Candidate.summary, Candidate.skills, Candidate.experience, Candidate.education, Candidate.certifications,
+)
+
+_index: Optional[CandidateIndex] = None
+_frequencies: Optional[DocumentFrequencies] = None
+_watermark: Optional[datetime] = None
+_lock = threading.Lock()
+
+
+def _completed_candidate_ids():
+    return select(Resume.candidate_id).where(Resume.processing_status == "completed").distinct()
+
+
+def _latest_change(db: Session) -> Optional[datetime]:
+    candidates = db.query(func.max(Candidate.updated_at)).scalar()
+    vectors = db.query(func.max(CandidateVector.updated_at)).scalar()
+    return max((t for t in (candidates, vectors) if t is not None), default=None)
+
+
+def _changed_since(db: Session, watermark: datetime) -> list[int]:
+    """Candidates with a completed resume whose row or vector changed since ``watermark``."""
+    since = watermark - _REFRESH_OVERLAP
+    completed = _completed_candidate_ids()
+    changed = {
+        cid for (cid,) in db.query(Candidate.id).filter(Candidate.updated_at >= since, Candidate.id.in_(completed))
+    }
+    changed.update(
+        cid for (cid,) in db.query(CandidateVector.candidate_id).filter(
+            CandidateVector.updated_at >= since, CandidateVector.candidate_id.in_(completed),
+        )
+    )
+    return sorted(changed)
+
+
+def _features(db: Session, candidate_ids: list[int], frequencies: DocumentFrequencies):
+    """Ids, feature rows and biases of ``candidate_ids``, loaded in batches."""
+    ids, rows, bias = [], [], []
+    for start in range(0, len(candidate_ids), _LOAD_BATCH):
+        candidates = (
+            db.query(Candidate)
+            .options(load_only(*_FEATURE_COLUMNS))
+            .filter(Candidate.id.in_(candidate_ids[start:start + _LOAD_BATCH]))
+            .all()
+        )
+        # Writes the vectors of candidates stored before vectors existed
+        vectors = load_candidate_vectors(db, candidates)
+        batch_rows, batch_bias = retrieval_features(candidates, vectors, frequencies)
+        db.commit()
+        ids.extend(c.id for c in candidates)
+        rows.append(batch_rows)
+        bias.append(batch_bias)
+    if not ids:
+        return [], sparse.csr_matrix((0, RETRIEVAL_FEATURES), dtype=np.float32), np.zeros(0)
+    return ids, sparse.vstack(rows, format="csr"), np.concatenate(bias)
+
+
+def _build(db: Session):
+    global _index, _frequencies, _watermark
+    settings = get_settings()
+    start = time.perf_counter()
+    watermark = _latest_change(db)
+    frequencies = load_document_frequencies(db)
+    candidate_ids = [
+        cid for (cid,) in db.query(Candidate.id).filter(Candidate.id.in_(_completed_candidate_ids()))
+    ]
+    ids, rows, bias = _features(db, candidate_ids, frequencies)
+    _index = CandidateIndex.train(
+        ids, rows, bias, n_lists=settings.RETRIEVAL_INDEX_LISTS, probes=settings.RETRIEVAL_INDEX_PROBES or None,
+    )
+    _frequencies, _watermark = frequencies, watermark
+    logger.info("Built candidate index: %d candidates in %.2fs", len(_index), time.perf_counter() - start)
+
+
+def get_candidate_index(db: Session) -> tuple[CandidateIndex, DocumentFrequencies]:
+    """The process-wide index, brought up to date, and the frequencies its features use."""
+    global _watermark
+    with _lock:
+        documents = db.query(func.count(CandidateVector.candidate_id)).scalar() or 0
+        if _index is None or _watermark is None or documents > 2 * max(_frequencies.documents, 1):
+            _build(db)
+        else:
+            watermark = _latest_change(db)
+            _index.add(*_features(db, _changed_since(db, _watermark), _frequencies))
+            _watermark = watermark
+        return _index, _frequencies
+
+
+def reset_candidate_index():
+    global _index, _frequencies, _watermark
+    with _lock:
+        _index, _frequencies, _watermark = None, None, None
+
+
+def retrieve_candidates(db: Session, job, top_n: int) -> list[Candidate]:
+    """Up to ``top_n`` candidates with a completed resume, best approximate overall score first."""
+    index, frequencies = get_candidate_index(db)
+    query = retrieval_query(job, frequencies)
+
+    # Over-fetch: some results may have been deleted or lost their completed resume
+    fetch = top_n + max(top_n // 10, 10)
+    while True:
+        ids = index.search(query, fetch).candidate_ids.tolist()
+        candidates = {
+            c.id: c
+            for c in db.query(Candidate).filter(Candidate.id.in_(ids), Candidate.id.in_(_completed_candidate_ids()))
+        }
+        index.remove(cid for cid in ids if cid not in candidates)
+        if len(candidates) >= top_n or len(ids) < fetch:
+            break
+        fetch *= 2
+    return [candidates[cid] for cid in ids if cid in candidates][:top_n]
@@ -0,0 +1,138 @@
+"""Storage of candidate text vectors and corpus document frequencies.
+
+``sync_candidate_vectors`` is called wherever candidate content is written
+(upload, apply, update). It re-hashes only candidates whose texts changed since
+their vector was stored and moves the document frequencies of their profile
+terms by the difference, in the same transaction. Ranking loads the stored
+vectors with ``load_candidate_vectors``, writing any that are missing or stale
+(candidates stored before vectors existed, or changed by a backfill).
+"""
+
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from app.ai.text_vectors import (
+    N_FEATURES,
+    CandidateVectors,
+    DocumentFrequencies,
+    candidate_texts,
+    decode,
+    encode,
+    term_counts,
+    text_hash,
+)
+from app.models.candidate_vector import CandidateVector, TermDocumentFrequency
+
+# Rows per upsert statement when moving document frequencies
+_DF_CHUNK = 1000
+
+
+def _profile_terms(matrix: sparse.csr_matrix) -> np.ndarray:
+    return matrix.indices[matrix.indptr[0]:matrix.indptr[1]]
+
+
+def _upsert_statement(db: Session, rows: list[dict]):
+    table = TermDocumentFrequency.__table__
+    if db.get_bind().dialect.name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update(
+            document_count=table.c.document_count + stmt.inserted.document_count
+        )
+    stmt = sqlite.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.term_id],
+        set_={"document_count": table.c.document_count + stmt.excluded.document_count},
+    )
+
+
+def _apply_frequency_deltas(db: Session, deltas: Counter):
+    """Add ``deltas`` (term id -> change) to the document frequencies, atomically per row.
+
+    Every change, up or down, is one upsert row, written in term id order:
+    concurrent uploads lock the term rows they share in the same order, so they
+    queue behind each other instead of deadlocking. Decrements only reach terms
+    a stored vector counted, so their rows exist.
+    """
+    rows = [{"term_id": int(t), "document_count": int(d)} for t, d in sorted(deltas.items()) if d]
+    for start in range(0, len(rows), _DF_CHUNK):
+        db.execute(_upsert_statement(db, rows[start:start + _DF_CHUNK]))
+
+
+def sync_candidate_vectors(db: Session, candidates: list) -> dict[int, sparse.csr_matrix]:
+    """Store vectors for candidates whose texts changed; returns every candidate's vector.
+
+    Candidates must already have ids (flush first). Nothing is committed.
+    """
+    texts = {c.id: candidate_texts(c) for c in candidates}
+    hashes = {cid: text_hash(t) for cid, t in texts.items()}
+    stored = {
+        v.candidate_id: v
+        for v in db.query(CandidateVector).filter(CandidateVector.candidate_id.in_(list(texts)))
+    }
+
+    vectors = {}
+    changed = []
+    for cid in texts:
+        vector = stored.get(cid)
+        if vector is not None and vector.text_hash == hashes[cid]:
+            vectors[cid] = decode(vector.indptr, vector.indices, vector.counts)
+        else:
+            changed.append(cid)
+    if not changed:
+        return vectors
+
+    counts = term_counts([text for cid in changed for text in texts[cid]])
+    deltas = Counter()
+    row = 0
+    for cid in changed:
+        matrix = counts[row:row + len(texts[cid])]
+        row += len(texts[cid])
+        vectors[cid] = matrix
+        deltas.update(_profile_terms(matrix).tolist())
+
+        vector = stored.get(cid)
+        if vector is None:
+            db.add(CandidateVector(candidate_id=cid, text_hash=hashes[cid], **encode(matrix)))
+        else:
+            deltas.subtract(_profile_terms(decode(vector.indptr, vector.indices, vector.counts)).tolist())
+            vector.text_hash = hashes[cid]
+            for column, value in encode(matrix).items():
+                setattr(vector, column, value)
+
+    _apply_frequency_deltas(db, deltas)
+    # Sessions don't autoflush: make the new vectors count as documents right away
+    db.flush()
+    return vectors
+
+
+def remove_candidate_vectors(db: Session, candidate_ids: list[int]):
+    """Delete stored vectors and take their profiles out of the document frequencies."""
+    deltas = Counter()
+    for vector in db.query(CandidateVector).filter(CandidateVector.candidate_id.in_(candidate_ids)):
+        deltas.subtract(_profile_terms(decode(vector.indptr, vector.indices, vector.counts)).tolist())
+        db.delete(vector)
+    _apply_frequency_deltas(db, deltas)
+
+
+def load_document_frequencies(db: Session) -> DocumentFrequencies:
+    counts = np.zeros(N_FEATURES, dtype=np.float32)
+    rows = db.query(TermDocumentFrequency.term_id, TermDocumentFrequency.document_count).all()
+    if rows:
+        terms, document_counts = zip(*rows)
+        counts[list(terms)] = document_counts
+    documents = db.query(func.count(CandidateVector.candidate_id)).scalar() or 0
+    return DocumentFrequencies(counts, documents)
+
+
+def load_candidate_vectors(db: Session, candidates: list) -> CandidateVectors:
+    """Stored vectors for ``candidates``, in order, refreshing any that are missing or stale."""
+    vectors = sync_candidate_vectors(db, candidates)
+    rows = [vectors[c.id] for c in candidates]
+    profiles = sparse.vstack([m[0] for m in rows], format="csr") if rows else sparse.csr_matrix((0, N_FEATURES))
+    entries = [m[1:] for m in rows if m.shape[0] > 1]
+    entries = sparse.vstack(entries, format="csr") if entries else sparse.csr_matrix((0, N_FEATURES))
+    offsets = np.concatenate([[0], np.cumsum([m.shape[0] - 1 for m in rows])]).astype(np.int64)
+    return CandidateVectors(profiles, entries, offsets)
@@ -0,0 +1,76 @@
+"""Candidate response building with sparse fieldsets.
+
+Clients may pass ``fields=full_name,skills`` to receive only those attributes.
+The requested fields map to the columns that are loaded from the database, and
+encrypted PII is only decrypted when one of its fields was asked for.
+"""
+
+from typing import Optional
+from fastapi import HTTPException
+from app.models.candidate import Candidate
+from app.schemas.candidate import CandidateResponse
+from app.security.encryption import decrypt_many
+
+# Response field -> backing column
+PII_COLUMNS = {
+    "full_name": "full_name_encrypted",
+    "email": "email_encrypted",
+    "phone": "phone_encrypted",
+}
+PLAIN_FIELDS = (
+    "skills", "experience", "education", "certifications",
+    "summary", "source", "created_at", "updated_at",
+)
+LIST_FIELDS = ("skills", "experience", "education", "certifications")
+CANDIDATE_FIELDS = ("id", *PII_COLUMNS, *PLAIN_FIELDS)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """Parse a comma-separated ``fields`` parameter. ``None`` means all fields."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in CANDIDATE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Field tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(CANDIDATE_FIELDS)}",
+        )
+    return tuple(f for f in CANDIDATE_FIELDS if f in requested or f == "id")
+
+
+def load_columns(fields: Optional[tuple[str, ...]]) -> list:
+    """Candidate columns to pass to ``load_only`` for the requested fields."""
+    fields = fields or CANDIDATE_FIELDS
+    return [getattr(Candidate, PII_COLUMNS.get(f, f)) for f in fields]
+
+
+def decrypt_fields(candidates: list, fields: Optional[tuple[str, ...]]) -> list[dict]:
+    """Decrypt only the PII columns backing the requested fields."""
+    fields = fields or CANDIDATE_FIELDS
+    columns = tuple(PII_COLUMNS[f] for f in PII_COLUMNS if f in fields)
+    if not columns:
+        return [{} for _ in candidates]
+    return decrypt_many(candidates, columns)
+
+
+def candidate_to_response(
+    candidate: Candidate,
+    pii: Optional[dict] = None,
+    fields: Optional[tuple[str, ...]] = None,
+) -> CandidateResponse:
+    """Build a CandidateResponse holding only ``fields`` (all when ``None``)."""
+    fields = fields or CANDIDATE_FIELDS
+    if pii is None:
+        pii = decrypt_fields([candidate], fields)[0]
+
+    data = {"id": candidate.id}
+    for field in fields:
+        if field in PII_COLUMNS:
+            value = pii[PII_COLUMNS[field]]
+            data[field] = (value or None) if field == "phone" else value
+        elif field in LIST_FIELDS:
+            data[field] = getattr(candidate, field) or []
+        elif field != "id":
+            data[field] = getattr(candidate, field)
+    return CandidateResponse(**data)
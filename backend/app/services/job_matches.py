@@ -0,0 +1,164 @@
+"""Reverse matching: the open jobs that suit one candidate best.
+
+A process-wide matrix holds the ``ranker.retrieval_query`` row of every open
+job. A candidate's ``retrieval_features`` row scored against it in one sparse
+product gives their approximate ``rank_candidates`` overall score for every
+open job at once. Before each lookup the matrix is brought up to date from the
+``(id, updated_at)`` of the open jobs: rows are re-derived only for jobs that
+were created or changed since (here or in any other worker process), and
+dropped for jobs that were closed or deleted. Jobs written in this process are
+also marked by ORM events, for changes within one ``updated_at`` tick. Like the
+candidate index, rows are weighted with a snapshot of the document frequencies
+that is retaken once the pool has doubled. Jobs that require no skills get no
+skill points, so they only rank by how well the candidate's texts fit them.
+"""
+
+import logging
+import threading
+from typing import NamedTuple, Optional
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.ai.matcher import compute_skill_match
+from app.ai.ranker import RETRIEVAL_FEATURES, retrieval_features, retrieval_query
+from app.ai.text_vectors import DocumentFrequencies
+from app.models.candidate_vector import CandidateVector
+from app.models.job import Job
+from app.services.candidate_vectors import load_candidate_vectors, load_document_frequencies
+
+logger = logging.getLogger(__name__)
+
+
+class JobMatch(NamedTuple):
+    job: Job
+    score: float
+    matched_skills: list[str]
+    missing_skills: list[str]
+
+
+class _JobRows(NamedTuple):
+    frequencies: Optional[DocumentFrequencies]
+    versions: dict  # job id -> updated_at the row was derived from
+    rows: dict  # job id -> query row
+    job_ids: np.ndarray
+    matrix: sparse.csr_matrix
+
+
+_EMPTY = _JobRows(
+    None, {}, {}, np.zeros(0, dtype=np.int64), sparse.csr_matrix((0, RETRIEVAL_FEATURES), dtype=np.float32),
+)
+
+
+class JobMatrix:
+    """Query rows of the open jobs, one per job, stacked into one matrix.
+
+    A refresh reads the database and derives rows without holding the lock, then
+    swaps in the new rows, so lookups are never blocked behind a slow refresh.
+    """
+
+    def __init__(self):
+        self._state = _EMPTY
+        self._changed: set[int] = set()
+        self._lock = threading.Lock()
+
+    def invalidate(self, job_id: int):
+        with self._lock:
+            self._changed.add(job_id)
+
+    def clear(self):
+        with self._lock:
+            self._state = _EMPTY
+            self._changed = set()
+
+    def refresh(self, db: Session) -> tuple[np.ndarray, sparse.csr_matrix, DocumentFrequencies]:
+        """Job ids, their query rows and the frequencies the rows use, brought up to date."""
+        with self._lock:
+            state, marked = self._state, self._changed
+            self._changed = set()
+        try:
+            new_state = self._updated(db, state, marked)
+        except Exception:
+            with self._lock:
+                self._changed |= marked
+            raise
+        with self._lock:
+            if self._state is state:
+                self._state = new_state
+            else:
+                # Another refresh swapped first; keep its rows and re-read the marked jobs next time
+                self._changed |= marked
+        return new_state.job_ids, new_state.matrix, new_state.frequencies
+
+    @staticmethod
+    def _updated(db: Session, state: _JobRows, marked: set[int]) -> _JobRows:
+        frequencies, known, rows = state.frequencies, state.versions, state.rows
+        documents = db.query(func.count(CandidateVector.candidate_id)).scalar() or 0
+        if frequencies is None or documents > 2 * max(frequencies.documents, 1):
+            frequencies, known, rows = load_document_frequencies(db), {}, {}
+
+        versions = dict(db.query(Job.id, Job.updated_at).filter(Job.status == "open").all())
+        changed = [
+            jid for jid, updated_at in versions.items()
+            if jid not in rows or jid in marked or known[jid] != updated_at
+        ]
+        closed = [jid for jid in rows if jid not in versions]
+        if frequencies is state.frequencies and not changed and not closed:
+            return state
+
+        rows = {jid: row for jid, row in rows.items() if jid in versions}
+        known = {jid: at for jid, at in known.items() if jid in versions}
+        for job in db.query(Job).filter(Job.id.in_(changed), Job.status == "open"):
+            rows[job.id] = retrieval_query(job, frequencies)
+            known[job.id] = versions[job.id]
+
+        job_ids = np.array(sorted(rows), dtype=np.int64)
+        if len(job_ids):
+            matrix = sparse.vstack([rows[jid] for jid in job_ids.tolist()], format="csr")
+        else:
+            matrix = _EMPTY.matrix
+        logger.info("Job matrix: %d open jobs (%d updated, %d removed)", len(job_ids), len(changed), len(closed))
+        return _JobRows(frequencies, known, rows, job_ids, matrix)
+
+
+job_matrix = JobMatrix()
+
+
+@event.listens_for(Job, "after_insert")
+@event.listens_for(Job, "after_update")
+@event.listens_for(Job, "after_delete")
+def _invalidate_changed_job(mapper, connection, target):
+    job_matrix.invalidate(target.id)
+
+
+def match_jobs(db: Session, candidate, limit: int, exclude_job_ids: tuple = ()) -> list[JobMatch]:
+    """Up to ``limit`` open jobs, best approximate overall score for ``candidate`` first."""
+    job_ids, matrix, frequencies = job_matrix.refresh(db)
+    if not len(job_ids) or limit <= 0:
+        return []
+
+    # Writes the candidate's vector if it is missing or stale
+    row, bias = retrieval_features([candidate], load_candidate_vectors(db, [candidate]), frequencies)
+    db.commit()
+    scores = (matrix @ row.T).toarray().ravel() + bias[0]
+    scores = np.minimum(scores, 100.0)
+    if exclude_job_ids:
+        scores[np.isin(job_ids, list(exclude_job_ids))] = -np.inf
+
+    order = np.argsort(-scores, kind="stable")[:limit]
+    order = order[np.isfinite(scores[order])]
+    top = job_ids[order].tolist()
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(top), Job.status == "open")}
+
+    matches = []
+    for jid, score in zip(top, scores[order].tolist()):
+        job = jobs.get(jid)
+        if job is None:  # closed since the matrix was refreshed
+            continue
+        if job.skills_required:
+            skills = compute_skill_match(candidate.skills or [], job.skills_required)
+            matched, missing = skills["matched"], skills["missing"]
+        else:
+            matched, missing = [], []
+        matches.append(JobMatch(job, round(score, 2), matched, missing))
+    return matches
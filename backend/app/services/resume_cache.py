@@ -0,0 +1,48 @@
+"""Reuse of earlier parse results for byte-identical CV files.
+
+The same CV often arrives through both the applicant portal and recruiter
+upload. Resumes store the SHA-256 of their file, so a repeat upload can take
+``raw_text``/``parsed_data`` from the earlier completed resume instead of
+parsing the document again. ``parsed_data`` written by an older extractor
+is re-extracted from the stored text rather than copied.
+"""
+
+from sqlalchemy.orm import Session, load_only
+from app.ai.extractor import EXTRACTOR_VERSION, extract_entities
+from app.ai.stage_timer import StageTimer
+from app.models.resume import Resume
+
+
+def find_parsed_resumes(db: Session, hashes) -> dict[str, Resume]:
+    """Map each content hash to the oldest completed resume with text for that hash."""
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+    resumes = (
+        db.query(Resume)
+        .options(load_only(
+            Resume.id, Resume.candidate_id, Resume.content_hash, Resume.raw_text, Resume.parsed_data,
+            Resume.extraction_engine,
+        ))
+        .filter(
+            Resume.content_hash.in_(hashes),
+            Resume.processing_status == "completed",
+            # Nothing to reuse from a resume whose text could not be extracted
+            Resume.raw_text.isnot(None),
+            Resume.raw_text != "",
+        )
+        .order_by(Resume.id.desc())
+        .all()
+    )
+    # Descending order, so the oldest resume per hash is written last and wins
+    return {resume.content_hash: resume for resume in resumes}
+
+
+def reuse_parsed_data(resume: Resume, timer: StageTimer = None) -> dict:
+    """A copy of ``resume.parsed_data``, refreshed if an older extractor produced it."""
+    parsed_data = resume.parsed_data or {}
+    if parsed_data.get("extractor_version") == EXTRACTOR_VERSION or not resume.raw_text:
+        return dict(parsed_data)
+    timer = timer or StageTimer()
+    with timer.stage("extract_entities"):
+        return extract_entities(resume.raw_text, timer)
@@ -0,0 +1,73 @@
+"""Streaming storage for uploaded CV files.
+
+Uploads are copied into ``UPLOAD_DIR`` in ``UPLOAD_CHUNK_SIZE`` chunks instead of
+being read into memory whole. The SHA-256 is computed while copying, an
+oversized file is rejected as soon as it crosses ``MAX_FILE_SIZE``, and the file
+only appears under its final name once it has been written completely.
+"""
+
+import hashlib
+import os
+import tempfile
+import uuid
+from contextlib import suppress
+from typing import BinaryIO, NamedTuple
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+
+
+class FileTooLarge(Exception):
+    """Raised when an upload exceeds ``MAX_FILE_SIZE``."""
+
+
+class StoredFile(NamedTuple):
+    file_id: str
+    path: str
+    size: int
+    content_hash: str  # SHA-256 hex digest, matched by resume_cache.find_parsed_resumes()
+
+
+def _copy_to_disk(source: BinaryIO, upload_dir: str, file_ext: str, max_size: int, chunk_size: int) -> StoredFile:
+    os.makedirs(upload_dir, exist_ok=True)
+    # Same directory as the final file, so the rename below is atomic
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while chunk := source.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                target.write(chunk)
+        file_id = str(uuid.uuid4())
+        path = os.path.join(upload_dir, f"{file_id}.{file_ext}")
+        os.replace(temp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+    return StoredFile(file_id, path, size, digest.hexdigest())
+
+
+async def save_upload(file: UploadFile, file_ext: str) -> StoredFile:
+    """Store an upload as ``<uuid>.<file_ext>`` in ``UPLOAD_DIR``.
+
+    Raises ``FileTooLarge`` without keeping anything on disk if the file is over
+    the limit.
+    """
+    settings = get_settings()
+    # The multipart parser records the size, so most oversized files are rejected unread
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise FileTooLarge()
+    await file.seek(0)
+    return await run_in_threadpool(
+        _copy_to_disk,
+        file.file,
+        settings.UPLOAD_DIR,
+        file_ext,
+        settings.MAX_FILE_SIZE,
+        settings.UPLOAD_CHUNK_SIZE,
+    )
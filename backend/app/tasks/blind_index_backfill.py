@@ -0,0 +1,91 @@
+"""Backfill blind indexes for candidates stored before they existed.
+
+Run from the backend directory:
+    python -m app.tasks.blind_index_backfill [--batch-size 500]
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.models.candidate import Candidate
+from app.models.checkpoint import JobCheckpoint
+from app.security.blind_index import apply_blind_indexes
+from app.security.encryption import decrypt_many
+
+CHECKPOINT_NAME = "blind_index_backfill"
+
+
+def _load_checkpoint(db) -> JobCheckpoint:
+    checkpoint = db.query(JobCheckpoint).filter(JobCheckpoint.name == CHECKPOINT_NAME).first()
+    if not checkpoint:
+        checkpoint = JobCheckpoint(name=CHECKPOINT_NAME, last_id=0, processed=0)
+        db.add(checkpoint)
+    checkpoint.status = "running"
+    db.commit()
+    return checkpoint
+
+
+def backfill_blind_indexes(db, batch_size: int = 500) -> int:
+    """Index every candidate without a name blind index, one committed batch at a time.
+
+    Progress is kept in a ``JobCheckpoint``, committed with each batch: a run
+    continues after the last batch of the previous one, so candidates already
+    scanned (including those whose name has no words to index, and so never get
+    a name blind index) are not read again. Returns the number of candidates
+    updated.
+    """
+    checkpoint_id = _load_checkpoint(db).id
+    updated = 0
+    try:
+        while True:
+            checkpoint = db.get(JobCheckpoint, checkpoint_id)
+            batch = (
+                db.query(Candidate)
+                .filter(Candidate.id > checkpoint.last_id, Candidate.name_bidx.is_(None))
+                .order_by(Candidate.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+
+            for candidate, pii in zip(batch, decrypt_many(batch)):
+                apply_blind_indexes(
+                    candidate,
+                    pii["full_name_encrypted"],
+                    pii["email_encrypted"],
+                    pii["phone_encrypted"],
+                )
+            checkpoint.last_id = batch[-1].id
+            checkpoint.processed = (checkpoint.processed or 0) + len(batch)
+            updated += len(batch)
+            db.commit()
+            db.expunge_all()
+
+        checkpoint.status = "completed"
+        checkpoint.details = {"updated": updated}
+        db.commit()
+        return updated
+    except Exception as e:
+        db.rollback()
+        failed = db.get(JobCheckpoint, checkpoint_id)
+        failed.status = "failed"
+        failed.details = {"error": str(e)}
+        db.commit()
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        updated = backfill_blind_indexes(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Blind indexes written for {updated} candidates.")
+
+
+if __name__ == "__main__":
+    main()
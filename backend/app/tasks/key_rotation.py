@@ -0,0 +1,189 @@
+"""Online, resumable re-encryption of candidate PII under the current key.
+
+Rotation procedure:
+1. Set ENCRYPTION_KEY to the new key, bump ENCRYPTION_KEY_VERSION and move the
+   old key into ENCRYPTION_RETIRED_KEYS ("1:old-key"). Restart the API; it now
+   writes with the new key and reads both.
+2. Run this job (or POST /api/admin/key-rotation). It can be stopped and
+   restarted at any time and continues from its last committed batch.
+3. Once it reports completed, remove the retired key.
+
+Run from the backend directory:
+    python -m app.tasks.key_rotation [--batch-size 200] [--max-rows-per-sec 500]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from sqlalchemy import bindparam
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.candidate import Candidate
+from app.models.checkpoint import JobCheckpoint
+from app.security.encryption import PII_FIELDS
+from app.security.keyring import get_keyring
+
+logger = logging.getLogger(__name__)
+
+_running = threading.Lock()
+
+
+def checkpoint_name(key_version: int) -> str:
+    return f"key_rotation:v{key_version}"
+
+
+def get_rotation_status(db) -> dict:
+    keyring = get_keyring()
+    checkpoint = (
+        db.query(JobCheckpoint)
+        .filter(JobCheckpoint.name == checkpoint_name(keyring.current_version))
+        .first()
+    )
+    return {
+        "key_version": keyring.current_version,
+        "key_versions": keyring.versions,
+        "running": _running.locked(),
+        "status": checkpoint.status if checkpoint else "not_started",
+        "last_id": checkpoint.last_id if checkpoint else 0,
+        "processed": checkpoint.processed if checkpoint else 0,
+        "details": checkpoint.details if checkpoint else None,
+    }
+
+
+def _load_checkpoint(db, name: str) -> JobCheckpoint:
+    checkpoint = db.query(JobCheckpoint).filter(JobCheckpoint.name == name).first()
+    if not checkpoint:
+        checkpoint = JobCheckpoint(name=name, last_id=0, processed=0)
+        db.add(checkpoint)
+    checkpoint.status = "running"
+    db.commit()
+    return checkpoint
+
+
+def _rotate_batch(keyring, rows: list) -> list[dict]:
+    updates = []
+    for row in rows:
+        changes = {}
+        for field in PII_FIELDS:
+            token = getattr(row, field)
+            if token:
+                rotated = keyring.rotate(token)
+                if rotated is not None:
+                    changes[field] = rotated
+        if changes:
+            changes["id"] = row.id
+            updates.append(changes)
+    return updates
+
+
+def _write_batch(db, updates: list[dict]):
+    """Store rotated tokens. ``updated_at`` is kept: re-encryption is not a profile edit."""
+    table = Candidate.__table__
+    by_fields = {}
+    for changes in updates:
+        by_fields.setdefault(tuple(f for f in PII_FIELDS if f in changes), []).append(changes)
+    for fields, rows in by_fields.items():
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam("_id"))
+            .values(updated_at=table.c.updated_at, **{f: bindparam(f"_{f}") for f in fields})
+        )
+        db.execute(stmt, [{"_id": row["id"], **{f"_{f}": row[f] for f in fields}} for row in rows])
+
+
+def rotate_candidate_keys(batch_size: int = None, max_rows_per_sec: int = None) -> dict:
+    """Re-encrypt every candidate's PII under the current key version.
+
+    Rows are streamed in primary-key order with ``yield_per`` on a read session
+    while each batch is written and committed, together with its checkpoint, on
+    a separate write session. Progress is throttled to ``max_rows_per_sec``.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.KEY_ROTATION_BATCH_SIZE
+    if max_rows_per_sec is None:
+        max_rows_per_sec = settings.KEY_ROTATION_MAX_ROWS_PER_SEC
+
+    if not _running.acquire(blocking=False):
+        raise RuntimeError("Key rotation is already running in this process")
+
+    keyring = get_keyring()
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    try:
+        checkpoint = _load_checkpoint(write_db, checkpoint_name(keyring.current_version))
+        rows = (
+            read_db.query(Candidate.id, *(getattr(Candidate, f) for f in PII_FIELDS))
+            .filter(Candidate.id > checkpoint.last_id)
+            .order_by(Candidate.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+
+        started = time.monotonic()
+        scanned = 0
+        rewritten = 0
+        batch = []
+
+        def flush(batch: list):
+            nonlocal scanned, rewritten
+            updates = _rotate_batch(keyring, batch)
+            if updates:
+                _write_batch(write_db, updates)
+            scanned += len(batch)
+            rewritten += len(updates)
+            checkpoint.last_id = batch[-1].id
+            checkpoint.processed = (checkpoint.processed or 0) + len(batch)
+            write_db.commit()
+
+            if max_rows_per_sec > 0:
+                ahead = scanned / max_rows_per_sec - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        elapsed = time.monotonic() - started
+        checkpoint.status = "completed"
+        checkpoint.details = {
+            "scanned": scanned,
+            "rewritten": rewritten,
+            "seconds": round(elapsed, 2),
+        }
+        write_db.commit()
+        logger.info("Key rotation to v%s completed: %s", keyring.current_version, checkpoint.details)
+        return {"key_version": keyring.current_version, **checkpoint.details}
+    except Exception as e:
+        write_db.rollback()
+        failed = write_db.query(JobCheckpoint).filter(
+            JobCheckpoint.name == checkpoint_name(keyring.current_version)
+        ).first()
+        if failed:
+            failed.status = "failed"
+            failed.details = {"error": str(e)}
+            write_db.commit()
+        raise
+    finally:
+        read_db.close()
+        write_db.close()
+        _running.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-encrypt candidate PII under the current key.")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-rows-per-sec", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    result = rotate_candidate_keys(args.batch_size, args.max_rows_per_sec)
+    print(f"Key rotation completed: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Resumable re-extraction of resumes parsed by an older extractor.
+
+Every ``parsed_data`` carries the ``extractor_version`` that produced it. When
+the rules in ``app.ai.extractor`` change and ``EXTRACTOR_VERSION`` is bumped,
+this job re-runs entity extraction on the stored ``raw_text`` of every older
+resume, so the PDF/DOCX files are never parsed again, and refreshes the
+candidates' skills, experience, education, certifications and summary, with
+their text vectors and the document frequencies, in the same transaction.
+
+A candidate field is only overwritten if it still holds what the previous
+extraction produced, so edits made by recruiters are kept. Encrypted PII (name,
+email, phone) is not touched.
+
+Run from the backend directory (or POST /api/admin/reextraction):
+    python -m app.tasks.reextraction [--batch-size 200] [--workers N]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import deque
+from sqlalchemy import func
+from app.ai.extractor import EXTRACTOR_VERSION, extract_entities_batch
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.candidate import Candidate
+from app.models.checkpoint import JobCheckpoint
+from app.models.resume import Resume
+from app.services.candidate_vectors import sync_candidate_vectors
+
+logger = logging.getLogger(__name__)
+
+_running = threading.Lock()
+
+# Candidate columns filled from parsed_data, with the value extract_entities() omits
+CANDIDATE_FIELDS = {
+    "skills": [],
+    "experience": [],
+    "education": [],
+    "certifications": [],
+    "summary": "",
+}
+
+
+def checkpoint_name(version: int = EXTRACTOR_VERSION) -> str:
+    return f"reextraction:v{version}"
+
+
+def _stale_resumes(query):
+    version = func.coalesce(Resume.parsed_data["extractor_version"].as_integer(), 0)
+    return query.filter(
+        Resume.processing_status == "completed",
+        Resume.raw_text.isnot(None),
+        version < EXTRACTOR_VERSION,
+    )
+
+
+def get_reextraction_status(db) -> dict:
+    checkpoint = db.query(JobCheckpoint).filter(JobCheckpoint.name == checkpoint_name()).first()
+    return {
+        "extractor_version": EXTRACTOR_VERSION,
+        "running": _running.locked(),
+        "stale": _stale_resumes(db.query(func.count(Resume.id))).scalar(),
+        "status": checkpoint.status if checkpoint else "not_started",
+        "last_id": checkpoint.last_id if checkpoint else 0,
+        "processed": checkpoint.processed if checkpoint else 0,
+        "details": checkpoint.details if checkpoint else None,
+    }
+
+
+def _load_checkpoint(db, name: str) -> JobCheckpoint:
+    checkpoint = db.query(JobCheckpoint).filter(JobCheckpoint.name == name).first()
+    if not checkpoint:
+        checkpoint = JobCheckpoint(name=name, last_id=0, processed=0)
+        db.add(checkpoint)
+    checkpoint.status = "running"
+    db.commit()
+    return checkpoint
+
+
+def _candidate_updates(candidates: dict[int, Candidate], batch: list) -> list[dict]:
+    """Changed fields per candidate, skipping fields edited since the last extraction."""
+    updates = {}
+    for row, parsed in batch:
+        candidate = candidates.get(row.candidate_id)
+        if candidate is None:
+            continue
+        previous = row.parsed_data or {}
+        changes = updates.setdefault(candidate.id, {"id": candidate.id})
+        for field, default in CANDIDATE_FIELDS.items():
+            current = getattr(candidate, field)
+            new = parsed.get(field, default)
+            if current == previous.get(field, default) and current != new:
+                changes[field] = new
+    return [changes for changes in updates.values() if len(changes) > 1]
+
+
+def reextract_stale_resumes(batch_size: int = None, workers: int = None) -> dict:
+    """Re-extract every resume whose ``parsed_data`` predates ``EXTRACTOR_VERSION``.
+
+    Stale resumes are streamed in primary-key order on a read session and their
+    texts fed to ``extract_entities_batch``, which keeps the process pool busy
+    across batches. Results come back in order; each ``batch_size`` of them is
+    written, together with the checkpoint, on a separate write session.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.REEXTRACTION_BATCH_SIZE
+    if workers is None:
+        workers = settings.REEXTRACTION_WORKERS
+
+    if not _running.acquire(blocking=False):
+        raise RuntimeError("Re-extraction is already running in this process")
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    try:
+        checkpoint = _load_checkpoint(write_db, checkpoint_name())
+        rows = (
+            _stale_resumes(read_db.query(Resume.id, Resume.candidate_id, Resume.raw_text, Resume.parsed_data))
+            .filter(Resume.id > checkpoint.last_id)
+            .order_by(Resume.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+
+        started = time.monotonic()
+        resumes_updated = 0
+        candidates_updated = 0
+        in_flight = deque()
+
+        def texts():
+            for row in rows:
+                in_flight.append(row)
+                yield row.raw_text
+
+        def flush(batch: list):
+            nonlocal resumes_updated, candidates_updated
+            write_db.bulk_update_mappings(
+                Resume, [{"id": row.id, "parsed_data": parsed} for row, parsed in batch]
+            )
+            candidate_ids = {row.candidate_id for row, _ in batch}
+            candidates = {
+                c.id: c
+                for c in write_db.query(Candidate.id, *(getattr(Candidate, f) for f in CANDIDATE_FIELDS))
+                .filter(Candidate.id.in_(candidate_ids))
+            }
+            updates = _candidate_updates(candidates, batch)
+            if updates:
+                write_db.bulk_update_mappings(Candidate, updates)
+                # Keep vectors and document frequencies in step with the new texts
+                changed = write_db.query(Candidate).filter(Candidate.id.in_([u["id"] for u in updates])).all()
+                sync_candidate_vectors(write_db, changed)
+            resumes_updated += len(batch)
+            candidates_updated += len(updates)
+            checkpoint.last_id = batch[-1][0].id
+            checkpoint.processed = (checkpoint.processed or 0) + len(batch)
+            write_db.commit()
+
+        batch = []
+        for parsed in extract_entities_batch(texts(), workers=workers):
+            batch.append((in_flight.popleft(), parsed))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        elapsed = time.monotonic() - started
+        checkpoint.status = "completed"
+        checkpoint.details = {
+            "resumes": resumes_updated,
+            "candidates": candidates_updated,
+            "seconds": round(elapsed, 2),
+        }
+        write_db.commit()
+        logger.info("Re-extraction to extractor v%s completed: %s", EXTRACTOR_VERSION, checkpoint.details)
+        return {"extractor_version": EXTRACTOR_VERSION, **checkpoint.details}
+    except Exception as e:
+        write_db.rollback()
+        failed = write_db.query(JobCheckpoint).filter(JobCheckpoint.name == checkpoint_name()).first()
+        if failed:
+            failed.status = "failed"
+            failed.details = {"error": str(e)}
+            write_db.commit()
+        raise
+    finally:
+        read_db.close()
+        write_db.close()
+        _running.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract resumes parsed by an older extractor.")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    result = reextract_stale_resumes(args.batch_size, args.workers)
+    print(f"Re-extraction completed: {result}")
+
+
+if __name__ == "__main__":
+    main()
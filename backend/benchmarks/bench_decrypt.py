@@ -0,0 +1,50 @@
+"""Microbenchmark: per-field decrypt_data vs batched decrypt_many.
+
+Run from the backend directory:
+    python -m benchmarks.bench_decrypt
+"""
+
+import time
+from types import SimpleNamespace
+from app.security.encryption import PII_FIELDS, decrypt_data, decrypt_many, encrypt_data
+
+SIZES = (10, 100, 10000)
+
+
+def _make_rows(count: int) -> list:
+    return [
+        SimpleNamespace(
+            full_name_encrypted=encrypt_data(f"Candidate {i}"),
+            email_encrypted=encrypt_data(f"candidate{i}@example.com"),
+            phone_encrypted=encrypt_data("" if i % 3 == 0 else f"+62 812 {i:08d}"),
+        )
+        for i in range(count)
+    ]
+
+
+def _per_field(rows: list) -> list:
+    return [
+        {field: decrypt_data(getattr(row, field)) for field in PII_FIELDS}
+        for row in rows
+    ]
+
+
+def _timed(func, rows: list) -> float:
+    start = time.perf_counter()
+    func(rows)
+    return time.perf_counter() - start
+
+
+def main():
+    encrypt_data("warm-up")  # derive the key outside the timings
+    print(f"{'rows':>8} {'per-field ms':>14} {'decrypt_many ms':>16} {'speedup':>8}")
+    for size in SIZES:
+        rows = _make_rows(size)
+        assert _per_field(rows) == decrypt_many(rows)
+        baseline = _timed(_per_field, rows)
+        batched = _timed(decrypt_many, rows)
+        print(f"{size:>8} {baseline * 1000:>14.2f} {batched * 1000:>16.2f} {baseline / batched:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark: ``extract_entities`` in a loop vs ``extract_entities_batch``.
+
+The corpus CVs are repeated (with a distinguishing line each) to simulate a
+bulk re-extraction of stored resumes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_entities_batch [documents] [workers]
+"""
+
+import glob
+import os
+import sys
+import time
+from app.ai.extractor import extract_entities, extract_entities_batch
+from app.ai.parser import extract_text
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    corpus = [extract_text(path, "docx") for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.docx")))]
+    texts = [f"{corpus[i % len(corpus)]}\nRef {i}" for i in range(count)]
+
+    start = time.perf_counter()
+    expected = [extract_entities(text) for text in texts]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = list(extract_entities_batch(texts, workers=workers))
+    batch = time.perf_counter() - start
+    assert results == expected
+
+    print(f"{count} documents, {workers} workers")
+    print(f"loop  {loop:8.2f}s {count / loop:10.0f} docs/s")
+    print(f"batch {batch:8.2f}s {count / batch:10.0f} docs/s ({loop / batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
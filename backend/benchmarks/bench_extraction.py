@@ -0,0 +1,88 @@
+"""Benchmark: text-extraction backends on the ``test_cvs`` corpus.
+
+The corpus only ships DOCX files, so each CV is also rendered to a
+single-column PDF (reportlab) to exercise the PDF backends, and a table-heavy
+DOCX (one row per skill/project, as some CV templates do) is generated.
+
+Run from the backend directory:
+    python -m benchmarks.bench_extraction
+"""
+
+import glob
+import os
+import tempfile
+import time
+import tracemalloc
+from docx import Document
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from app.ai.parser import _BACKENDS, extract_document, looks_degenerate
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs")
+REPEATS = 20
+TABLE_ROWS = 300
+
+
+def _render_pdf(text: str, path: str):
+    pdf = canvas.Canvas(path, pagesize=A4)
+    y = 800
+    for line in text.splitlines():
+        if y < 60:
+            pdf.showPage()
+            y = 800
+        pdf.drawString(50, y, line[:110])
+        y -= 14
+    pdf.save()
+
+
+def _table_heavy_docx(path: str):
+    doc = Document()
+    doc.add_paragraph("Curriculum Vitae")
+    table = doc.add_table(rows=TABLE_ROWS, cols=4)
+    for i, row in enumerate(table.rows):
+        for j, cell in enumerate(row.cells):
+            cell.text = f"Project {i} item {j} Python Django PostgreSQL"
+    doc.save(path)
+
+
+def _peak_kb(func, path: str) -> int:
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak // 1024
+
+
+def _timed(func, path: str) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func(path)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    docx_files = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.docx")))
+    with tempfile.TemporaryDirectory() as tmp:
+        documents = [(path, "docx") for path in docx_files]
+        table_path = os.path.join(tmp, "table_heavy.docx")
+        _table_heavy_docx(table_path)
+        documents.append((table_path, "docx"))
+        for path in docx_files:
+            pdf_path = os.path.join(tmp, os.path.basename(path).replace(".docx", ".pdf"))
+            _render_pdf(extract_document(path, "docx").text, pdf_path)
+            documents.append((pdf_path, "pdf"))
+
+        print(f"{'file':<28} {'backend':<12} {'ms':>8} {'peak KB':>8} {'chars':>7} {'verdict':<14}")
+        for path, file_type in documents:
+            name = os.path.basename(path)
+            for backend, func in _BACKENDS[file_type].items():
+                text = func(path)
+                verdict = looks_degenerate(text) or "ok"
+                ms = _timed(func, path) * 1000
+                print(f"{name:<28} {backend:<12} {ms:>8.2f} {_peak_kb(func, path):>8} {len(text):>7} {verdict:<14}")
+            chain_ms = _timed(lambda p: extract_document(p, file_type), path) * 1000
+            print(f"{name:<28} {'chain':<12} {chain_ms:>8.2f} -> {extract_document(path, file_type).engine}")
+
+
+if __name__ == "__main__":
+    main()
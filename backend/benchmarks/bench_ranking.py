@@ -0,0 +1,183 @@
+"""Benchmark: per-pair TF-IDF fits vs one fit per ranking run vs stored vectors.
+
+Candidates are synthesized from the ``test_cvs`` corpus (entities extracted
+once, then varied) and ranked against a sample job.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ranking [candidates]
+"""
+
+import glob
+import os
+import random
+import sys
+import time
+import numpy as np
+from scipy import sparse
+from types import SimpleNamespace
+from app.ai.extractor import extract_entities
+from app.ai.matcher import (
+    RunSimilarity,
+    SkillBitsets,
+    compute_experience_scores,
+    compute_similarity,
+    compute_skill_match,
+)
+from app.ai.parser import extract_text
+from app.ai.ranker import rank_candidates
+from app.ai.text_vectors import (
+    CandidateVectors,
+    DocumentFrequencies,
+    candidate_texts,
+    experience_text,
+    profile_text,
+    term_counts,
+)
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs")
+WORDS = "backend frontend api cloud data pipeline mobile payments logistics banking retail analytics".split()
+
+JOB = SimpleNamespace(
+    title="Senior Backend Engineer",
+    description="Build Python and Django REST APIs on AWS with PostgreSQL and Docker.",
+    requirements="5 years of backend development, microservices, CI/CD",
+    skills_required=["Python", "Django", "PostgreSQL", "Docker", "AWS"],
+    min_experience_years=5,
+    education_level="S1",
+)
+
+
+def _candidates(count: int) -> list:
+    profiles = [
+        extract_entities(extract_text(path, "docx"))
+        for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.docx")))
+    ]
+    rng = random.Random(0)
+    candidates = []
+    for i in range(count):
+        profile = profiles[i % len(profiles)]
+        experience = [
+            dict(exp, description=f"{exp['description']} {' '.join(rng.sample(WORDS, 3))}")
+            for exp in profile["experience"]
+        ]
+        candidates.append(SimpleNamespace(
+            id=i,
+            skills=profile["skills"],
+            experience=experience,
+            education=profile["education"],
+            certifications=profile["certifications"],
+            summary=f"{profile['summary']} {' '.join(rng.sample(WORDS, 4))}",
+        ))
+    return candidates
+
+
+def _per_pair(job_text: str, candidates: list) -> int:
+    """The previous approach: one vectorizer fitted per candidate and per experience entry."""
+    fits = 0
+    for candidate in candidates:
+        compute_similarity(profile_text(candidate), job_text)
+        for exp in candidate.experience:
+            compute_similarity(experience_text(exp), job_text)
+        fits += 1 + len(candidate.experience)
+    return fits
+
+
+def _per_run(job_text: str, candidates: list):
+    similarity = RunSimilarity(job_text, [profile_text(c) for c in candidates])
+    similarity.scores([experience_text(exp) for c in candidates for exp in c.experience])
+
+
+def _stored_vectors(candidates: list) -> tuple[CandidateVectors, DocumentFrequencies]:
+    """What load_candidate_vectors() returns once every candidate has been vectorized at upload."""
+    rows = [term_counts(candidate_texts(c)) for c in candidates]
+    vectors = CandidateVectors(
+        sparse.vstack([m[0] for m in rows], format="csr"),
+        sparse.vstack([m[1:] for m in rows], format="csr"),
+        np.concatenate([[0], np.cumsum([m.shape[0] - 1 for m in rows])]),
+    )
+    counts = np.bincount(vectors.profiles.indices, minlength=vectors.profiles.shape[1])
+    return vectors, DocumentFrequencies(counts, len(candidates))
+
+
+def _experience_loop(candidates: list, relevances: list) -> list[float]:
+    """The previous per-candidate experience scoring, given the entry relevances."""
+    scores, offset = [], 0
+    for candidate in candidates:
+        experience = candidate.experience
+        entry_relevances = relevances[offset:offset + len(experience)]
+        offset += len(experience)
+        if not experience:
+            scores.append(0.0)
+            continue
+        score = min(len(experience) * 15, 40) + sum(r * 30 for r in entry_relevances)
+        for exp in experience:
+            duration = exp.get("duration", "")
+            if "present" in duration.lower() or "sekarang" in duration.lower():
+                score += 10
+                break
+        scores.append(min(score, 100.0))
+    return scores
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    candidates = _candidates(count)
+    job_text = f"{JOB.title} {JOB.description} {JOB.requirements}"
+
+    start = time.perf_counter()
+    fits = _per_pair(job_text, candidates)
+    per_pair = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _per_run(job_text, candidates)
+    per_run = time.perf_counter() - start
+
+    vectors, frequencies = _stored_vectors(candidates)
+    start = time.perf_counter()
+    vectors.similarities(job_text, frequencies)
+    stored = time.perf_counter() - start
+
+    _, relevances = vectors.similarities(job_text, frequencies)
+    experiences = [c.experience for c in candidates]
+    start = time.perf_counter()
+    expected = _experience_loop(candidates, relevances.tolist())
+    experience_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = compute_experience_scores(experiences, relevances)
+    experience_batch = time.perf_counter() - start
+    assert np.allclose(batched, expected)
+
+    start = time.perf_counter()
+    per_candidate = [compute_skill_match(c.skills, JOB.skills_required)["score"] for c in candidates]
+    skills_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    skills = SkillBitsets([c.skills for c in candidates], JOB.skills_required)
+    skills_encode = time.perf_counter() - start
+    start = time.perf_counter()
+    bitset_scores = skills.scores()
+    skills_popcount = time.perf_counter() - start
+    assert np.allclose(bitset_scores, per_candidate, atol=0.01)
+
+    start = time.perf_counter()
+    rank_candidates(JOB, candidates)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rank_candidates(JOB, candidates, vectors, frequencies)
+    full_stored = time.perf_counter() - start
+
+    print(f"{count} candidates")
+    print(f"similarity, per pair ({fits} fits) {per_pair:8.2f}s")
+    print(f"similarity, one fit per run       {per_run:8.2f}s ({per_pair / per_run:.0f}x)")
+    print(f"similarity, stored vectors        {stored:8.2f}s ({per_pair / stored:.0f}x)")
+    print(f"experience scores, loop           {experience_loop * 1000:8.2f}ms")
+    print(f"experience scores, segment sum    {experience_batch * 1000:8.2f}ms")
+    print(f"skill match, per candidate        {skills_loop * 1000:8.2f}ms")
+    print(f"skill match, bitsets encode       {skills_encode * 1000:8.2f}ms")
+    print(f"skill match, bitsets AND+popcount {skills_popcount * 1000:8.2f}ms")
+    print(f"rank_candidates, one fit per run  {full:8.2f}s")
+    print(f"rank_candidates, stored vectors   {full_stored:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
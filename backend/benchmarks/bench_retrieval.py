@@ -0,0 +1,146 @@
+"""Benchmark: exhaustive ranking vs approximate top-N retrieval + ranking of the top N.
+
+Candidates are synthesized from the ``test_cvs`` corpus: each one takes most of
+its skills, experience entries and summary from one CV and a few from others,
+so the pool has realistic vocabulary and roles without exact duplicates.
+Recall@K is the share of the exhaustive ranking's top K that ranking only the
+retrieved top N also returns.
+
+Run from the backend directory:
+    python -m benchmarks.bench_retrieval [candidates] [top_k]
+"""
+
+import glob
+import os
+import random
+import sys
+import time
+import numpy as np
+from scipy import sparse
+from types import SimpleNamespace
+from app.ai.candidate_index import CandidateIndex, recall_at_k
+from app.ai.extractor import extract_entities
+from app.ai.parser import extract_text
+from app.ai.ranker import rank_candidates, retrieval_features, retrieval_query
+from app.ai.text_vectors import CandidateVectors, DocumentFrequencies, candidate_texts, term_counts
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs")
+
+JOBS = [
+    SimpleNamespace(
+        title="Senior Backend Engineer",
+        description="Build Python and Django REST APIs on AWS with PostgreSQL and Docker.",
+        requirements="5 years of backend development, microservices, CI/CD",
+        skills_required=["Python", "Django", "PostgreSQL", "Docker", "AWS"],
+        education_level="S1",
+    ),
+    SimpleNamespace(
+        title="Data Analyst",
+        description="Analyse sales data with SQL, Excel and Tableau dashboards.",
+        requirements="Statistics background, reporting for management",
+        skills_required=["SQL", "Excel", "Tableau"],
+        education_level="S1",
+    ),
+    SimpleNamespace(
+        title="Frontend Developer",
+        description="Build React and TypeScript web applications with a design system.",
+        requirements="HTML, CSS, JavaScript, REST API integration",
+        skills_required=["React", "TypeScript", "JavaScript", "CSS"],
+        education_level="D3",
+    ),
+]
+
+
+def _candidates(count: int) -> list:
+    profiles = [
+        extract_entities(extract_text(path, "docx"))
+        for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.docx")))
+    ]
+    sentences = [s.strip() for p in profiles for s in (p["summary"] or "").split(".") if s.strip()]
+    entries = [exp for p in profiles for exp in p["experience"]]
+    skills = sorted({skill for p in profiles for skill in p["skills"]})
+
+    rng = random.Random(0)
+    candidates = []
+    for i in range(count):
+        # Mostly one CV's profile, with some skills, entries and sentences of others
+        base = rng.choice(profiles)
+        own_sentences = [s.strip() for s in (base["summary"] or "").split(".") if s.strip()]
+        candidates.append(SimpleNamespace(
+            id=i,
+            summary=". ".join(own_sentences[:2] + rng.sample(sentences, 1)),
+            skills=(
+                rng.sample(base["skills"], max(1, len(base["skills"]) * 2 // 3)) if base["skills"] else []
+            ) + rng.sample(skills, 2),
+            experience=(
+                rng.sample(base["experience"], rng.randint(0, len(base["experience"])))
+                + rng.sample(entries, rng.randint(0, 1))
+            ),
+            education=base["education"],
+            certifications=base["certifications"],
+        ))
+    return candidates
+
+
+def _subset(vectors: CandidateVectors, rows: list[int]) -> CandidateVectors:
+    offsets = vectors.entry_offsets
+    rows = np.array(rows, dtype=np.int64)
+    entries = [vectors.entries[offsets[i]:offsets[i + 1]] for i in rows]
+    return CandidateVectors(
+        vectors.profiles[rows],
+        sparse.vstack(entries, format="csr"),
+        np.concatenate([[0], np.cumsum(offsets[rows + 1] - offsets[rows])]),
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    top_k = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    top_n = top_k * 4
+    candidates = _candidates(count)
+
+    rows = [term_counts(candidate_texts(c)) for c in candidates]
+    vectors = CandidateVectors(
+        sparse.vstack([m[0] for m in rows], format="csr"),
+        sparse.vstack([m[1:] for m in rows], format="csr"),
+        np.concatenate([[0], np.cumsum([m.shape[0] - 1 for m in rows])]),
+    )
+    frequencies = DocumentFrequencies(
+        np.bincount(vectors.profiles.indices, minlength=vectors.profiles.shape[1]), count,
+    )
+
+    start = time.perf_counter()
+    features, bias = retrieval_features(candidates, vectors, frequencies)
+    featurize = time.perf_counter() - start
+    n_lists = int(np.sqrt(count))
+    indexes = {}
+    for lists in (1, n_lists):
+        start = time.perf_counter()
+        indexes[lists] = CandidateIndex.train(range(count), features, bias, n_lists=lists)
+        print(f"index, {lists:4d} lists: built in {time.perf_counter() - start:.2f}s")
+    print(f"{count} candidates, features in {featurize:.2f}s, top_n={top_n}")
+
+    for job in JOBS:
+        start = time.perf_counter()
+        exhaustive = rank_candidates(job, candidates, vectors, frequencies)
+        exhaustive_time = time.perf_counter() - start
+        expected = [r["candidate_id"] for r in exhaustive]
+        query = retrieval_query(job, frequencies)
+
+        print(f"\n{job.title}: exhaustive rank_candidates {exhaustive_time:.3f}s")
+        for lists, probes in ((1, 1), (n_lists, n_lists // 8), (n_lists, n_lists // 4), (n_lists, n_lists // 2)):
+            start = time.perf_counter()
+            ids = indexes[lists].search(query, top_n, probes).candidate_ids.tolist()
+            search_time = time.perf_counter() - start
+            start = time.perf_counter()
+            ranked = rank_candidates(job, [candidates[i] for i in ids], _subset(vectors, ids), frequencies)
+            rank_time = time.perf_counter() - start
+            recall = recall_at_k(expected, [r["candidate_id"] for r in ranked], top_k)
+            print(
+                f"  {lists:4d} lists, {probes:3d} probed: search {search_time * 1000:7.2f}ms  "
+                f"rank top_n {rank_time:.3f}s  recall@{top_k} {recall:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
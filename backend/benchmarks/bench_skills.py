@@ -0,0 +1,56 @@
+"""Benchmark: per-skill regex scans vs the single-pass skill matcher.
+
+Run from the backend directory:
+    python -m benchmarks.bench_skills
+"""
+
+import glob
+import os
+import re
+import time
+from app.ai.extractor import _extract_skills
+from app.ai.skill_taxonomy import get_skill_taxonomy
+from app.ai.parser import extract_text
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs")
+REPEATS = 200
+
+
+def _per_skill(text: str) -> list[str]:
+    """The previous implementation: one ``\\b...\\b`` search per skill alias."""
+    text_lower = text.lower()
+    found_skills = []
+    for skill in get_skill_taxonomy().skills.values():
+        for alias in skill.aliases:
+            if re.search(r"\b" + re.escape(alias) + r"\b", text_lower):
+                found_skills.append(skill.name)
+    return list(set(found_skills))
+
+
+def _timed(func, text: str) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func(text)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    documents = [
+        (os.path.basename(path), extract_text(path, "docx"))
+        for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.docx")))
+    ]
+    documents.append(("all CVs x10", "\n".join(text for _, text in documents) * 10))
+
+    print(f"{'document':<24} {'chars':>7} {'skills':>6} {'per-skill ms':>13} {'matcher ms':>11} {'speedup':>8}")
+    for name, text in documents:
+        assert set(_per_skill(text)) == set(_extract_skills(text))
+        baseline = _timed(_per_skill, text)
+        matcher = _timed(_extract_skills, text)
+        print(
+            f"{name:<24} {len(text):>7} {len(_extract_skills(text)):>6} "
+            f"{baseline * 1000:>13.3f} {matcher * 1000:>11.3f} {baseline / matcher:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
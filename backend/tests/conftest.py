@@ -0,0 +1,53 @@
+"""Shared fixtures: an in-memory SQLite database with every table."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import app.models  # noqa: F401  (registers every table on Base)
+from app.database import Base
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(session_factory, tmp_path, monkeypatch):
+    """API client on the test database, signed in as an admin; uploads go to ``tmp_path``."""
+    from fastapi.testclient import TestClient
+    from app.config import get_settings
+    from app.database import get_db
+    from app.main import app
+    from app.models.user import User
+    from app.security.jwt_handler import get_current_user
+
+    monkeypatch.setattr(get_settings(), "UPLOAD_DIR", str(tmp_path))
+    session = session_factory()
+    user = User(email="admin@example.com", password_hash="x", full_name="Admin", role="admin")
+    session.add(user)
+    session.commit()
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    session.close()
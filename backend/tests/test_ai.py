@@ -1,10 +1,26 @@
 """Tests for the AI/NLP pipeline."""
 
+import asyncio
+import glob
+import os
+import numpy as np
 import pytest
+from types import SimpleNamespace
+from scipy import sparse
+from app.ai.extraction_engine import ExtractionEngine
+from app.ai import parser
+from app.ai.parser import extract_document, extract_text, iter_docx_blocks, iter_pdf_pages, looks_degenerate
+from app.config import get_settings
 from app.ai.preprocessor import preprocess_text, tokenize, remove_stopwords, get_clean_tokens
-from app.ai.extractor import extract_entities, _extract_email, _extract_phone, _extract_skills
-from app.ai.matcher import compute_similarity, compute_skill_match
-from app.ai.ranker import _generate_explanation
+from app.ai.extractor import EXTRACTOR_VERSION, extract_entities, extract_entities_batch, segment_sections, _extract_email, _extract_phone, _extract_skills
+from app.ai.matcher import (
+    RunSimilarity, SkillBitsets, compute_experience_score, compute_experience_scores, compute_similarity, compute_skill_match,
+)
+from app.ai.candidate_index import CandidateIndex, recall_at_k
+from app.ai.ranker import SEMANTIC_BLEND, _generate_explanation, rank_candidates, retrieval_features, retrieval_query
+from app.ai.skill_taxonomy import SkillTaxonomy, get_skill_taxonomy, normalize_skill
+from app.ai.text_vectors import CandidateVectors, DocumentFrequencies, candidate_texts, decode, encode, term_counts
+from app.ai.stage_timer import StageTimer, get_stage_histograms, reset_stage_histograms
 
 
 class TestPreprocessor:
@@ -77,11 +93,42 @@ class TestExtractor:
         assert "react" in skill_names
         assert "django" in skill_names
 
+    def test_extract_skills_overlapping_and_symbols(self):
+        skills = set(_extract_skills("Ruby on Rails, React Native, SQL Server, ASP.NET, C++ and Go"))
+        assert {"Ruby on Rails", "Ruby", "React Native", "React", "SQL Server", "SQL"} <= skills
+        assert {"ASP.NET", ".NET", "Go"} <= skills
+        # The trailing \b after "c++" needs a word character next to it, as before
+        assert "C++" not in skills
+        assert _extract_skills("golang") == ["Go"]
+
+    def test_extract_skills_collapses_aliases(self):
+        skills = _extract_skills("ReactJS, React.js and react; Postgres, K8s")
+        assert sorted(skills) == ["Kubernetes", "PostgreSQL", "React"]
+
+    def test_extract_entities_batch(self):
+        texts = [self.sample_cv, "", "Jane Roe\njane@example.com\nSkills: Go, Rust"] * 3
+        expected = [extract_entities(text) for text in texts]
+        assert list(extract_entities_batch(texts, workers=0)) == expected
+        # Lazy input, several chunks per worker, results back in input order
+        assert list(extract_entities_batch(iter(texts), workers=2, chunk_size=2)) == expected
+
+    def test_segment_sections(self):
+        sections = segment_sections(
+            "Budi\nRingkasan\nBackend engineer\n\nPENGALAMAN KERJA\nDev 2019 - 2021\n"
+            "Experience & Skills\nPython\nPendidikan\nS1 Informatika 2018"
+        )
+        assert sections.sections["experience"] == ["PENGALAMAN KERJA", "Dev 2019 - 2021"]
+        assert sections.sections["education"] == ["Pendidikan", "S1 Informatika 2018"]
+        assert sections.sections["skills"] == []  # a line naming two sections starts neither
+        assert sections.summary_headers == [1]
+        assert sections.headers[6] == {"experience", "skills"}
+
     def test_extract_entities_full(self):
         result = extract_entities(self.sample_cv)
         assert result["email"] == "john.doe@email.com"
         assert len(result["skills"]) > 0
         assert "python" in [s.lower() for s in result["skills"]]
+        assert result["extractor_version"] == EXTRACTOR_VERSION
 
 
 class TestMatcher:
@@ -97,6 +144,43 @@ class TestMatcher:
         assert compute_similarity("", "test") == 0.0
         assert compute_similarity("test", "") == 0.0
 
+    def test_run_similarity(self):
+        similarity = RunSimilarity(
+            "python django backend developer",
+            ["python django backend developer", "chef cooking recipes", ""],
+        )
+        scores = similarity.candidate_scores
+        assert scores[0] > 0.9
+        assert scores[1] == 0.0 and scores[2] == 0.0
+        assert similarity.scores(["django developer", "baking"])[0] > similarity.scores(["baking"])[0]
+        assert list(RunSimilarity("", ["python"]).scores(["python"])) == [0.0]
+
+    def test_experience_scores_match_per_candidate_formula(self):
+        experiences = [
+            [],
+            [{"title": "Dev", "duration": "2020 - present"}],
+            [{"title": "Dev", "duration": "2018 - 2019"}, {"title": "Lead", "duration": "2019 - Sekarang"}],
+            [{"title": f"Job {i}", "duration": "2010 - 2011"} for i in range(4)],
+        ]
+        relevances = [0.5, 0.1, 0.9, 0.2, 0.2, 0.2, 0.2]
+
+        def reference(experience, entry_relevances):
+            if not experience:
+                return 0.0
+            score = min(len(experience) * 15, 40) + sum(r * 30 for r in entry_relevances)
+            if any("present" in e["duration"].lower() or "sekarang" in e["duration"].lower() for e in experience):
+                score += 10
+            return min(score, 100.0)
+
+        expected, offset = [], 0
+        for experience in experiences:
+            expected.append(reference(experience, relevances[offset:offset + len(experience)]))
+            offset += len(experience)
+        assert compute_experience_scores(experiences, relevances) == pytest.approx(expected)
+        assert compute_experience_score(experiences[1], "anything") == 25.0
+        with pytest.raises(ValueError):
+            compute_experience_scores(experiences, relevances[:-1])
+
     def test_skill_match_full(self):
         result = compute_skill_match(
             ["Python", "JavaScript", "React"],
@@ -117,8 +201,180 @@ class TestMatcher:
         result = compute_skill_match(["Python"], [])
         assert result["score"] == 100.0
 
+    def test_skill_match_aliases(self):
+        result = compute_skill_match(["Reactjs", "Golang", "Postgres"], ["React.js", "Go", "PostgreSQL", "docker"])
+        assert result["matched"] == ["React", "Go", "PostgreSQL"]
+        assert result["missing"] == ["Docker"]
+        assert result["score"] == 75.0
+
+    def test_skill_match_is_exact(self):
+        # Substring matching used to let "R" satisfy any requirement containing an "r"
+        result = compute_skill_match(["R", "Java"], ["Docker", "JavaScript", "Rust"])
+        assert result["score"] == 0.0
+        assert result["missing"] == ["Docker", "JavaScript", "Rust"]
+
+    def test_skill_match_unknown_skills(self):
+        result = compute_skill_match(["Cobol  Mainframe"], ["cobol mainframe", "Fortran"])
+        assert result["matched"] == ["cobol mainframe"]
+        assert result["missing"] == ["Fortran"]
+
+    def test_skill_bitsets_match_per_candidate(self):
+        pool = [
+            ["Python", "Reactjs", "COBOL"],
+            [],
+            ["golang", "Docker", "Kubernetes", "cobol mainframe"],
+            ["R"],
+        ]
+        for required in (["Python", "React.js", "Go", "Cobol Mainframe", "docker"], [], [" "]):
+            skills = SkillBitsets(pool, required)
+            expected = [compute_skill_match(candidate, required) for candidate in pool]
+            assert [skills.match(row) for row in range(len(pool))] == expected
+            assert skills.scores() == pytest.approx([e["score"] for e in expected], abs=0.01)
+        assert SkillBitsets(pool, ["Python", "Docker"]).matched_counts().tolist() == [1, 0, 1, 0]
+
+
+class TestSkillTaxonomy:
+    def test_bundled_taxonomy(self):
+        taxonomy = get_skill_taxonomy()
+        react = taxonomy.lookup("  ReactJS ")
+        assert react.name == "React"
+        assert {"react", "reactjs", "react.js"} <= set(react.aliases)
+        assert taxonomy.lookup("Tailwind CSS") == taxonomy.lookup("tailwind")
+        assert taxonomy.lookup("cobol") is None
+
+    def test_canonicalize(self):
+        taxonomy = get_skill_taxonomy()
+        assert taxonomy.canonicalize(["k8s", "Kubernetes", " Foo  Bar ", "", "golang"]) == ["Kubernetes", "Foo Bar", "Go"]
+        assert taxonomy.keys(["nodejs", "Node.js"]) == {taxonomy.lookup("node.js").id}
+
+    def test_normalize_skill(self):
+        assert normalize_skill("  Spring   Boot ") == "spring boot"
+
+    def test_rejects_conflicting_aliases(self):
+        with pytest.raises(ValueError):
+            SkillTaxonomy([{"id": 1, "name": "Go", "aliases": ["golang"]}, {"id": 2, "name": "Golang"}])
+        with pytest.raises(ValueError):
+            SkillTaxonomy([{"id": 1, "name": "Go"}, {"id": 1, "name": "Rust"}])
+
+
+class TestTextVectors:
+    candidate = SimpleNamespace(
+        summary="Backend developer",
+        skills=["Python", "Django"],
+        experience=[{"title": "Python Developer", "company": "PT A", "description": "Django REST APIs"}],
+    )
+
+    def test_encode_roundtrip(self):
+        matrix = term_counts(candidate_texts(self.candidate))
+        assert matrix.shape[0] == 2
+        decoded = decode(**encode(matrix))
+        assert (decoded != matrix).nnz == 0
+
+    def test_similarities(self):
+        other = SimpleNamespace(summary="Chef", skills=[], experience=[])
+        rows = [term_counts(candidate_texts(c)) for c in (self.candidate, other)]
+        vectors = CandidateVectors(
+            sparse.vstack([rows[0][0], rows[1][0]], format="csr"), rows[0][1:], np.array([0, 1, 1]),
+        )
+        frequencies = DocumentFrequencies(np.bincount(vectors.profiles.indices, minlength=vectors.profiles.shape[1]), 2)
+        profiles, entries = vectors.similarities("Python Django developer", frequencies)
+        assert profiles[0] > 0.3 and profiles[1] == 0.0
+        assert entries.shape == (1,) and entries[0] > 0.3
+
+    def test_similarities_without_experience(self):
+        other = SimpleNamespace(summary="Chef", skills=[], experience=[])
+        profiles = term_counts(candidate_texts(other))
+        vectors = CandidateVectors(profiles, sparse.csr_matrix((0, profiles.shape[1])), np.array([0, 0]))
+        frequencies = DocumentFrequencies(np.bincount(profiles.indices, minlength=profiles.shape[1]), 1)
+        scores, entries = vectors.similarities("Chef", frequencies)
+        assert scores[0] == pytest.approx(1.0) and entries.shape == (0,)
+
+
+class TestCandidateIndex:
+    def _rows(self, seed=0, count=200):
+        rng = np.random.default_rng(seed)
+        rows = sparse.random(count, 50, density=0.1, format="csr", dtype=np.float32, random_state=rng)
+        return rows, rng.random(count).astype(np.float32)
+
+    def test_flat_search_is_exact(self):
+        rows, bias = self._rows()
+        index = CandidateIndex.train(range(100, 300), rows, bias)
+        query = sparse.random(1, 50, density=0.3, format="csr", random_state=1)
+        expected = np.argsort(-(rows @ query.T).toarray().ravel() - bias, kind="stable")[:10] + 100
+        neighbours = index.search(query, 10)
+        assert neighbours.candidate_ids.tolist() == expected.tolist()
+        assert np.all(np.diff(neighbours.scores) <= 0)
+
+    def test_incremental_updates(self):
+        rows, bias = self._rows()
+        for n_lists in (1, 8):
+            index = CandidateIndex.train(range(200), rows, bias, n_lists=n_lists, probes=n_lists)
+            query = sparse.csr_matrix(np.ones((1, 50), dtype=np.float32))
+            best = index.search(query, 1).candidate_ids[0]
+            index.remove([best, 999])
+            assert len(index) == 199 and best not in index
+            assert best not in index.search(query, 200).candidate_ids
+            # Re-adding replaces; a strong new row goes straight to the top
+            index.add([best, 500], sparse.diags([1.0, 100.0]) @ rows[[best, 0]], np.zeros(2))
+            assert len(index) == 201
+            assert index.search(query, 1).candidate_ids.tolist() == [500]
+            index.remove(range(150))
+            assert sorted(index.search(query, 300).candidate_ids.tolist()) == list(range(150, 200)) + [500]
+
+    @pytest.mark.parametrize("skills_required", [["Python", "Django", "Kubernetes"], []])
+    def test_features_score_like_rank_candidates(self, skills_required):
+        job = SimpleNamespace(
+            title="Python Developer", description="Django REST APIs", requirements=None,
+            skills_required=skills_required, education_level=None,
+        )
+        candidates = [
+            SimpleNamespace(
+                id=1, summary="Backend developer", skills=["Python", "Django"], certifications=["AWS Certified"],
+                education=[{"degree": "S1 Informatika", "institution": "Universitas Indonesia"}],
+                experience=[{"title": "Python Developer", "company": "PT A", "description": "Django REST APIs",
+                             "duration": "2020 - present"}],
+            ),
+            SimpleNamespace(id=2, summary="Chef", skills=["Cooking"], certifications=[], education=[], experience=[]),
+        ]
+        rows = [term_counts(candidate_texts(c)) for c in candidates]
+        vectors = CandidateVectors(
+            sparse.vstack([m[0] for m in rows], format="csr"), rows[0][1:], np.array([0, 1, 1]),
+        )
+        frequencies = DocumentFrequencies(np.bincount(vectors.profiles.indices, minlength=vectors.profiles.shape[1]), 2)
+        features, bias = retrieval_features(candidates, vectors, frequencies)
+        scores = (features @ retrieval_query(job, frequencies).T).toarray().ravel() + bias
+        expected = {r["candidate_id"]: r["overall_score"] for r in rank_candidates(job, candidates, vectors, frequencies)}
+        # No skill credit for a job that requires none
+        offset = 0 if skills_required else (1 - SEMANTIC_BLEND) * get_settings().SKILL_WEIGHT * 100
+        assert scores == pytest.approx([expected[1] - offset, expected[2] - offset], abs=0.01)
+
+    def test_recall_at_k(self):
+        assert recall_at_k([1, 2, 3, 4], [4, 2, 9], 2) == 0.5
+        assert recall_at_k([], [1], 5) == 1.0
+
 
 class TestRanker:
+    def test_rank_candidates(self):
+        job = SimpleNamespace(
+            title="Python Developer", description="Django REST APIs", requirements=None,
+            skills_required=["Python", "Django"], min_experience_years=0, education_level=None,
+        )
+
+        def candidate(id, skills, title, description):
+            return SimpleNamespace(
+                id=id, skills=skills, education=[], certifications=[], summary=f"{title} {description}",
+                experience=[{"title": title, "company": "PT A", "description": description, "duration": "2020 - present"}],
+            )
+
+        results = rank_candidates(job, [
+            candidate(1, ["Excel"], "Accountant", "Monthly financial reports"),
+            candidate(2, ["Python", "Django"], "Python Developer", "Built Django REST APIs"),
+        ])
+        assert [r["candidate_id"] for r in results] == [2, 1]
+        assert [r["rank_position"] for r in results] == [1, 2]
+        assert results[0]["semantic_similarity"] > results[1]["semantic_similarity"] == 0.0
+        assert results[0]["experience_score"] > results[1]["experience_score"]
+
     def test_generate_explanation(self):
         explanation = _generate_explanation(
             skill_score=80.0,
@@ -130,3 +386,211 @@ class TestRanker:
         )
         assert "skill" in explanation.lower() or "cocok" in explanation.lower()
         assert len(explanation) > 20
+
+
+class TestExtractionEngine:
+    test_cvs = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "test_cvs", "*.docx")))
+
+    def test_pool_extracts_in_order(self):
+        engine = ExtractionEngine(workers=2, timeout=30, max_memory_mb=1024, max_tasks_per_child=10)
+        try:
+            documents = [(path, "docx") for path in self.test_cvs] + [("/missing.pdf", "pdf")]
+            results = asyncio.run(engine.extract_many(documents))
+        finally:
+            engine.shutdown()
+        assert len(results) == len(documents)
+        for (path, _), result in zip(documents[:-1], results):
+            assert result.error is None
+            assert result.text == extract_text(path, "docx")
+        assert results[-1].error
+
+    def test_inline_mode(self):
+        engine = ExtractionEngine(workers=0, timeout=30, max_memory_mb=0, max_tasks_per_child=0)
+        result = asyncio.run(engine.extract(self.test_cvs[0], "docx"))
+        assert result.error is None and result.text
+        assert result.engine == "docx-xml"
+        assert result.stats()["attempts"][0]["accepted"]
+
+
+class TestPdfStreaming:
+    @pytest.fixture
+    def long_pdf(self, tmp_path):
+        from reportlab.pdfgen import canvas
+
+        path = str(tmp_path / "portfolio.pdf")
+        pdf = canvas.Canvas(path)
+        for page in range(12):
+            pdf.drawString(72, 720, f"Page {page + 1} Python Django portfolio project")
+            pdf.showPage()
+        pdf.save()
+        return path
+
+    def test_iter_pdf_pages_respects_page_limit(self, long_pdf):
+        pages = list(iter_pdf_pages(long_pdf, max_pages=3))
+        assert len(pages) == 3
+        assert pages[0].startswith("Page 1")
+        assert len(list(iter_pdf_pages(long_pdf))) == 12
+
+    def test_iter_pdf_pages_truncates_pages(self, long_pdf):
+        assert all(len(p) <= 6 for p in iter_pdf_pages(long_pdf, max_chars_per_page=6))
+
+    def test_extract_stops_early(self, long_pdf, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "MAX_PDF_PAGES", 0)
+        monkeypatch.setattr(settings, "PDF_TARGET_CHARS", 60)
+        assert extract_text(long_pdf, "pdf").count("Page") == 2
+
+
+class TestExtractionBackends:
+    good_text = "Software engineer with five years of Python and Django experience. " * 5
+
+    @pytest.fixture
+    def fake_pdf_backends(self, monkeypatch):
+        calls = []
+        outputs = {}
+
+        def backend(name):
+            def extract(file_path):
+                calls.append(name)
+                if isinstance(outputs[name], Exception):
+                    raise outputs[name]
+                return outputs[name]
+            return extract
+
+        monkeypatch.setitem(parser._BACKENDS, "pdf", {"fast": backend("fast"), "layout": backend("layout")})
+        monkeypatch.setattr(get_settings(), "PDF_BACKENDS", "fast,layout")
+        return calls, outputs
+
+    def test_fast_path_accepted(self, fake_pdf_backends):
+        calls, outputs = fake_pdf_backends
+        outputs.update(fast=self.good_text, layout="layout text")
+        result = extract_document("cv.pdf", "pdf")
+        assert (result.engine, calls) == ("fast", ["fast"])
+
+    def test_falls_back_on_degenerate_text(self, fake_pdf_backends):
+        calls, outputs = fake_pdf_backends
+        outputs.update(fast="(cid:3)(cid:4)", layout=self.good_text)
+        result = extract_document("cv.pdf", "pdf")
+        assert result.engine == "layout"
+        assert [a["accepted"] for a in result.attempts] == [False, True]
+        assert result.attempts[0]["reason"] == "too_short"
+
+    def test_keeps_degenerate_text_when_fallback_fails(self, fake_pdf_backends):
+        _, outputs = fake_pdf_backends
+        outputs.update(fast="short", layout=ValueError("broken"))
+        result = extract_document("cv.pdf", "pdf")
+        assert (result.text, result.engine) == ("short", "fast")
+        outputs.update(fast=ValueError("broken"))
+        with pytest.raises(ValueError):
+            extract_document("cv.pdf", "pdf")
+
+    def test_looks_degenerate(self, monkeypatch):
+        assert looks_degenerate(self.good_text) is None
+        assert looks_degenerate("S o f t w a r e  e n g i n e e r " * 20) == "fragmented_words"
+        assert looks_degenerate("(cid:12)" * 40) == "unmapped_glyphs"
+        assert looks_degenerate("12/05/2020 - 13/06/2021 " * 20) == "low_letter_ratio"
+        assert looks_degenerate("Softwareengineerwithfiveyears " * 20) == "run_together_words"
+        monkeypatch.setattr(get_settings(), "EXTRACTION_MIN_CHARS", 0)
+        assert looks_degenerate(" \n\t ") == "too_short"
+
+    def test_unknown_type(self):
+        with pytest.raises(ValueError):
+            extract_text("cv.txt", "txt")
+
+
+class TestDocxStreaming:
+    test_cvs = TestExtractionEngine.test_cvs
+
+    @pytest.fixture
+    def merged_table_docx(self, tmp_path):
+        from docx import Document
+
+        doc = Document()
+        doc.add_paragraph("Budi Santoso")
+        table = doc.add_table(rows=3, cols=3)
+        for i, row in enumerate(table.rows):
+            for j, cell in enumerate(row.cells):
+                cell.text = f"r{i}c{j}"
+        table.cell(0, 0).merge(table.cell(0, 1))
+        table.cell(1, 2).merge(table.cell(2, 2))
+        table.cell(2, 1).add_table(rows=1, cols=1).cell(0, 0).text = "nested"
+        run = doc.add_paragraph("Skills:\tPython").add_run("Django")
+        run.add_break()
+        run.add_text("SQL")
+        path = str(tmp_path / "merged.docx")
+        doc.save(path)
+        return path
+
+    def test_matches_python_docx(self, merged_table_docx):
+        for path in self.test_cvs + [merged_table_docx]:
+            assert parser._extract_from_docx_xml(path) == parser._extract_from_docx(path)
+
+    def test_blocks_in_document_order(self, merged_table_docx):
+        kinds = [kind for kind, _ in iter_docx_blocks(merged_table_docx)]
+        assert kinds == ["paragraph", "row", "row", "row", "paragraph"]
+
+    def test_table_without_grid(self, tmp_path):
+        from docx import Document
+
+        doc = Document()
+        table = doc.add_table(rows=2, cols=2)
+        for i, row in enumerate(table.rows):
+            for j, cell in enumerate(row.cells):
+                cell.text = f"r{i}c{j}"
+        table._tbl.remove(table._tbl.tblGrid)
+        path = str(tmp_path / "nogrid.docx")
+        doc.save(path)
+        assert parser._extract_from_docx_xml(path) == "r0c0 | r0c1\nr1c0 | r1c1"
+
+    def test_irregular_rows(self, tmp_path):
+        from docx import Document
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls
+
+        doc = Document()
+        table = doc.add_table(rows=2, cols=3)
+        for i, row in enumerate(table.rows):
+            for j, cell in enumerate(row.cells):
+                cell.text = f"r{i}c{j}"
+        # First row starts one column in and has only two cells; the second
+        # row's last cell continues the one above it
+        first, second = (row._tr for row in table.rows)
+        first.remove(first.tc_lst[0])
+        first.insert(0, parse_xml(f'<w:trPr {nsdecls("w")}><w:gridBefore w:val="1"/></w:trPr>'))
+        second.tc_lst[2].get_or_add_tcPr().append(parse_xml(f'<w:vMerge {nsdecls("w")}/>'))
+        path = str(tmp_path / "irregular.docx")
+        doc.save(path)
+        assert parser._extract_from_docx_xml(path) == "r0c1 | r0c2\nr1c0 | r1c1 | r0c2"
+
+
+class TestStageTimer:
+    def setup_method(self):
+        reset_stage_histograms()
+
+    def test_records_sub_extractors(self):
+        timer = StageTimer("cv.pdf")
+        with timer.stage("extract_entities"):
+            extract_entities("Budi Santoso\nbudi@example.com\nSkills\nPython", timer)
+        stages = timer.as_dict()
+        assert {"extract_entities", "extract_entities.sections", "extract_entities.skills"} <= set(stages)
+        assert timer.total() == pytest.approx(stages["extract_entities"], abs=1e-3)
+
+    def test_histograms(self):
+        for seconds in (0.0005, 0.003, 0.003, 20):
+            timer = StageTimer()
+            timer.add("db_commit", seconds)
+            timer.finish()
+        histogram = get_stage_histograms()["db_commit"]
+        assert histogram["count"] == 4
+        assert histogram["max_ms"] == 20000
+        assert (histogram["buckets"]["1"], histogram["buckets"]["5"], histogram["buckets"]["inf"]) == (1, 2, 1)
+
+    def test_slow_document_logged(self, caplog, monkeypatch):
+        monkeypatch.setattr(get_settings(), "SLOW_DOCUMENT_SECONDS", 1.0)
+        timer = StageTimer("lambat.pdf")
+        timer.add("save", 0.1)
+        timer.add("extract_text", 2.0)
+        timer.add("extract_text.pdfplumber", 1.9)
+        with caplog.at_level("WARNING", logger="app.ai.stage_timer"):
+            timer.finish()
+        assert "lambat.pdf" in caplog.text and "mostly in extract_text" in caplog.text
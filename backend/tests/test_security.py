@@ -0,0 +1,311 @@
+"""Tests for PII encryption and the keyring."""
+
+import asyncio
+import bcrypt
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from cryptography.fernet import InvalidToken
+from fastapi import HTTPException
+from app.models.candidate import Candidate
+from app.models.checkpoint import JobCheckpoint
+from app.security import passwords
+from app.security.passwords import hash_cost, needs_rehash
+from app.security.encryption import encrypt_data, decrypt_data, decrypt_many
+from app.security.principal_cache import PrincipalCache, UserPrincipal
+from app.security.blind_index import (
+    apply_blind_indexes,
+    blind_index,
+    email_index,
+    name_index,
+    name_token_indexes,
+    normalize_name_tokens,
+    phone_index,
+)
+from app.security.keyring import (
+    build_keyring,
+    clear_keyring_cache,
+    get_keyring,
+    get_keyring_stats,
+    parse_retired_keys,
+)
+from app.tasks import key_rotation
+from app.tasks.blind_index_backfill import CHECKPOINT_NAME as BACKFILL_CHECKPOINT, backfill_blind_indexes
+
+
+class TestKeyring:
+    def setup_method(self):
+        clear_keyring_cache()
+
+    def test_roundtrip(self):
+        token = encrypt_data("john.doe@email.com")
+        assert decrypt_data(token) == "john.doe@email.com"
+
+    def test_empty_values(self):
+        assert encrypt_data("") == b""
+        assert decrypt_data(b"") == ""
+
+    def test_key_derived_once_per_process(self):
+        for _ in range(20):
+            decrypt_data(encrypt_data("Jane"))
+        stats = get_keyring_stats()
+        assert stats["derivations"] == 1
+        assert stats["misses"] == 1
+        assert stats["hits"] == 39
+
+    def test_retired_key_still_decrypts(self):
+        old_ring = build_keyring("old-key", 1, {})
+        new_ring = build_keyring("new-key", 2, {1: "old-key"})
+        token = old_ring.encrypt(b"secret")
+        assert new_ring.decrypt(token) == b"secret"
+        assert new_ring.versions == [1, 2]
+        with pytest.raises(InvalidToken):
+            old_ring.decrypt(new_ring.encrypt(b"secret"))
+
+    def test_rotate_reencrypts_only_old_tokens(self):
+        old_ring = build_keyring("old-key", 1, {})
+        new_ring = build_keyring("new-key", 2, {1: "old-key"})
+        rotated = new_ring.rotate(old_ring.encrypt(b"secret"))
+        assert build_keyring("new-key", 2, {}).decrypt(rotated) == b"secret"
+        assert new_ring.rotate(rotated) is None
+
+    def test_default_key_is_version_one(self):
+        assert get_keyring().current_version == 1
+
+    def test_parse_retired_keys(self):
+        assert parse_retired_keys("") == {}
+        assert parse_retired_keys("1:abc, 2:d:e") == {1: "abc", 2: "d:e"}
+        with pytest.raises(ValueError):
+            parse_retired_keys("abc")
+
+
+class TestDecryptMany:
+    def test_decrypts_rows_and_skips_empty(self):
+        rows = [
+            SimpleNamespace(full_name_encrypted=encrypt_data("Ani"), email_encrypted=b"", phone_encrypted=None),
+            None,
+            SimpleNamespace(full_name_encrypted=encrypt_data("Budi"), email_encrypted=encrypt_data("b@x.id"), phone_encrypted=b""),
+        ]
+        result = decrypt_many(rows)
+        assert result[0] == {"full_name_encrypted": "Ani", "email_encrypted": "", "phone_encrypted": ""}
+        assert result[1] == {"full_name_encrypted": "", "email_encrypted": "", "phone_encrypted": ""}
+        assert result[2]["email_encrypted"] == "b@x.id"
+
+    def test_large_batch_preserves_order(self):
+        rows = [SimpleNamespace(full_name_encrypted=encrypt_data(f"n{i}")) for i in range(200)]
+        result = decrypt_many(rows, ("full_name_encrypted",))
+        assert [r["full_name_encrypted"] for r in result] == [f"n{i}" for i in range(200)]
+
+
+class TestBlindIndex:
+    def test_email_index_is_normalized(self):
+        assert email_index(" John.Doe@Email.com ") == email_index("john.doe@email.com")
+        assert email_index("") is None
+
+    def test_phone_index_folds_country_code(self):
+        assert phone_index("+62 812-3456-7890") == phone_index("081234567890")
+
+    def test_name_tokens(self):
+        assert normalize_name_tokens("Budi  SANTOSO, S.Kom") == ["budi", "santoso", "kom"]
+        assert set(name_token_indexes("budi")) <= set(name_token_indexes("Budi Santoso"))
+
+    def test_purposes_do_not_collide(self):
+        assert blind_index("budi", "name_token") != blind_index("budi", "email")
+
+
+class TestPrincipalCache:
+    def _principal(self, user_id: int, role: str = "recruiter") -> UserPrincipal:
+        return UserPrincipal(user_id, f"u{user_id}@example.com", None, role, None, None)
+
+    def test_hit_and_miss(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        assert cache.get(1, 100) is None
+        cache.put(100, self._principal(1))
+        assert cache.get(1, 100).role == "recruiter"
+        assert cache.get(1, 200) is None  # different token
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-3)
+
+    def test_ttl_expiry(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=0)
+        cache.put(100, self._principal(1))
+        assert cache.get(1, 100) is None
+        assert cache.stats()["expired"] == 1
+
+    def test_lru_eviction(self):
+        cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+        cache.put(1, self._principal(1))
+        cache.put(2, self._principal(2))
+        cache.get(1, 1)
+        cache.put(3, self._principal(3))
+        assert cache.get(2, 2) is None
+        assert cache.get(1, 1) is not None
+
+    def test_invalidate_user(self):
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put(100, self._principal(1))
+        cache.put(200, self._principal(1))
+        cache.put(100, self._principal(2))
+        cache.invalidate(1)
+        assert cache.get(1, 100) is None and cache.get(1, 200) is None
+        assert cache.get(2, 100) is not None
+
+    def test_snapshot_is_immutable(self):
+        with pytest.raises(AttributeError):
+            self._principal(1).role = "admin"
+
+
+class TestPasswords:
+    def test_hash_and_verify(self):
+        hashed = asyncio.run(passwords.hash_password("rahasia"))
+        assert hash_cost(hashed) == passwords.settings.BCRYPT_ROUNDS
+        assert asyncio.run(passwords.verify_password("rahasia", hashed))
+        assert not asyncio.run(passwords.verify_password("salah", hashed))
+
+    def test_needs_rehash_on_cost_change(self):
+        weak = bcrypt.hashpw(b"rahasia", bcrypt.gensalt(rounds=4)).decode()
+        assert hash_cost(weak) == 4
+        assert needs_rehash(weak)
+        assert needs_rehash("not-a-bcrypt-hash")
+
+    def test_rejects_when_saturated(self, monkeypatch):
+        monkeypatch.setattr(passwords, "_pending", passwords.settings.PASSWORD_HASH_MAX_PENDING)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(passwords.hash_password("rahasia"))
+        assert exc.value.status_code == 503
+
+
+class TestKeyRotation:
+    OLD = build_keyring("old-key", 1, {})
+    NEW = build_keyring("new-key", 2, {1: "old-key"})
+    EDITED = datetime(2020, 1, 1)
+
+    @pytest.fixture(autouse=True)
+    def candidates(self, db, session_factory, monkeypatch):
+        monkeypatch.setattr(key_rotation, "SessionLocal", session_factory)
+        monkeypatch.setattr(key_rotation, "get_keyring", lambda: self.NEW)
+        for i in range(5):
+            db.add(Candidate(
+                full_name_encrypted=self.OLD.encrypt(f"Kandidat {i}".encode()),
+                email_encrypted=self.OLD.encrypt(f"k{i}@example.com".encode()),
+                phone_encrypted=b"",
+                updated_at=self.EDITED,
+            ))
+        db.commit()
+
+    def _rotated_ids(self, db) -> list[int]:
+        db.expire_all()
+        current_only = build_keyring("new-key", 2, {})
+        rotated = []
+        for candidate in db.query(Candidate).order_by(Candidate.id):
+            try:
+                current_only.decrypt(candidate.full_name_encrypted)
+                current_only.decrypt(candidate.email_encrypted)
+            except InvalidToken:
+                continue
+            rotated.append(candidate.id)
+        return rotated
+
+    def test_rotates_without_touching_updated_at(self, db):
+        result = key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=0)
+        assert (result["scanned"], result["rewritten"]) == (5, 5)
+        assert self._rotated_ids(db) == [1, 2, 3, 4, 5]
+        assert {c.updated_at for c in db.query(Candidate)} == {self.EDITED}
+        assert db.get(Candidate, 1).phone_encrypted == b""
+
+    def test_resumes_from_checkpoint_after_failure(self, db, monkeypatch):
+        rotate_batch = key_rotation._rotate_batch
+        batches = []
+
+        def failing_second_batch(keyring, rows):
+            batches.append([row.id for row in rows])
+            if len(batches) == 2:
+                raise RuntimeError("connection lost")
+            return rotate_batch(keyring, rows)
+
+        monkeypatch.setattr(key_rotation, "_rotate_batch", failing_second_batch)
+        with pytest.raises(RuntimeError):
+            key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=0)
+        status = key_rotation.get_rotation_status(db)
+        assert (status["status"], status["last_id"], status["processed"]) == ("failed", 2, 2)
+        assert self._rotated_ids(db) == [1, 2]
+
+        result = key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=0)
+        assert batches[2:] == [[3, 4], [5]]
+        assert (result["scanned"], result["rewritten"]) == (3, 3)
+        db.expire_all()
+        status = key_rotation.get_rotation_status(db)
+        assert (status["status"], status["last_id"], status["processed"]) == ("completed", 5, 5)
+        assert self._rotated_ids(db) == [1, 2, 3, 4, 5]
+
+    def test_second_run_after_completion_does_nothing(self, db):
+        key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=0)
+        tokens = [c.email_encrypted for c in db.query(Candidate).order_by(Candidate.id)]
+        result = key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=0)
+        assert (result["scanned"], result["rewritten"]) == (0, 0)
+        db.expire_all()
+        assert [c.email_encrypted for c in db.query(Candidate).order_by(Candidate.id)] == tokens
+
+    def test_throttles_to_max_rows_per_sec(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(key_rotation.time, "sleep", sleeps.append)
+        key_rotation.rotate_candidate_keys(batch_size=2, max_rows_per_sec=2)
+        # Time does not pass while "sleeping", so each batch waits for its full share
+        assert sleeps == pytest.approx([1.0, 2.0, 2.5], abs=0.2)
+
+
+class TestBlindIndexLookups:
+    PEOPLE = [
+        ("Siti Rahayu", "Siti.Rahayu@Example.com", "+62 812-1111"),
+        ("Budi Siti Santoso", "budi@example.com", "0812 2222"),
+        ("", "anon@example.com", ""),
+    ]
+
+    def _add(self, db, indexed=True):
+        for full_name, email, phone in self.PEOPLE:
+            candidate = Candidate(
+                full_name_encrypted=encrypt_data(full_name),
+                email_encrypted=encrypt_data(email),
+                phone_encrypted=encrypt_data(phone),
+            )
+            if indexed:
+                apply_blind_indexes(candidate, full_name, email, phone)
+            db.add(candidate)
+        db.commit()
+
+    def test_email_and_name_filters(self, db, client):
+        self._add(db)
+
+        def found(**params) -> list[int]:
+            response = client.get("/api/candidates", params={**params, "fields": "id", "sort_order": "asc"})
+            assert response.status_code == 200
+            return [item["id"] for item in response.json()["items"]]
+
+        assert found(email=" siti.rahayu@example.COM ") == [1]
+        assert found(email="nobody@example.com") == []
+        assert found(name="SITI") == [1, 2]
+        assert found(name="siti santoso") == [2]
+        assert found(name="rahayu budi") == []
+        # Nothing to index: matches nobody instead of everybody
+        assert found(name="1 2") == []
+
+    def test_backfill_resumes_from_checkpoint(self, db):
+        self._add(db, indexed=False)
+        assert backfill_blind_indexes(db, batch_size=2) == 3
+        db.expire_all()
+        siti, budi, anonymous = db.query(Candidate).order_by(Candidate.id).all()
+        assert siti.email_bidx == email_index("siti.rahayu@example.com")
+        assert siti.phone_bidx == phone_index("08121111")
+        assert len(budi.name_tokens) == 3
+        # An empty name never gets a name index, and is not scanned again
+        assert anonymous.name_bidx is None and anonymous.email_bidx
+        checkpoint = db.query(JobCheckpoint).filter(JobCheckpoint.name == BACKFILL_CHECKPOINT).one()
+        assert (checkpoint.status, checkpoint.last_id, checkpoint.processed) == ("completed", 3, 3)
+        assert backfill_blind_indexes(db) == 0
+
+        # Candidates stored later without indexes are picked up by the next run
+        db.add(Candidate(full_name_encrypted=encrypt_data("Dewi"), email_encrypted=encrypt_data("")))
+        db.commit()
+        assert backfill_blind_indexes(db) == 1
+        assert db.get(Candidate, 4).name_bidx == name_index("Dewi")
@@ -0,0 +1,444 @@
+"""Tests for the service layer."""
+
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import event, update
+from fastapi import UploadFile
+from fastapi import HTTPException
+from app.security.encryption import encrypt_data
+from app.config import get_settings
+from app.models.candidate import Candidate
+from app.models.candidate_vector import CandidateVector, TermDocumentFrequency
+from app.models.job import Job
+from app.models.ranking import Ranking
+from app.models.resume import Resume
+from app.services.candidate_retrieval import get_candidate_index, reset_candidate_index, retrieve_candidates
+from app.services.candidate_vectors import load_document_frequencies, remove_candidate_vectors, sync_candidate_vectors
+from app.services.candidate_view import candidate_to_response, decrypt_fields, parse_fields
+from app.services.job_matches import job_matrix, match_jobs
+from app.services.resume_cache import find_parsed_resumes, reuse_parsed_data
+from app.services.upload_storage import FileTooLarge, save_upload
+from app.ai.extraction_engine import ExtractionResult, extraction_engine
+from app.ai.extractor import EXTRACTOR_VERSION
+from app.ai.text_vectors import candidate_texts, term_counts, text_hash
+from app.tasks import reextraction
+from app.tasks.reextraction import _candidate_updates
+
+
+class TestCandidateView:
+    candidate = SimpleNamespace(
+        id=7,
+        full_name_encrypted=encrypt_data("Siti Rahayu"),
+        email_encrypted=encrypt_data("siti@example.com"),
+        phone_encrypted=b"",
+        skills=["Python"],
+        experience=None,
+        education=[],
+        certifications=[],
+        summary="Data analyst",
+        source="upload",
+        created_at=None,
+        updated_at=None,
+    )
+
+    def test_parse_fields(self):
+        assert parse_fields(None) is None
+        assert parse_fields("skills, full_name") == ("id", "full_name", "skills")
+        with pytest.raises(HTTPException):
+            parse_fields("full_name,password")
+
+    def test_sparse_response_skips_unrequested_pii(self):
+        fields = parse_fields("skills")
+        assert decrypt_fields([self.candidate], fields) == [{}]
+        response = candidate_to_response(self.candidate, {}, fields)
+        assert response.model_dump(exclude_unset=True) == {"id": 7, "skills": ["Python"]}
+
+    def test_full_response(self):
+        response = candidate_to_response(self.candidate)
+        assert response.full_name == "Siti Rahayu"
+        assert response.phone is None
+        assert response.experience == []
+
+
+class TestUploadStorage:
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, tmp_path, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+        monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 64)
+        return tmp_path
+
+    def test_streams_and_hashes(self, upload_dir):
+        content = os.urandom(999)
+        stored = asyncio.run(save_upload(UploadFile(io.BytesIO(content), filename="cv.pdf"), "pdf"))
+        assert stored.size == 999
+        assert stored.content_hash == hashlib.sha256(content).hexdigest()
+        assert stored.path == os.path.join(str(upload_dir), f"{stored.file_id}.pdf")
+        assert os.listdir(upload_dir) == [f"{stored.file_id}.pdf"]
+        with open(stored.path, "rb") as f:
+            assert f.read() == content
+
+    def test_oversized_file_leaves_nothing(self, upload_dir):
+        source = io.BytesIO(os.urandom(5000))
+        with pytest.raises(FileTooLarge):
+            asyncio.run(save_upload(UploadFile(source), "pdf"))
+        assert os.listdir(upload_dir) == []
+        assert source.tell() <= 1000 + 64  # stopped at the first chunk over the limit
+
+    def test_rejects_declared_size_unread(self, upload_dir):
+        source = io.BytesIO(b"x")
+        with pytest.raises(FileTooLarge):
+            asyncio.run(save_upload(UploadFile(source, size=5000), "docx"))
+        assert source.tell() == 0
+
+
+class TestResumeCache:
+    CV_TEXT = "Budi Santoso\nbudi@example.com\nSkills: Python, Django, Docker\n"
+
+    def _resume(self, db, content_hash, status="completed", raw_text=CV_TEXT):
+        candidate = Candidate(source="upload")
+        db.add(candidate)
+        db.flush()
+        resume = Resume(
+            candidate_id=candidate.id, file_path="x.pdf", file_type="pdf", content_hash=content_hash,
+            raw_text=raw_text, parsed_data={"skills": ["Python"]}, processing_status=status,
+        )
+        db.add(resume)
+        db.commit()
+        return resume
+
+    def test_oldest_completed_resume_per_hash(self, db):
+        self._resume(db, "a", status="failed")
+        self._resume(db, "a", raw_text="")
+        oldest = self._resume(db, "a")
+        self._resume(db, "a")
+        other = self._resume(db, "b")
+        found = find_parsed_resumes(db, ["a", "b", "c", None])
+        assert {h: r.id for h, r in found.items()} == {"a": oldest.id, "b": other.id}
+        assert find_parsed_resumes(db, [None]) == {}
+
+    @pytest.fixture
+    def extractions(self, monkeypatch):
+        calls = []
+
+        async def extract_many(documents):
+            calls.append(documents)
+            return [ExtractionResult(self.CV_TEXT, engine="test") for _ in documents]
+
+        monkeypatch.setattr(extraction_engine, "extract_many", extract_many)
+        return calls
+
+    def test_upload_reuses_parsed_resumes(self, client, extractions):
+        def upload(*contents):
+            files = [("files", (f"cv{i}.pdf", content, "application/pdf")) for i, content in enumerate(contents)]
+            response = client.post("/api/upload/resume", files=files)
+            assert response.status_code == 200
+            return response.json()["results"]
+
+        first, repeated, other = upload(b"%PDF cv one", b"%PDF cv one", b"%PDF cv two")
+        # A file repeated within the request is extracted once
+        assert len(extractions) == 1 and len(extractions[0]) == 2
+        assert "duplicate_of" not in first and "duplicate_of" not in other
+        assert repeated["status"] == "completed"
+        assert repeated["duplicate_of"]["candidate_id"] == first["candidate_id"]
+
+        (again,) = upload(b"%PDF cv one")
+        assert extractions[1] == []
+        assert again["duplicate_of"] == repeated["duplicate_of"]
+        assert again["candidate_id"] not in (first["candidate_id"], repeated["candidate_id"])
+
+    def test_failed_apply_is_not_reused(self, db, client, extractions, monkeypatch):
+        job = Job(title="Python Developer", description="Django REST APIs", status="open")
+        db.add(job)
+        db.commit()
+
+        async def timed_out(file_path, file_type):
+            return ExtractionResult("", error="Document timed out")
+
+        monkeypatch.setattr(extraction_engine, "extract", timed_out)
+        response = client.post(
+            "/api/public/apply",
+            data={"full_name": "Budi Santoso", "email": "budi@example.com", "job_id": str(job.id)},
+            files={"file": ("cv.pdf", b"%PDF cv one", "application/pdf")},
+        )
+        assert response.status_code == 200
+        assert db.query(Resume).one().processing_status == "failed"
+
+        response = client.post("/api/upload/resume", files=[("files", ("cv.pdf", b"%PDF cv one", "application/pdf"))])
+        (result,) = response.json()["results"]
+        assert len(extractions[0]) == 1
+        assert result["status"] == "completed" and "duplicate_of" not in result
+
+
+
+class TestReextraction:
+    def test_reuse_parsed_data_refreshes_old_versions(self):
+        current = {"skills": ["Go"], "extractor_version": EXTRACTOR_VERSION}
+        resume = SimpleNamespace(raw_text="Skills: golang, k8s", parsed_data=current)
+        assert reuse_parsed_data(resume) == current
+        resume.parsed_data = {"skills": ["Golang", "K8S"]}
+        refreshed = reuse_parsed_data(resume)
+        assert refreshed["skills"] == ["Go", "Kubernetes"]
+        assert refreshed["extractor_version"] == EXTRACTOR_VERSION
+
+    def test_candidate_updates_keep_recruiter_edits(self):
+        previous = {"skills": ["Golang"], "summary": "Backend dev", "education": []}
+        parsed = {"skills": ["Go"], "summary": "Backend developer", "education": [], "experience": []}
+        row = SimpleNamespace(id=1, candidate_id=7, parsed_data=previous)
+        candidate = SimpleNamespace(
+            id=7, skills=["Golang"], summary="Edited by recruiter", education=[], experience=None, certifications=[],
+        )
+        updates = _candidate_updates({7: candidate}, [(row, parsed)])
+        # experience was never extracted (None), so it counts as edited and is left alone
+        assert updates == [{"id": 7, "skills": ["Go"]}]
+        assert _candidate_updates({}, [(row, parsed)]) == []
+
+    def test_refreshes_candidate_vectors(self, db, session_factory, monkeypatch):
+        monkeypatch.setattr(reextraction, "SessionLocal", session_factory)
+        candidate = Candidate(skills=["Golang"], summary="", experience=[], education=[], certifications=[])
+        db.add(candidate)
+        db.flush()
+        sync_candidate_vectors(db, [candidate])
+        db.add(Resume(
+            candidate_id=candidate.id, raw_text="Skills: golang", parsed_data={"skills": ["Golang"]},
+            processing_status="completed",
+        ))
+        db.commit()
+
+        reextraction.reextract_stale_resumes(workers=0)
+        db.expire_all()
+        assert candidate.skills == ["Go"]
+        stored = db.query(CandidateVector).filter(CandidateVector.candidate_id == candidate.id).one()
+        assert stored.text_hash == text_hash(candidate_texts(candidate))
+        frequencies = db.query(TermDocumentFrequency.term_id, TermDocumentFrequency.document_count)
+        counted = {term for term, count in frequencies if count}
+        assert counted == set(term_counts(candidate_texts(candidate)[:1]).indices.tolist())
+
+
+class TestJobMatches:
+    @pytest.fixture(autouse=True)
+    def empty_matrix(self):
+        job_matrix.clear()
+        yield
+        job_matrix.clear()
+
+    def _job(self, db, title, skills, status="open", description=None):
+        job = Job(title=title, description=description or title, skills_required=skills, status=status)
+        db.add(job)
+        db.commit()
+        return job
+
+    def _candidate(self, db):
+        candidate = Candidate(
+            skills=["Python", "Django"], summary="Python Django backend developer", education=[], certifications=[],
+            experience=[{"title": "Python Developer", "company": "PT A", "description": "Django REST APIs",
+                         "duration": "2020 - present"}],
+        )
+        db.add(candidate)
+        db.commit()
+        return candidate
+
+    def _rows(self, db):
+        job_ids, matrix, _ = job_matrix.refresh(db)
+        return {jid: matrix[row] for row, jid in enumerate(job_ids.tolist())}
+
+    def test_rows_follow_created_updated_and_closed_jobs(self, db):
+        self._candidate(db)
+        backend = self._job(db, "Python Developer", ["Python"])
+        self._job(db, "Data Analyst", ["SQL"], status="draft")
+        rows = self._rows(db)
+        assert list(rows) == [backend.id]
+
+        chef = self._job(db, "Chef", ["Cooking"])
+        assert set(self._rows(db)) == {backend.id, chef.id}
+
+        # Marked by the ORM event, even within the same updated_at second
+        backend.skills_required = ["Java"]
+        db.commit()
+        updated = self._rows(db)
+        assert (updated[backend.id] != rows[backend.id]).nnz
+
+        # Written elsewhere (no ORM event): picked up from updated_at
+        db.execute(
+            update(Job).where(Job.id == chef.id)
+            .values(description="Cooking in a hotel kitchen", updated_at=datetime(2100, 1, 1))
+        )
+        db.commit()
+        assert (self._rows(db)[chef.id] != updated[chef.id]).nnz
+
+        backend.status = "closed"
+        db.commit()
+        assert list(self._rows(db)) == [chef.id]
+        db.delete(chef)
+        db.commit()
+        assert self._rows(db) == {}
+
+    def test_matches_best_first_without_excluded_jobs(self, db):
+        candidate = self._candidate(db)
+        backend = self._job(db, "Python Developer", ["Python", "Django"], description="Django REST APIs")
+        partial = self._job(db, "Fullstack Developer", ["Python", "React"], description="React and Django")
+        chef = self._job(db, "Chef", [], description="Cooking in a restaurant kitchen")
+
+        matches = match_jobs(db, candidate, 10)
+        assert [m.job.id for m in matches] == [backend.id, partial.id, chef.id]
+        assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+        assert matches[1].matched_skills == ["Python"] and matches[1].missing_skills == ["React"]
+        # A job that requires no skills gets no skill credit
+        assert matches[2].matched_skills == [] and matches[2].score < 20
+
+        matches = match_jobs(db, candidate, 1, exclude_job_ids=(backend.id,))
+        assert [m.job.id for m in matches] == [partial.id]
+
+
+class TestDocumentFrequencies:
+    def _stored(self, db) -> dict[int, int]:
+        return {
+            term: count
+            for term, count in db.query(TermDocumentFrequency.term_id, TermDocumentFrequency.document_count)
+            if count
+        }
+
+    def _expected(self, candidates) -> dict[int, int]:
+        counts = {}
+        for candidate in candidates:
+            for term in set(term_counts(candidate_texts(candidate)[:1]).indices.tolist()):
+                counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def _candidate(self, db, summary, skills):
+        candidate = Candidate(summary=summary, skills=skills, experience=[], education=[], certifications=[])
+        db.add(candidate)
+        db.flush()
+        sync_candidate_vectors(db, [candidate])
+        # Counted in the same transaction, as ranking reads them
+        assert load_document_frequencies(db).documents == db.query(Candidate).count()
+        db.commit()
+        return candidate
+
+    def test_counts_follow_added_updated_and_removed_candidates(self, db):
+        backend = self._candidate(db, "Backend developer", ["Python", "Django"])
+        frontend = self._candidate(db, "Frontend developer", ["React"])
+        assert self._stored(db) == self._expected([backend, frontend])
+        assert load_document_frequencies(db).documents == 2
+
+        # Only the terms that changed move
+        before = self._stored(db)
+        old_terms = set(self._expected([backend]))
+        statements = []
+
+        def record(conn, cursor, statement, parameters, *args):
+            if "term_document_frequencies" in statement:
+                statements.append(parameters)
+
+        backend.skills = ["Python", "Flask"]
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        sync_candidate_vectors(db, [backend, frontend])
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+        db.commit()
+        after = self._stored(db)
+        assert after == self._expected([backend, frontend])
+        moved = {t for t in set(before) | set(after) if before.get(t) != after.get(t)}
+        assert moved and moved == old_terms ^ set(self._expected([backend]))
+        # One upsert, in term order so concurrent writers lock shared rows in the same order
+        assert len(statements) == 1
+        terms = list(statements[0][0::2])
+        assert terms == sorted(terms) == sorted(moved)
+
+        remove_candidate_vectors(db, [frontend.id])
+        db.commit()
+        assert self._stored(db) == self._expected([backend])
+        assert load_document_frequencies(db).documents == 1
+
+
+class TestCandidateRetrieval:
+    JOB = SimpleNamespace(
+        title="Python Developer", description="Django REST APIs", requirements=None,
+        skills_required=["Python", "Django"], education_level=None,
+    )
+
+    @pytest.fixture(autouse=True)
+    def empty_index(self):
+        reset_candidate_index()
+        yield
+        reset_candidate_index()
+
+    def _candidates(self, db, skills_per_candidate, status="completed"):
+        candidates = []
+        for skills in skills_per_candidate:
+            candidate = Candidate(
+                summary=" ".join(skills) + " developer", skills=skills, experience=[], education=[], certifications=[],
+            )
+            db.add(candidate)
+            db.flush()
+            db.add(Resume(candidate_id=candidate.id, file_path="x.pdf", file_type="pdf", processing_status=status))
+            candidates.append(candidate)
+        sync_candidate_vectors(db, candidates)
+        db.commit()
+        return candidates
+
+    def _top(self, db, top_n):
+        return [c.id for c in retrieve_candidates(db, self.JOB, top_n)]
+
+    def test_follows_changed_and_deleted_candidates(self, db):
+        best, good, other = self._candidates(db, [["Python", "Django"], ["Python"], ["Excel"]])
+        (failed,) = self._candidates(db, [["Python", "Django"]], status="failed")
+        assert self._top(db, 3) == [best.id, good.id, other.id]
+        index, _ = get_candidate_index(db)
+        assert failed.id not in index
+
+        # Changed elsewhere (no vector sync here): found through the updated_at watermark
+        db.execute(
+            update(Candidate).where(Candidate.id == other.id)
+            .values(skills=["Python", "Django"], summary="Python Django developer", updated_at=datetime(2100, 1, 1))
+        )
+        (new,) = self._candidates(db, [["Django"]])
+        db.commit()
+        top = self._top(db, 4)
+        assert set(top[:2]) == {best.id, other.id} and set(top[2:]) == {good.id, new.id}
+
+        db.delete(db.get(Candidate, best.id))
+        db.commit()
+        assert best.id not in self._top(db, 4)
+        assert best.id not in get_candidate_index(db)[0]
+
+    def test_over_fetches_past_unavailable_candidates(self, db, monkeypatch):
+        candidates = self._candidates(db, [["Python", "Django"]] * 3 + [["Python"]] * 12)
+        index, _ = get_candidate_index(db)
+        fetched = []
+        search = index.search
+
+        def recording_search(query, k, probes=None):
+            fetched.append(k)
+            return search(query, k, probes)
+
+        monkeypatch.setattr(index, "search", recording_search)
+        # The best three lose their completed resume without the index hearing of it
+        db.query(Resume).filter(Resume.candidate_id.in_([c.id for c in candidates[:3]])).delete()
+        db.commit()
+
+        top = self._top(db, 2)
+        assert len(top) == 2 and not set(top) & {c.id for c in candidates[:3]}
+        assert fetched[0] > 2
+        assert all(c.id not in index for c in candidates[:3])
+
+    def test_two_stage_ranking_scores_the_retrieved_candidates(self, db, client):
+        self._candidates(db, [["Python", "Django"], ["Python"], ["Django"], ["Excel"], ["React"]])
+        job = Job(title=self.JOB.title, description=self.JOB.description, skills_required=self.JOB.skills_required)
+        db.add(job)
+        db.commit()
+
+        def ranked(top_n):
+            response = client.post("/api/ranking/run", json={"job_id": job.id, "top_n": top_n})
+            assert response.status_code == 200
+            return [(r.candidate_id, r.overall_score) for r in db.query(Ranking).order_by(Ranking.rank_position)]
+
+        exhaustive = ranked(0)
+        assert len(exhaustive) == 5
+        # Exact scores of the retrieved top 3, the same as in the exhaustive ranking
+        assert ranked(3) == exhaustive[:3]
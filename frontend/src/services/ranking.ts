@@ -1,20 +1,26 @@
 import api from './api';
 import type { Ranking } from '../types';
 
+// The ranking table and comparison only show the candidate's name, so skip
+// decrypting the other PII fields and sending the full CV data.
+const TABLE_CANDIDATE_FIELDS = 'full_name';
+
 export const rankingService = {
   async runRanking(jobId: number): Promise<{ task_id: string; message: string }> {
     const response = await api.post('/ranking/run', { job_id: jobId });
     return response.data;
   },
 
-  async getByJob(jobId: number): Promise<Ranking[]> {
-    const response = await api.get<Ranking[]>(`/ranking/job/${jobId}`);
+  async getByJob(jobId: number, fields: string = TABLE_CANDIDATE_FIELDS): Promise<Ranking[]> {
+    const response = await api.get<Ranking[]>(`/ranking/job/${jobId}`, {
+      params: { fields },
+    });
     return response.data;
   },
 
   async compare(candidateIds: number[], jobId: number): Promise<Ranking[]> {
     const response = await api.get('/ranking/compare', {
-      params: { candidate_ids: candidateIds.join(','), job_id: jobId },
+      params: { candidate_ids: candidateIds.join(','), job_id: jobId, fields: TABLE_CANDIDATE_FIELDS },
     });
     return response.data;
   },
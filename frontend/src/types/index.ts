@@ -81,7 +81,7 @@ export interface Ranking {
   id: number;
   job_id: number;
   candidate_id: number;
-  candidate?: Candidate;
+  candidate?: Partial<Candidate> & Pick<Candidate, 'id'>;  // sparse when fetched with ?fields=
   overall_score: number;
   skill_score: number;
   experience_score: number;